@@ -0,0 +1,353 @@
+"""
+Generator benchmark suite for create-ragbits-app.
+
+Times template discovery, template config loading, project generation for every template and
+answer combination, UI template generation for every framework and a synthetic stress template
+with many files, deeply templated paths and large JSON files. Results are stored per commit in a
+JSON history file, so a run can be compared against the results of an earlier commit.
+
+Usage:
+    uv run python benchmarks/generator.py --runs 5
+    uv run python benchmarks/generator.py --compare main --max-regression 1.25
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import itertools
+import json
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from create_ragbits_app.template_config_base import (
+    ConfirmQuestion,
+    ListQuestion,
+    MultiSelectQuestion,
+    TemplateConfig,
+)
+from create_ragbits_app.template_registry import TemplateRegistry
+from create_ragbits_app.template_utils import (
+    TEMPLATES_DIR,
+    build_project_context,
+    create_project,
+    get_available_templates,
+    get_template_config,
+    resolve_template_answers,
+)
+from create_ragbits_app.ui_generator import Template_Type, UI_Type, UIOptions, create_ui_from_template
+
+DEFAULT_HISTORY_PATH = pathlib.Path(".benchmarks") / "generator.json"
+
+RAGBITS_VERSION = "1.0.0"
+
+# Cases faster than this are too noisy to be reported as regressions
+NOISE_FLOOR_MS = 1.0
+
+DASHBOARD_TEMPLATE = TEMPLATES_DIR / "shared" / "observability" / "grafana" / "dashboards" / "ragbits-dashboard.json.j2"
+
+STRESS_TEMPLATE_CONFIG = """
+from create_ragbits_app.template_config_base import ConfirmQuestion, Question, TemplateConfig
+
+
+class StressTemplateConfig(TemplateConfig):
+    name: str = "{name}"
+    description: str = "Synthetic template for benchmarks"
+    questions: list[Question] = [ConfirmQuestion(name="{name}_enabled", message="Enable?", default=True)]
+
+
+config = StressTemplateConfig()
+"""
+
+STRESS_MODULE_TEMPLATE = '''"""Module {index} of {{{{ project_name }}}}."""
+
+{{% for i in range(20) %}}
+def function_{{{{ i }}}}() -> str:
+    return "{{{{ pkg_name }}}}-{index}-{{{{ i }}}}"
+{{% endfor %}}
+'''
+
+STRESS_COMPOSE_TEMPLATE = """services:
+  service-{index}:
+    image: "{{{{ project_name }}}}-{index}:latest"
+    environment:
+      - RAGBITS_VERSION={{{{ ragbits_version }}}}
+"""
+
+
+def create_stress_templates(root: pathlib.Path, files: int, depth: int, dashboards: int) -> pathlib.Path:
+    """
+    Create a templates directory with a synthetic stress template and a shared template.
+
+    Args:
+        root: Directory to create the templates in
+        files: Number of templated Python modules
+        depth: Number of nested templated directories the modules are spread over
+        dashboards: Number of copies of the Grafana dashboard template
+
+    Returns:
+        The templates directory
+    """
+    templates_dir = root / "templates"
+    for name in ("shared", "stress"):
+        (templates_dir / name).mkdir(parents=True)
+        (templates_dir / name / "template_config.py").write_text(STRESS_TEMPLATE_CONFIG.format(name=name))
+        (templates_dir / name / "docker").mkdir()
+        (templates_dir / name / "docker" / "docker-compose.yml.j2").write_text(
+            STRESS_COMPOSE_TEMPLATE.format(index=name)
+        )
+
+    stress_dir = templates_dir / "stress"
+    for index in range(files):
+        segments = [f"{{{{pkg_name}}}}_{level}" for level in range(index % depth + 1)]
+        module_dir = stress_dir.joinpath("src", "{{pkg_name}}", *segments)
+        module_dir.mkdir(parents=True, exist_ok=True)
+        (module_dir / f"module_{index}.py.j2").write_text(STRESS_MODULE_TEMPLATE.format(index=index))
+        (module_dir / f"static_{index}.txt").write_text(f"Static file {index}\n" * 50)
+
+    dashboards_dir = stress_dir / "observability" / "dashboards"
+    dashboards_dir.mkdir(parents=True)
+    for index in range(dashboards):
+        shutil.copyfile(DASHBOARD_TEMPLATE, dashboards_dir / f"dashboard-{index}.json.j2")
+    return templates_dir
+
+
+def get_answer_combinations(config: TemplateConfig) -> list[dict[str, Any]]:
+    """Get every combination of answers to choice questions, multi-select questions are all or nothing."""
+    options: dict[str, list[Any]] = {}
+    for question in config.questions:
+        if isinstance(question, ListQuestion):
+            options[question.name] = question.choices
+        elif isinstance(question, ConfirmQuestion):
+            options[question.name] = [True, False]
+        elif isinstance(question, MultiSelectQuestion):
+            values = [choice["value"] if isinstance(choice, dict) else choice for choice in question.choices]
+            options[question.name] = [values, []]
+    return [dict(zip(options, values, strict=True)) for values in itertools.product(*options.values())]
+
+
+def describe_answers(answers: dict[str, Any]) -> str:
+    """Describe an answer combination in a short, stable form."""
+    parts = []
+    for name, value in answers.items():
+        description = ("all" if value else "none") if isinstance(value, list) else value
+        parts.append(f"{name}={description}")
+    return ",".join(parts)
+
+
+def build_context(
+    template_name: str, answers: dict[str, Any], templates_dir: pathlib.Path = TEMPLATES_DIR
+) -> dict[str, Any]:
+    """Build the rendering context of a project from an answer combination."""
+    template_config = get_template_config(template_name, templates_dir)
+    shared_config = get_template_config("shared", templates_dir)
+    ui_options: UIOptions = {"ui_type": UI_Type.DEFAULT, "framework": None, "ui_project_name": "ui"}
+    return build_project_context(
+        f"bench-{template_name}",
+        template_config,
+        shared_config,
+        resolve_template_answers(template_config, answers),
+        resolve_template_answers(shared_config, answers),
+        ui_options,
+        RAGBITS_VERSION,
+    )
+
+
+class BenchmarkRunner:
+    """Runs benchmark cases, each in a fresh output directory, and collects their timings."""
+
+    def __init__(self, work_dir: pathlib.Path, runs: int, pattern: str | None = None):
+        self.work_dir = work_dir
+        self.runs = runs
+        self.pattern = pattern
+        self.results: dict[str, dict[str, float]] = {}
+
+    def run(self, name: str, func: Callable[[pathlib.Path], object]) -> None:
+        """Time a case, passing it a path that does not exist yet to generate into."""
+        if self.pattern and self.pattern not in name:
+            return
+
+        timings = []
+        for run in range(self.runs):
+            output_path = self.work_dir / f"run-{len(self.results)}-{run}"
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func(output_path)
+                timings.append((time.perf_counter() - start) * 1000)
+            shutil.rmtree(output_path, ignore_errors=True)
+
+        self.results[name] = {"median_ms": statistics.median(timings), "min_ms": min(timings), "runs": self.runs}
+        print(f"{name:<100} median {self.results[name]['median_ms']:8.2f} ms   min {min(timings):8.2f} ms")
+
+
+def load_config_cold(index_path: pathlib.Path, template_name: str, _: pathlib.Path) -> None:
+    """Load a template config in a new registry, executing its template_config.py."""
+    TemplateRegistry(TEMPLATES_DIR, index_path).get_config(template_name)
+
+
+def generate_project(
+    template_name: str,
+    context: dict[str, Any],
+    templates_dir: pathlib.Path,
+    render_workers: int,
+    output_path: pathlib.Path,
+) -> None:
+    """Generate a project into the given path."""
+    create_project(template_name, str(output_path), context, templates_dir, render_workers=render_workers)
+
+
+def generate_ui(context: dict[str, Any], template_type: Template_Type, output_path: pathlib.Path) -> None:
+    """Generate a UI project into the given path."""
+    create_ui_from_template(str(output_path), context, template_type)
+
+
+def run_suite(runner: BenchmarkRunner, args: argparse.Namespace) -> None:
+    """Run every benchmark case."""
+    index_path = runner.work_dir / "index.json"
+
+    def list_templates_cold(_: pathlib.Path) -> None:
+        index_path.unlink(missing_ok=True)
+        TemplateRegistry(TEMPLATES_DIR, index_path).list_templates()
+
+    runner.run("get_available_templates[cold]", list_templates_cold)
+    runner.run("get_available_templates[warm]", lambda _: get_available_templates())
+
+    templates = [t["dir_name"] for t in get_available_templates()]
+    for template_name in [*templates, "shared"]:
+        runner.run(
+            f"get_template_config[{template_name}][cold]",
+            functools.partial(load_config_cold, index_path, template_name),
+        )
+
+    shared_config = get_template_config("shared")
+    for template_name in templates:
+        template_config = get_template_config(template_name)
+        combinations = itertools.product(
+            get_answer_combinations(template_config), get_answer_combinations(shared_config)
+        )
+        for template_answers, shared_answers in combinations:
+            answers = {**template_answers, **shared_answers}
+            context = build_context(template_name, answers)
+            runner.run(
+                f"create_project[{template_name}][{describe_answers(answers)}]",
+                functools.partial(generate_project, template_name, context, TEMPLATES_DIR, args.render_workers),
+            )
+
+    ui_context = {"project_name": "bench-ui", "ui_project_name": "ui"}
+    for template_type in Template_Type:
+        runner.run(
+            f"create_ui_from_template[{template_type.value}]",
+            functools.partial(generate_ui, ui_context, template_type),
+        )
+
+    stress_dir = create_stress_templates(
+        runner.work_dir / "stress", args.stress_files, args.stress_depth, args.stress_dashboards
+    )
+    stress_context = build_context("stress", {}, stress_dir)
+    runner.run(
+        f"create_project[stress][files={args.stress_files},depth={args.stress_depth},dashboards={args.stress_dashboards}]",
+        functools.partial(generate_project, "stress", stress_context, stress_dir, args.render_workers),
+    )
+
+
+def get_commit() -> str:
+    """Get the current commit, marked as dirty when the working tree has changes."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()  # noqa: S607
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], check=False).returncode != 0  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def resolve_commit(ref: str) -> str:
+    """Resolve a git reference to a commit hash, or return it as is if it cannot be resolved."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", ref], text=True, stderr=subprocess.DEVNULL).strip()  # noqa: S603, S607
+    except (OSError, subprocess.CalledProcessError):
+        return ref
+
+
+def load_history(path: pathlib.Path) -> dict[str, Any]:
+    """Load stored benchmark results, keyed by commit."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def compare_results(
+    baseline: dict[str, dict[str, float]], results: dict[str, dict[str, float]], max_regression: float
+) -> list[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        Names of the cases that regressed by more than the allowed ratio
+    """
+    regressions = []
+    print(f"\n{'case':<100} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median_ms"], result["median_ms"]
+        ratio = new / old if old else float("inf")
+        regressed = ratio > max_regression and new - old > NOISE_FLOOR_MS
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{name:<100} {old:>8.2f}ms {new:>8.2f}ms {ratio:>6.2f}x{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark suite and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of times each case is run")
+    parser.add_argument("-k", dest="pattern", help="Only run cases whose name contains this string")
+    parser.add_argument("--history", type=pathlib.Path, default=DEFAULT_HISTORY_PATH, help="File with stored results")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results in the history file")
+    parser.add_argument("--compare", metavar="REF", help="Compare with the stored results of a commit")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="Maximum allowed ratio of median times")
+    parser.add_argument("--stress-files", type=int, default=500, help="Number of modules in the stress template")
+    parser.add_argument("--stress-depth", type=int, default=8, help="Nesting of templated directories")
+    parser.add_argument("--stress-dashboards", type=int, default=20, help="Number of large JSON templates")
+    parser.add_argument("--render-workers", type=int, default=1, help="Number of threads rendering project files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="create-ragbits-app-bench-") as work_dir:
+        runner = BenchmarkRunner(pathlib.Path(work_dir), args.runs, args.pattern)
+        run_suite(runner, args)
+
+    history = load_history(args.history)
+    if not args.no_save:
+        history[get_commit()] = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": runner.results,
+        }
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        args.history.write_text(json.dumps(history, indent=2) + "\n")
+
+    if args.compare:
+        commit = resolve_commit(args.compare)
+        if commit not in history:
+            print(f"No stored results for {args.compare} in {args.history}")
+            return 1
+        if compare_results(history[commit]["results"], runner.results, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
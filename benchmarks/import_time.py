@@ -0,0 +1,84 @@
+"""
+Cold-start import time benchmark for the create-ragbits-app CLI.
+
+Imports the CLI entry point module in fresh interpreters with `-X importtime`, reports the median
+cumulative import time and fails when it exceeds the budget, or when any of the dependencies that
+should only be loaded by the step that needs them is imported at startup.
+
+Usage:
+    uv run python benchmarks/import_time.py --budget-ms 200 --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+ENTRYPOINT_MODULE = "create_ragbits_app.main"
+
+# Heavy dependencies that must not be imported before the step that needs them runs
+LAZY_MODULES = ("aiohttp", "inquirer", "jinja2", "pydantic", "requests", "rich.progress", "rich.tree", "yaml")
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module: Name of the module to import
+
+    Returns:
+        Cumulative import time of the module's package in milliseconds and the names of all imported modules
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    package = module.split(".")[0]
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name.strip())
+        # Only top level imports of the package, nested ones are already included in their cumulative time
+        if name.startswith(" " + package) and not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, imported
+
+
+def main() -> int:
+    """Run the benchmark and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="Maximum median import time in milliseconds")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to measure")
+    args = parser.parse_args()
+
+    timings = []
+    eagerly_imported: set[str] = set()
+    for _ in range(args.runs):
+        elapsed_ms, imported = measure_import(ENTRYPOINT_MODULE)
+        timings.append(elapsed_ms)
+        eagerly_imported |= {name for name in imported if name in LAZY_MODULES}
+
+    median_ms = statistics.median(timings)
+    print(f"{ENTRYPOINT_MODULE}: median {median_ms:.1f} ms, min {min(timings):.1f} ms over {args.runs} runs")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time exceeds the budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if eagerly_imported:
+        print(f"FAIL: modules imported at startup that should be loaded lazily: {sorted(eagerly_imported)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
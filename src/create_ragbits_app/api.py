@@ -0,0 +1,260 @@
+"""
+Library API for create-ragbits-app.
+
+This module provides functionality for:
+1. Building the rendering context of a project from plain answers, validated like batch mode answers
+2. Generating projects in memory, without console output, prompts or writes to disk
+3. Streaming generated projects as tar or zip archives, e.g. as the response body of a web service
+
+Calls print nothing and keep their own state, so projects can be generated concurrently from threads or from one
+event loop. Compiled templates, template manifests and template configurations are cached in memory and shared
+between calls, they are only reloaded when the template files change.
+
+Nothing is written outside of the cache directory (`~/.cache/create-ragbits-app`, or `CREATE_RAGBITS_APP_CACHE_DIR`),
+which holds compiled templates, template manifests and the template index. Copying the ragbits UI into a project also
+caches the release archive there, and the latest release when no UI version is given.
+
+Example:
+    context = build_context("rag", "my-app", answers={"vector_store": "Qdrant"}, ragbits_version="1.2.0")
+    async for chunk in stream_project("rag", context, archive_format="zip"):
+        await response.write(chunk)
+"""
+
+import asyncio
+import functools
+import pathlib
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from typing import Any
+
+from create_ragbits_app.batch import build_batch_context
+from create_ragbits_app.lockfile import BUNDLED_TEMPLATE_SOURCE
+from create_ragbits_app.output_tree import ARCHIVE_FORMATS, DEFAULT_CHUNK_SIZE, OutputTree
+from create_ragbits_app.template_config_base import TemplateConfig
+from create_ragbits_app.template_registry import get_template_registry
+from create_ragbits_app.template_sources import is_safe_dir_name
+from create_ragbits_app.template_utils import TEMPLATES_DIR, build_project_tree, get_shared_templates_dir
+from create_ragbits_app.ui_generator import build_ui_tree
+from create_ragbits_app.versions import VersionResolver
+
+
+def _get_template_config(template_name: str, templates_dir: pathlib.Path) -> TemplateConfig:
+    """Get the configuration of a template without console output, failing if it cannot be loaded."""
+    config = get_template_registry(templates_dir).get_config(template_name, verbose=False)
+    if config is None:
+        raise ValueError(f"Template '{template_name}' not found in {templates_dir} or its configuration is not valid")
+    return config
+
+
+def _check_directory_names(context: dict) -> None:
+    """Reject project and UI names that are not a single path segment, they become directories of the project."""
+    for key in ("project_name", "pkg_name", "ui_project_name"):
+        if key in context and not is_safe_dir_name(context[key]):
+            raise ValueError(f"Invalid {key} {context[key]!r}, expected a single path segment")
+
+
+def build_context(
+    template_name: str,
+    project_name: str,
+    *,
+    ragbits_version: str,
+    answers: dict[str, Any] | None = None,
+    ui: dict[str, Any] | None = None,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+) -> dict:
+    """
+    Build the rendering context of a project, unanswered questions use their defaults.
+
+    Args:
+        template_name: Name of the template
+        project_name: Name of the project
+        ragbits_version: Ragbits version to render into the project
+        answers: Answers to the questions of the template and the shared template
+        ui: UI options, like in batch mode answers files (ui_type, framework, ui_project_name)
+        templates_dir: Directory containing the template and the shared template
+
+    Returns:
+        Context for rendering the project
+
+    Raises:
+        ValueError: If the template does not exist, the project name or UI project name is not a single path
+            segment, or any of the answers or UI options is not valid
+    """
+    project = {"project_name": project_name, "template": template_name, "answers": answers or {}, "ui": ui}
+    context = build_batch_context(
+        project,
+        _get_template_config(template_name, templates_dir),
+        _get_template_config("shared", get_shared_templates_dir(templates_dir)),
+        ragbits_version,
+    )
+    _check_directory_names(context)
+    return context
+
+
+def build_project(
+    template_name: str,
+    context: dict,
+    *,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    include_ui: bool = True,
+    ui_version: str | None = None,
+) -> OutputTree:
+    """
+    Generate a project in memory, synchronously and without console output.
+
+    Args:
+        template_name: Name of the template
+        context: Context for rendering the project, see build_context
+        templates_dir: Directory containing the template and the shared template
+        template_source: Source of the template recorded in the lockfile of the project
+        include_ui: Whether to add the UI selected in the context to the project
+        ui_version: Ragbits release to copy the UI from, the latest one by default
+
+    Returns:
+        The files of the project, including its lockfile
+
+    Raises:
+        ValueError: If the template does not exist, the project name or UI project name of the context is not a
+            single path segment, or a file cannot be rendered
+        OSError: If the ragbits UI cannot be downloaded and is not cached (requests.RequestException), or the UI
+            template does not exist
+    """
+    import jinja2
+
+    _check_directory_names(context)
+    _get_template_config(template_name, templates_dir)
+    _get_template_config("shared", get_shared_templates_dir(templates_dir))
+    try:
+        tree = build_project_tree(template_name, context, templates_dir, template_source, verbose=False)
+        # The latest release is looked up on every call, a long-running process would keep it forever otherwise
+        ui = build_ui_tree(context, ui_version, VersionResolver()) if include_ui else None
+    except jinja2.TemplateError as e:
+        raise ValueError(f"Could not render template '{template_name}': {e}") from e
+    if ui is not None:
+        ui_directory, ui_tree = ui
+        tree.add_tree(ui_directory, ui_tree)
+    return tree
+
+
+async def generate_project(
+    template_name: str,
+    context: dict,
+    *,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    include_ui: bool = True,
+    ui_version: str | None = None,
+    executor: Executor | None = None,
+) -> OutputTree:
+    """
+    Generate a project in memory without blocking the event loop, see build_project.
+
+    Args:
+        template_name: Name of the template
+        context: Context for rendering the project, see build_context
+        templates_dir: Directory containing the template and the shared template
+        template_source: Source of the template recorded in the lockfile of the project
+        include_ui: Whether to add the UI selected in the context to the project
+        ui_version: Ragbits release to copy the UI from, the latest one by default
+        executor: Thread pool to generate the project in, the default executor of the loop by default
+
+    Returns:
+        The files of the project, including its lockfile
+    """
+    generate = functools.partial(
+        build_project,
+        template_name,
+        context,
+        templates_dir=templates_dir,
+        template_source=template_source,
+        include_ui=include_ui,
+        ui_version=ui_version,
+    )
+    return await asyncio.get_running_loop().run_in_executor(executor, generate)
+
+
+async def stream_archive(
+    tree: OutputTree,
+    archive_format: str = "tar.gz",
+    root: str = "",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Executor | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream an output tree as an archive, compressing each chunk without blocking the event loop.
+
+    Args:
+        tree: Files to archive
+        archive_format: One of ARCHIVE_FORMATS
+        root: Directory all entries are placed in inside the archive, none by default
+        chunk_size: Minimum size of the yielded chunks, except the last one
+        executor: Thread pool to build the chunks in, the default executor of the loop by default
+
+    Yields:
+        Consecutive chunks of the archive
+
+    Raises:
+        ValueError: If the archive format is not supported
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format '{archive_format}', expected one of {ARCHIVE_FORMATS}")
+
+    loop = asyncio.get_running_loop()
+    chunks = tree.iter_archive(archive_format, root, chunk_size)
+    while (chunk := await loop.run_in_executor(executor, next, chunks, None)) is not None:
+        yield chunk
+
+
+async def stream_project(
+    template_name: str,
+    context: dict,
+    *,
+    archive_format: str = "tar.gz",
+    root: str | None = None,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    include_ui: bool = True,
+    ui_version: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Executor | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Generate a project and stream it as an archive, nothing is written to disk.
+
+    Args:
+        template_name: Name of the template
+        context: Context for rendering the project, see build_context
+        archive_format: One of ARCHIVE_FORMATS
+        root: Directory all entries are placed in inside the archive, the project name by default
+        templates_dir: Directory containing the template and the shared template
+        template_source: Source of the template recorded in the lockfile of the project
+        include_ui: Whether to add the UI selected in the context to the project
+        ui_version: Ragbits release to copy the UI from, the latest one by default
+        chunk_size: Minimum size of the yielded chunks, except the last one
+        executor: Thread pool to generate the project and build the chunks in
+
+    Yields:
+        Consecutive chunks of the archive
+
+    Raises:
+        ValueError: If the archive format is not supported, the template does not exist, the project name or UI
+            project name of the context is not a single path segment, or a file cannot be rendered
+        OSError: If the ragbits UI cannot be downloaded and is not cached, see build_project
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format '{archive_format}', expected one of {ARCHIVE_FORMATS}")
+
+    tree = await generate_project(
+        template_name,
+        context,
+        templates_dir=templates_dir,
+        template_source=template_source,
+        include_ui=include_ui,
+        ui_version=ui_version,
+        executor=executor,
+    )
+    async for chunk in stream_archive(
+        tree, archive_format, context.get("project_name", "") if root is None else root, chunk_size, executor
+    ):
+        yield chunk
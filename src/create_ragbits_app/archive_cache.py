@@ -0,0 +1,147 @@
+"""
+Local cache of downloaded archives for create-ragbits-app.
+
+This module provides functionality for:
+1. Storing downloaded archives content-addressed by their SHA-256 checksum
+2. Remembering which checksum each archive URL resolved to, together with its ETag
+3. Revalidating cached archives with conditional requests, and using them when the network is unavailable
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from rich.console import Console
+
+from create_ragbits_app.rendering import get_cache_dir
+
+console = Console()
+
+# How long a cached archive is used without revalidating it, release tags rarely change
+DEFAULT_REVALIDATE_AFTER_SECONDS = 24 * 60 * 60
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _sha256_file(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArchiveCache:
+    """
+    Content-addressed cache of archives downloaded over HTTP.
+
+    Archives are stored as `blobs/<sha256>.zip`, and `refs/<url hash>.json` records the checksum, ETag and time of
+    the last check for every URL, so the same content fetched from different URLs (e.g. a mirror) is stored once.
+    """
+
+    def __init__(
+        self,
+        cache_dir: pathlib.Path | None = None,
+        revalidate_after: float = DEFAULT_REVALIDATE_AFTER_SECONDS,
+        verbose: bool = True,
+    ):
+        self.cache_dir = cache_dir or get_cache_dir() / "archives"
+        self.revalidate_after = revalidate_after
+        self.verbose = verbose
+
+    def _get_ref_path(self, url: str) -> pathlib.Path:
+        return self.cache_dir / "refs" / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.json"
+
+    def _get_blob_path(self, checksum: str) -> pathlib.Path:
+        return self.cache_dir / "blobs" / f"{checksum}.zip"
+
+    def _load_ref(self, url: str) -> dict[str, Any] | None:
+        try:
+            with open(self._get_ref_path(url)) as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return ref if ref.get("url") == url else None
+
+    def _save_ref(self, url: str, ref: dict[str, Any]) -> None:
+        ref_path = self._get_ref_path(url)
+        ref_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = ref_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(ref, f)
+        tmp_path.replace(ref_path)
+
+    def _get_cached_blob(self, ref: dict[str, Any] | None) -> pathlib.Path | None:
+        """Get the cached archive of a ref, if it exists and still matches its checksum."""
+        if ref is None:
+            return None
+        blob_path = self._get_blob_path(ref["sha256"])
+        if not blob_path.exists() or _sha256_file(blob_path) != ref["sha256"]:
+            return None
+        return blob_path
+
+    def fetch(self, url: str) -> pathlib.Path:
+        """
+        Get a local copy of the archive at the given URL.
+
+        Args:
+            url: URL of the archive
+
+        Returns:
+            Path to the cached archive
+
+        Raises:
+            requests.RequestException: If the archive cannot be downloaded and there is no cached copy
+            OSError: If the cache directory is not writable
+        """
+        import requests
+
+        ref = self._load_ref(url)
+        cached_blob = self._get_cached_blob(ref)
+        if ref and cached_blob and time.time() - ref.get("checked_at", 0) < self.revalidate_after:
+            return cached_blob
+
+        headers = {"If-None-Match": ref["etag"]} if ref and cached_blob and ref.get("etag") else {}
+        try:
+            response = requests.get(url, headers=headers, timeout=60, stream=True)
+            if response.status_code == 304 and ref and cached_blob:  # noqa: PLR2004
+                self._save_ref(url, {**ref, "checked_at": time.time()})
+                return cached_blob
+            response.raise_for_status()
+            checksum, blob_path = self._store(response.iter_content(chunk_size=HASH_CHUNK_SIZE))
+        except requests.RequestException as e:
+            if cached_blob:
+                if self.verbose:
+                    console.print(f"[yellow]Warning: Could not revalidate {url}, using cached archive: {e}[/yellow]")
+                return cached_blob
+            raise
+
+        self._save_ref(
+            url, {"url": url, "sha256": checksum, "etag": response.headers.get("ETag"), "checked_at": time.time()}
+        )
+        return blob_path
+
+    def _store(self, chunks: Iterable[bytes]) -> tuple[str, pathlib.Path]:
+        """Write downloaded chunks into the cache, hashing them on the way."""
+        blobs_dir = self.cache_dir / "blobs"
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=blobs_dir, suffix=".tmp", delete=False) as f:
+            try:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+
+        checksum = digest.hexdigest()
+        blob_path = self._get_blob_path(checksum)
+        os.replace(f.name, blob_path)
+        return checksum, blob_path
@@ -0,0 +1,208 @@
+"""
+Headless batch mode for create-ragbits-app.
+
+This module provides functionality for:
+1. Loading answer sets for one or many projects from a YAML or JSON answers file
+2. Validating the answers against the questions of each template
+3. Generating all projects in a single process, sharing loaded configs, compiled templates and versions
+
+An answers file contains either a single project, a list of projects or a mapping with
+`defaults` applied to every entry of `projects`:
+
+```yaml
+defaults:
+  template: rag
+  ui:
+    ui_type: default
+projects:
+  - project_name: billing-assistant
+    answers:
+      vector_store: Qdrant
+      parser: docling
+      additional_features: [hybrid_search]
+      shared_features: [observability]
+  - project_name: support-agent
+    template: simple_agent
+    path: agents/support-agent
+```
+"""
+
+import json
+import os
+import pathlib
+from typing import Any
+
+from rich.console import Console
+
+from create_ragbits_app.merging import deep_merge_dicts
+from create_ragbits_app.template_config_base import TemplateConfig
+from create_ragbits_app.template_sources import TemplateSource, get_template_sources, list_source_templates
+from create_ragbits_app.template_utils import (
+    build_project_context,
+    create_project,
+    get_shared_config,
+    get_template_config,
+    resolve_template_answers,
+)
+from create_ragbits_app.ui_generator import Template_Type, UI_Type, UIOptions, generate_ui
+
+console = Console()
+
+PROJECT_KEYS = ("project_name", "template", "path", "answers", "ui")
+
+
+def load_answers_file(answers_file: pathlib.Path) -> list[dict[str, Any]]:
+    """
+    Load project answer sets from a YAML or JSON file.
+
+    Args:
+        answers_file: Path to the answers file
+
+    Returns:
+        List of project specifications, with defaults already applied
+
+    Raises:
+        ValueError: If the file does not describe any projects
+    """
+    import yaml
+
+    with open(answers_file) as f:
+        data = json.load(f) if answers_file.suffix == ".json" else yaml.safe_load(f)
+
+    defaults: dict[str, Any] = {}
+    if isinstance(data, dict) and "projects" in data:
+        defaults = data.get("defaults") or {}
+        data = data["projects"]
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(project, dict) for project in data):
+        raise ValueError(f"Answers file {answers_file} must contain a project, a list of projects or 'projects'")
+
+    return [deep_merge_dicts(defaults, project) for project in data]
+
+
+def parse_ui_options(ui: dict[str, Any] | None) -> UIOptions:
+    """Convert UI options from an answers file into the options used for UI generation."""
+    ui = ui or {}
+    framework = ui.get("framework")
+    ui_options: UIOptions = {
+        "ui_type": UI_Type(ui.get("ui_type", UI_Type.DEFAULT.value)),
+        "framework": Template_Type(framework) if framework else None,
+        "ui_project_name": ui.get("ui_project_name", "ui"),
+    }
+    if ui_options["ui_type"] == UI_Type.CREATE and ui_options["framework"] is None:
+        ui_options["framework"] = Template_Type.VANILLA_TS
+    return ui_options
+
+
+def build_batch_context(
+    project: dict[str, Any],
+    template_config: TemplateConfig,
+    shared_config: TemplateConfig,
+    ragbits_version: str,
+) -> dict:
+    """
+    Validate a single project specification and build its rendering context.
+
+    Args:
+        project: Project specification from the answers file
+        template_config: Configuration of the selected template
+        shared_config: Configuration of the shared template
+        ragbits_version: Ragbits version to render into the project
+
+    Returns:
+        Context for rendering the project
+
+    Raises:
+        ValueError: If the project specification or any of its answers is not valid
+    """
+    unknown_keys = set(project) - set(PROJECT_KEYS)
+    if unknown_keys:
+        raise ValueError(f"Unknown project keys: {sorted(unknown_keys)}")
+
+    answers = project.get("answers") or {}
+    question_names = {q.name for q in template_config.questions} | {q.name for q in shared_config.questions}
+    unknown_answers = set(answers) - question_names
+    if unknown_answers:
+        raise ValueError(f"Unknown answers for template '{project['template']}': {sorted(unknown_answers)}")
+
+    return build_project_context(
+        project["project_name"],
+        template_config,
+        shared_config,
+        resolve_template_answers(template_config, answers),
+        resolve_template_answers(shared_config, answers),
+        parse_ui_options(project.get("ui")),
+        ragbits_version,
+    )
+
+
+def run_batch(
+    answers_file: pathlib.Path,
+    output_dir: pathlib.Path,
+    ragbits_version: str,
+    sources: list[TemplateSource] | None = None,
+) -> int:
+    """
+    Generate every project described in an answers file.
+
+    Projects that fail validation, or whose target directory is not empty, are reported and skipped. Projects that
+    fail to generate, or whose UI cannot be generated, are reported and counted as failed, the batch goes on.
+
+    Args:
+        answers_file: Path to the answers file
+        output_dir: Directory relative project paths are resolved against
+        ragbits_version: Ragbits version to render into the projects
+        sources: Template sources to find the templates in, the bundled templates by default
+
+    Returns:
+        Number of projects that could not be generated
+    """
+    projects = load_answers_file(answers_file)
+    available_templates = {
+        t.metadata.dir_name: t.source for t in list_source_templates(sources or get_template_sources())
+    }
+
+    failures = 0
+    for project in projects:
+        project_name = project.get("project_name", "")
+        template_name = project.get("template", "")
+        if not project_name or template_name not in available_templates:
+            console.print(
+                f"[red]Skipping {project_name or '<unnamed project>'}: a project name and one of the templates "
+                f"{sorted(available_templates)} are required[/red]"
+            )
+            failures += 1
+            continue
+
+        project_path = os.path.abspath(output_dir / project.get("path", project_name))
+        if os.path.exists(project_path) and os.listdir(project_path):
+            console.print(f"[red]Skipping {project_name}: directory '{project_path}' is not empty[/red]")
+            failures += 1
+            continue
+
+        source = available_templates[template_name]
+        try:
+            templates_dir = source.get_templates_dir(template_name)
+            template_config = get_template_config(template_name, templates_dir)
+            context = build_batch_context(project, template_config, get_shared_config(templates_dir), ragbits_version)
+        except ValueError as e:
+            console.print(f"[red]Skipping {project_name}: {e}[/red]")
+            failures += 1
+            continue
+
+        try:
+            create_project(
+                template_name, project_path, context, templates_dir=templates_dir, template_source=source.spec
+            )
+            ui_generated = generate_ui(project_path, context)
+        except Exception as e:
+            console.print(f"[red]Failed to generate {project_name}: {e}[/red]")
+            failures += 1
+            continue
+        if not ui_generated:
+            console.print(f"[red]Generated {project_name} without its UI[/red]")
+            failures += 1
+
+    console.print(f"\n[bold]Generated {len(projects) - failures} of {len(projects)} projects[/bold]")
+    return failures
@@ -0,0 +1,156 @@
+"""
+File copying utilities for create-ragbits-app.
+
+This module provides functionality for:
+1. Copying files without duplicating their data where the filesystem allows it (reflinks on btrfs, XFS, overlayfs)
+2. Falling back to in-kernel copies (copy_file_range, sendfile) and finally to a plain read/write loop
+3. Moving temporary files into place, and creating many directories in a single batched pass
+"""
+
+import contextlib
+import errno
+import os
+import pathlib
+import shutil
+from collections.abc import Callable, Iterable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+# ioctl request cloning the whole content of one file into another (linux/fs.h), works on btrfs, XFS and others
+FICLONE = 0x40049409
+
+# Errors meaning a strategy is not supported for the given files, rather than that the copy failed
+UNSUPPORTED_ERRNOS = frozenset(
+    {
+        errno.EINVAL,
+        errno.ENOSYS,
+        errno.ENOTTY,
+        errno.ENOTSUP,
+        errno.EOPNOTSUPP,
+        errno.EXDEV,
+        errno.EBADF,
+        errno.ENOTSOCK,
+        errno.EPERM,
+    }
+)
+
+# Strategies that failed as unsupported, per pair of source and target devices, so they are not retried for every file
+_unsupported: set[tuple[str, int, int]] = set()
+
+
+def _reflink(source_fd: int, target_fd: int, size: int) -> int:
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "Reflinks are not supported on this platform")
+    fcntl.ioctl(target_fd, FICLONE, source_fd)
+    return size
+
+
+def _copy_file_range(source_fd: int, target_fd: int, size: int) -> int:
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not available")
+    copied = 0
+    while copied < size:
+        written = os.copy_file_range(source_fd, target_fd, size - copied)
+        if written == 0:
+            break
+        copied += written
+    return copied
+
+
+def _sendfile(source_fd: int, target_fd: int, size: int) -> int:
+    if not hasattr(os, "sendfile"):
+        raise OSError(errno.ENOSYS, "sendfile is not available")
+    copied = 0
+    while copied < size:
+        written = os.sendfile(target_fd, source_fd, copied, size - copied)
+        if written == 0:
+            break
+        copied += written
+    return copied
+
+
+# Strategies return the number of bytes they copied, which is less than the file size when they stopped early
+COPY_STRATEGIES: tuple[tuple[str, Callable[[int, int, int], int]], ...] = (
+    ("reflink", _reflink),
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+)
+
+
+def copy_file(source: pathlib.Path, target: pathlib.Path) -> str:
+    """
+    Copy a file with its permission bits and timestamps, like shutil.copy2, sharing data blocks when possible.
+
+    Args:
+        source: File to copy
+        target: Path of the copy, overwritten if it exists
+
+    Returns:
+        Name of the strategy used: "reflink", "copy_file_range", "sendfile" or "read/write"
+    """
+    with open(source, "rb", buffering=0) as source_file, open(target, "wb", buffering=0) as target_file:
+        source_fd, target_fd = source_file.fileno(), target_file.fileno()
+        source_stat = os.fstat(source_fd)
+        devices = (source_stat.st_dev, os.fstat(target_fd).st_dev)
+
+        strategy_used = "read/write"
+        copied = 0
+        if source_stat.st_size:
+            for name, strategy in COPY_STRATEGIES:
+                if (name, *devices) in _unsupported:
+                    continue
+                try:
+                    copied = strategy(source_fd, target_fd, source_stat.st_size)
+                except OSError as e:
+                    if e.errno not in UNSUPPORTED_ERRNOS:
+                        raise
+                    _unsupported.add((name, *devices))
+                    # Start over, a strategy may have failed after copying a part of the file
+                    os.lseek(source_fd, 0, os.SEEK_SET)
+                    os.lseek(target_fd, 0, os.SEEK_SET)
+                    os.ftruncate(target_fd, 0)
+                else:
+                    if copied:
+                        strategy_used = name
+                    break
+
+        if copied < source_stat.st_size:
+            # No strategy is supported, or the one used stopped early: copy_file_range copies nothing on some
+            # filesystems. The rest of the file is read and written from where the copy stopped
+            os.lseek(source_fd, copied, os.SEEK_SET)
+            os.lseek(target_fd, copied, os.SEEK_SET)
+            shutil.copyfileobj(source_file, target_file)
+
+    shutil.copystat(source, target)
+    return strategy_used
+
+
+def move_file(source: pathlib.Path, target: pathlib.Path) -> None:
+    """Move a file into place, copying it only when it is on another filesystem."""
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copy_file(source, target)
+        os.unlink(source)
+
+
+def make_directories(root: pathlib.Path, paths: Iterable[str | pathlib.PurePath]) -> None:
+    """
+    Create directories under a root in a single pass, each one once and parents first.
+
+    Args:
+        root: Existing directory the paths are relative to
+        paths: Directories to create, their parents are created as well
+    """
+    directories: set[pathlib.PurePath] = set()
+    for path in map(pathlib.PurePath, paths):
+        directories.add(path)
+        directories.update(parent for parent in path.parents if parent.parts)
+    for directory in sorted(directories, key=lambda directory: directory.parts):
+        with contextlib.suppress(FileExistsError):
+            os.mkdir(root / directory)
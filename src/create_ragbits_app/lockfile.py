@@ -0,0 +1,105 @@
+"""
+Project lockfile for create-ragbits-app.
+
+The lockfile is written to the root of every generated project and records everything needed to
+render the project again: the template, the answers, the generator and ragbits versions, and a
+hash of every rendered file, which lets updates tell apart files edited by the user.
+"""
+
+import hashlib
+import json
+import pathlib
+from enum import Enum
+from typing import Any
+
+from create_ragbits_app.rendering import get_package_version
+from create_ragbits_app.resources import map_file
+from create_ragbits_app.template_config_base import TemplateConfig
+
+LOCKFILE_NAME = ".ragbits-app.lock"
+LOCKFILE_VERSION = 1
+
+# Template source of projects created from the templates shipped with the package
+BUNDLED_TEMPLATE_SOURCE = "bundled"
+
+# Context keys holding the UI options of the project
+UI_OPTION_KEYS = ("ui_type", "framework", "ui_project_name")
+
+
+def hash_bytes(data: bytes) -> str:
+    """Get the hash of file contents, as stored in the lockfile."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: pathlib.Path) -> str:
+    """Get the hash of a file on disk or inside the package archive, as stored in the lockfile."""
+    with map_file(path) as data:
+        return hashlib.sha256(data).hexdigest()
+
+
+def _to_plain_value(value: Any) -> Any:  # noqa: ANN401
+    return value.value if isinstance(value, Enum) else value
+
+
+def build_lockfile(
+    template_name: str,
+    template_config: TemplateConfig,
+    shared_config: TemplateConfig,
+    context: dict[str, Any],
+    files: dict[str, str],
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+) -> dict[str, Any]:
+    """
+    Build the lockfile of a generated project.
+
+    Args:
+        template_name: Name of the template the project was created from
+        template_config: Configuration of the template
+        shared_config: Configuration of the shared template
+        context: Context the project was rendered with
+        files: Hashes of the rendered files, keyed by their POSIX path relative to the project root
+        template_source: Specification of the template source the template was found in
+
+    Returns:
+        The lockfile contents
+    """
+    questions = [*template_config.questions, *shared_config.questions]
+    return {
+        "lockfile_version": LOCKFILE_VERSION,
+        "generator_version": get_package_version(),
+        "template": template_name,
+        "template_source": template_source,
+        "project_name": context["project_name"],
+        "ragbits_version": context.get("ragbits_version"),
+        "answers": {q.name: context[q.name] for q in questions if q.name in context},
+        "ui": {key: _to_plain_value(context[key]) for key in UI_OPTION_KEYS if key in context},
+        "files": dict(sorted(files.items())),
+    }
+
+
+def dump_lockfile(lockfile: dict[str, Any]) -> bytes:
+    """Serialize the lockfile to the contents of its file."""
+    return (json.dumps(lockfile, indent=2) + "\n").encode()
+
+
+def write_lockfile(project_path: pathlib.Path, lockfile: dict[str, Any]) -> None:
+    """Write the lockfile to the project root."""
+    (project_path / LOCKFILE_NAME).write_bytes(dump_lockfile(lockfile))
+
+
+def load_lockfile(project_path: pathlib.Path) -> dict[str, Any]:
+    """
+    Load the lockfile of a generated project.
+
+    Raises:
+        ValueError: If the project has no lockfile or it has an unsupported format
+    """
+    try:
+        with open(project_path / LOCKFILE_NAME) as f:
+            lockfile = json.load(f)
+    except FileNotFoundError as e:
+        raise ValueError(f"No {LOCKFILE_NAME} found in {project_path}, was it created with create-ragbits-app?") from e
+
+    if lockfile.get("lockfile_version") != LOCKFILE_VERSION:
+        raise ValueError(f"Unsupported lockfile version: {lockfile.get('lockfile_version')}")
+    return lockfile
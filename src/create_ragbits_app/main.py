@@ -1,32 +1,22 @@
+import argparse
 import asyncio
 import os
+import pathlib
+import sys
 
-import aiohttp
-from aiohttp import ClientTimeout
-from jinja2.filters import FILTERS
-
+from create_ragbits_app.lockfile import LOCKFILE_NAME
+from create_ragbits_app.report import DEFAULT_TREE_DEPTH, GenerationReport
+from create_ragbits_app.template_sources import get_template_sources, list_source_templates
 from create_ragbits_app.template_utils import (
+    build_project_context,
     create_project,
-    deep_merge_dicts,
-    get_available_templates,
+    get_shared_config,
     get_template_config,
     prompt_template_questions,
 )
 from create_ragbits_app.ui import display_logo
 from create_ragbits_app.ui_generator import Template_Type, UI_Type, UIOptions, generate_ui
-
-FILTERS["python_safe"] = lambda value: value.replace("-", "_")
-
-
-async def get_latest_ragbits_version() -> str:
-    """Fetch the latest version of ragbits from PyPI or return a default version if unavailable."""
-    url = "https://pypi.org/pypi/ragbits/json"
-    try:
-        async with aiohttp.ClientSession(timeout=ClientTimeout(total=1)) as session, session.get(url) as response:
-            response_json = await response.json()
-            return response_json["info"]["version"]
-    except TimeoutError:
-        return "0.10.0"
+from create_ragbits_app.versions import get_version_resolver
 
 
 def prompt_ui_options() -> UIOptions:
@@ -65,19 +55,40 @@ def prompt_ui_options() -> UIOptions:
     return ui_options
 
 
-async def run() -> None:
-    """Guide the user through template selection and project creation process."""
-    version = await get_latest_ragbits_version()
-    display_logo(version)
-
-    # Get available templates
-    templates = get_available_templates()
+async def run(
+    tree_depth: int = DEFAULT_TREE_DEPTH,
+    report_json: pathlib.Path | None = None,
+    trace: pathlib.Path | None = None,
+    template_sources: list[str] | None = None,
+) -> None:
+    """
+    Guide the user through template selection and project creation process.
+
+    Args:
+        tree_depth: Number of directory levels of the project structure to print
+        report_json: File to export the generation report to as JSON
+        trace: File to export the generation phases and file renders to as a Chrome trace
+        template_sources: Specifications of template sources to offer templates from, besides the bundled ones
+    """
+    report = GenerationReport()
+
+    # Resolve versions in the background while the user answers the prompts
+    version_resolver = get_version_resolver()
+    version_resolver.start()
+    display_logo(version_resolver.cached_version("ragbits"))
+
+    # Get available templates of all sources, from their local indexes
+    with report.phase("config load"):
+        templates = list_source_templates(get_template_sources(template_sources))
     if not templates:
         print("No templates found. Please create templates in the 'templates' directory.")
         return
 
     # Create template choices with name and description
-    template_choices = [f"{t['name']} - {t['description']}" if t["description"] else t["name"] for t in templates]
+    template_choices = [
+        f"{t.metadata.name} - {t.metadata.description}" if t.metadata.description else t.metadata.name
+        for t in templates
+    ]
 
     # Let user select a template
     from inquirer.shortcuts import list_input, text
@@ -86,7 +97,8 @@ async def run() -> None:
 
     # Get the directory name from the selection
     selected_idx = template_choices.index(selected_template_str)
-    selected_template = templates[selected_idx]["dir_name"]
+    selected_template = templates[selected_idx].metadata.dir_name
+    template_source = templates[selected_idx].source
 
     # Get project name
     project_name = text("Project name", default=f"ragbits-{selected_template}")
@@ -95,48 +107,203 @@ async def run() -> None:
     # Check if directory exists and is not empty
     if os.path.exists(project_path) and os.listdir(project_path):
         print(f"Directory '{project_name}' already exists and is not empty. Project creation aborted.")
+        if os.path.exists(os.path.join(project_path, LOCKFILE_NAME)):
+            print(f"To update it, run: create-ragbits-app update {project_name}")
         return
 
     # Get UI options
     ui_options = prompt_ui_options()
 
-    # Get template config and prompt for questions
-    template_config = get_template_config(selected_template)
+    # Fetch the template if it comes from a remote source, get its config and prompt for questions
+    with report.phase("config load"):
+        try:
+            templates_dir = template_source.get_templates_dir(selected_template)
+        except ValueError as e:
+            print(f"Project creation aborted: {e}")
+            return
+        template_config = get_template_config(selected_template, templates_dir)
+        shared_config = get_shared_config(templates_dir)
     answers = prompt_template_questions(template_config)
-
-    shared_config = get_template_config("shared")
     shared_answers = prompt_template_questions(shared_config)
 
-    # Detect Python version
-    import sys
+    # Create context for template rendering
+    with report.phase("version lookup"):
+        version = (await version_resolver.resolve_async("ragbits")).version
+    context = build_project_context(
+        project_name, template_config, shared_config, answers, shared_answers, ui_options, version
+    )
 
-    python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+    # Create project from template
+    create_project(
+        selected_template,
+        project_path,
+        context,
+        templates_dir=templates_dir,
+        report=report,
+        tree_depth=tree_depth,
+        template_source=template_source.spec,
+    )
 
-    # Create base context for template rendering
-    context = {
-        "project_name": project_name,
-        "pkg_name": project_name.replace("-", "_"),
-        "ragbits_version": version,
-        "python_version": python_version,
-        **answers,
-        **ui_options,
-        **shared_answers,
-    }
+    # Generate UI based on user selection
+    with report.phase("ui"):
+        generate_ui(project_path, context)
 
-    # Build additional context using template config's build_context method
-    additional_context = template_config.build_context(context)
-    context.update(additional_context)
-    # Build additional context using shared template config's build_context method
-    additional_shared_context = shared_config.build_context(context)
-    context = deep_merge_dicts(context, additional_shared_context)
+    report.print_phases()
+    if report_json:
+        report.write_json(report_json)
+    if trace:
+        report.write_chrome_trace(trace)
 
-    # Create project from template
-    create_project(selected_template, project_path, context)
 
-    # Generate UI based on user selection
-    generate_ui(project_path, context)
+async def run_batch_command(
+    answers_file: pathlib.Path, output_dir: pathlib.Path, template_sources: list[str] | None = None
+) -> int:
+    """Generate all projects from an answers file without prompting."""
+    from create_ragbits_app.batch import run_batch
+
+    version = (await get_version_resolver().resolve_async("ragbits")).version
+    return run_batch(answers_file, output_dir, version, get_template_sources(template_sources))
+
+
+async def run_update_command(
+    project_path: pathlib.Path, answers_file: pathlib.Path | None, upgrade_ragbits: bool, dry_run: bool
+) -> int:
+    """Update a generated project in place, returning the number of conflicting files."""
+    from create_ragbits_app.batch import load_answers_file
+    from create_ragbits_app.update import print_update_summary, update_project
+
+    answers = None
+    if answers_file is not None:
+        answers = load_answers_file(answers_file)[0]
+        answers = answers.get("answers", answers)
+    version = (await get_version_resolver().resolve_async("ragbits")).version if upgrade_ragbits else None
+
+    try:
+        result = update_project(project_path, answers, version, dry_run)
+    except ValueError as e:
+        print(f"Project update aborted: {e}")
+        return 1
+    print_update_summary(result, dry_run)
+    return len(result.conflicts)
+
+
+async def run_watch_command(
+    answers_file: pathlib.Path,
+    output_dir: pathlib.Path,
+    interval: float,
+    template_sources: list[str] | None = None,
+) -> int:
+    """Render the project of an answers file and keep re-rendering it as its templates change."""
+    from create_ragbits_app.batch import load_answers_file
+    from create_ragbits_app.template_sources import find_template
+    from create_ragbits_app.watch import watch_project
+
+    try:
+        project = load_answers_file(answers_file)[0]
+    except (OSError, ValueError) as e:
+        print(f"Watch aborted: {e}")
+        return 1
+    template_name = project.get("template", "")
+    template = find_template(template_name, get_template_sources(template_sources))
+    if template is None:
+        print(f"Watch aborted: the answers file must select one of the available templates, got '{template_name}'")
+        return 1
+
+    version = (await get_version_resolver().resolve_async("ragbits")).version
+    project_path = output_dir / project.get("path", project.get("project_name", template_name))
+    try:
+        templates_dir = template.source.get_templates_dir(template_name)
+        watch_project(template_name, answers_file, project_path, version, templates_dir, template.source.spec, interval)
+    except ValueError as e:
+        print(f"Watch aborted: {e}")
+        return 1
+    return 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments, running interactively when no command is given."""
+    parser = argparse.ArgumentParser(prog="create-ragbits-app", description="Set up a modern LLM app")
+    parser.add_argument(
+        "--tree-depth", type=int, default=DEFAULT_TREE_DEPTH, help="Directory levels of the project structure to show"
+    )
+    parser.add_argument("--report-json", type=pathlib.Path, help="Export the generation report as JSON")
+    parser.add_argument("--trace", type=pathlib.Path, help="Export generation timings as a Chrome trace")
+    parser.add_argument("--profile", type=pathlib.Path, help="Profile the command with cProfile into this file")
+    parser.add_argument(
+        "--template-source",
+        action="append",
+        dest="template_sources",
+        metavar="SOURCE",
+        help="Also offer templates from a directory, git+<url>[@<ref>][#<subdirectory>] or an HTTP index URL",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Generate projects from a YAML or JSON answers file")
+    batch_parser.add_argument("answers_file", type=pathlib.Path, help="File with one or many project answer sets")
+    batch_parser.add_argument(
+        "--output-dir", type=pathlib.Path, default=pathlib.Path(), help="Directory to create the projects in"
+    )
+
+    update_parser = subparsers.add_parser("update", help="Re-render a generated project, keeping your changes")
+    update_parser.add_argument(
+        "project_dir", type=pathlib.Path, nargs="?", default=pathlib.Path(), help="Project to update"
+    )
+    update_parser.add_argument(
+        "--answers-file", type=pathlib.Path, help="YAML or JSON file with answers overriding the recorded ones"
+    )
+    update_parser.add_argument(
+        "--upgrade-ragbits", action="store_true", help="Render the latest ragbits version into the project"
+    )
+    update_parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+
+    verify_parser = subparsers.add_parser("verify", help="Render and check templates over every combination of answers")
+    verify_parser.add_argument("templates", nargs="*", help="Templates to verify, all templates by default")
+    verify_parser.add_argument("--workers", type=int, help="Number of worker processes, all CPUs by default")
+
+    watch_parser = subparsers.add_parser("watch", help="Render a project and re-render it as its templates change")
+    watch_parser.add_argument(
+        "answers_file", type=pathlib.Path, help="YAML or JSON file with the template and answers of one project"
+    )
+    watch_parser.add_argument(
+        "--output-dir", type=pathlib.Path, default=pathlib.Path(), help="Directory to render the project in"
+    )
+    watch_parser.add_argument(
+        "--interval", type=float, default=0.2, help="Seconds between two checks of the templates for changes"
+    )
+
+    return parser.parse_args(argv)
+
+
+def run_command(args: argparse.Namespace) -> int:
+    """Run the command selected on the command line and return the process exit code."""
+    if args.command == "batch":
+        return 1 if asyncio.run(run_batch_command(args.answers_file, args.output_dir, args.template_sources)) else 0
+    if args.command == "verify":
+        from create_ragbits_app.verify import print_verify_result, verify_templates
+
+        result = verify_templates(args.templates or None, args.workers)
+        print_verify_result(result)
+        return 1 if result.failures else 0
+    if args.command == "watch":
+        return asyncio.run(run_watch_command(args.answers_file, args.output_dir, args.interval, args.template_sources))
+    if args.command == "update":
+        update = run_update_command(args.project_dir, args.answers_file, args.upgrade_ragbits, args.dry_run)
+        return 1 if asyncio.run(update) else 0
+    asyncio.run(run(args.tree_depth, args.report_json, args.trace, args.template_sources))
+    return 0
 
 
 def entrypoint() -> None:
     """Serve as the main entry point for the application by running the async workflow."""
-    asyncio.run(run())
+    args = parse_args()
+    if not args.profile:
+        sys.exit(run_command(args))
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        exit_code = profiler.runcall(run_command, args)
+    finally:
+        profiler.dump_stats(args.profile)
+    sys.exit(exit_code)
@@ -0,0 +1,182 @@
+"""
+Template manifests for create-ragbits-app.
+
+This module provides functionality for:
+1. Building a manifest of every file and directory in a template, cached on first use
+2. Persisting manifests on disk, revalidated by directory modification times instead of a full walk
+3. Resolving conditional directory rules with a prefix tree lookup per path
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from create_ragbits_app.rendering import get_cache_dir, get_package_version
+from create_ragbits_app.resources import get_mtime_ns, walk
+
+# Entries that never belong to a generated project
+IGNORED_NAMES = ("template_config.py", "__pycache__", ".DS_Store")
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """A single file or directory of a template."""
+
+    path: str
+    """Path relative to the template root, in POSIX form."""
+    is_jinja: bool = False
+    """Whether the file is a Jinja2 template (`.j2`) that has to be rendered."""
+    has_jinja_segments: bool = False
+    """Whether any segment of the path contains a Jinja2 expression (e.g. `{{pkg_name}}`)."""
+
+    @property
+    def parts(self) -> tuple[str, ...]:
+        """Path segments of the entry."""
+        return tuple(self.path.split("/"))
+
+
+@dataclass
+class TemplateManifest:
+    """Precomputed listing of a template directory."""
+
+    directories: list[ManifestEntry] = field(default_factory=list)
+    files: list[ManifestEntry] = field(default_factory=list)
+    fingerprint: dict[str, int] = field(default_factory=dict)
+    """Modification times (ns) of every directory in the template, used to detect added or removed entries."""
+
+    def is_fresh(self, root: pathlib.Path) -> bool:
+        """Check whether the manifest still matches the directory structure of the template."""
+        try:
+            return all(get_mtime_ns(root / rel_dir) == mtime for rel_dir, mtime in self.fingerprint.items())
+        except OSError:
+            return False
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the manifest to a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TemplateManifest":
+        """Create a manifest from its dictionary representation."""
+        return cls(
+            directories=[ManifestEntry(**entry) for entry in data["directories"]],
+            files=[ManifestEntry(**entry) for entry in data["files"]],
+            fingerprint=data["fingerprint"],
+        )
+
+
+class _PrefixTreeNode:
+    def __init__(self) -> None:
+        self.children: dict[str, _PrefixTreeNode] = {}
+        self.context_vars: list[str] = []
+
+
+class ConditionalPrefixTree:
+    """
+    Prefix tree over path segments, mapping directories to the context variables that control their inclusion.
+
+    Every path is resolved with a single walk down the tree, instead of comparing it against each rule.
+    """
+
+    def __init__(self, *rules: dict[str, str]):
+        self._root = _PrefixTreeNode()
+        for rule_set in rules:
+            for dir_name, context_var in rule_set.items():
+                node = self._root
+                for part in pathlib.PurePosixPath(dir_name).parts:
+                    node = node.children.setdefault(part, _PrefixTreeNode())
+                node.context_vars.append(context_var)
+
+    def is_included(self, parts: tuple[str, ...], context: dict[str, Any]) -> bool:
+        """Check whether every conditional directory on the path is enabled in the context."""
+        node = self._root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                return True
+            node = child
+            if not all(context.get(context_var, False) for context_var in node.context_vars):
+                return False
+        return True
+
+
+def _has_jinja_segments(parts: tuple[str, ...]) -> bool:
+    return any("{{" in part and "}}" in part for part in parts)
+
+
+def build_template_manifest(root: pathlib.Path) -> TemplateManifest:
+    """Walk a template directory, on disk or inside the package archive, and build its manifest."""
+    manifest = TemplateManifest(fingerprint={".": get_mtime_ns(root)})
+    for entry_path, is_dir in walk(root):
+        parts = tuple(entry_path.split("/"))
+        if any(part in IGNORED_NAMES for part in parts):
+            continue
+
+        if is_dir:
+            manifest.directories.append(ManifestEntry(path=entry_path, has_jinja_segments=_has_jinja_segments(parts)))
+            manifest.fingerprint[entry_path] = get_mtime_ns(root / entry_path)
+        else:
+            manifest.files.append(
+                ManifestEntry(
+                    path=entry_path,
+                    is_jinja=entry_path.endswith(".j2"),
+                    has_jinja_segments=_has_jinja_segments(parts),
+                )
+            )
+    return manifest
+
+
+def _get_manifest_cache_path(root: pathlib.Path) -> pathlib.Path:
+    root_hash = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:16]
+    return get_cache_dir() / "manifests" / get_package_version() / f"{root.name}-{root_hash}.json"
+
+
+def _load_cached_manifest(root: pathlib.Path) -> TemplateManifest | None:
+    try:
+        with open(_get_manifest_cache_path(root)) as f:
+            return TemplateManifest.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cached_manifest(root: pathlib.Path, manifest: TemplateManifest) -> None:
+    cache_path = _get_manifest_cache_path(root)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest.to_dict(), f)
+        tmp_path.replace(cache_path)
+    except OSError:
+        pass
+
+
+_manifests: dict[pathlib.Path, TemplateManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_template_manifest(root: pathlib.Path) -> TemplateManifest:
+    """
+    Get the manifest of a template directory.
+
+    The manifest is kept in memory and on disk, and is rebuilt only when the directory structure changes.
+
+    Args:
+        root: Root directory of the template
+
+    Returns:
+        The manifest listing every file and directory of the template
+    """
+    with _manifests_lock:
+        manifest = _manifests.get(root)
+        if manifest is None or not manifest.is_fresh(root):
+            manifest = _load_cached_manifest(root)
+            if manifest is None or not manifest.is_fresh(root):
+                manifest = build_template_manifest(root)
+                _save_cached_manifest(root, manifest)
+            _manifests[root] = manifest
+        return manifest
@@ -0,0 +1,337 @@
+"""
+Structured merging of files provided by several template layers.
+
+This module provides functionality for:
+1. Choosing a merge strategy by the type of the target file (compose, pyproject.toml, .env, Grafana provisioning)
+2. Parsing every layer once and merging the parsed documents in memory
+3. Serializing each merged file only once, using the libyaml C loader and dumper when available
+"""
+
+import json
+import re
+import tomllib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from pathlib import PurePosixPath
+from typing import Any
+
+from rich.console import Console
+
+console = Console()
+
+# File names that are merged instead of overridden when several templates provide them
+COMPOSE_FILE_NAMES = ("docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml")
+
+# Tables and keys of pyproject.toml holding lists of dependencies
+PYPROJECT_DEPENDENCY_TABLES = ("project.optional-dependencies", "dependency-groups")
+PYPROJECT_DEPENDENCY_KEYS = (("project", "dependencies"), ("tool.uv", "dev-dependencies"))
+
+ENV_LINE_PATTERN = re.compile(r"^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=")
+REQUIREMENT_NAME_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def deep_merge_dicts(dict1: dict[str, Any], dict2: dict[str, Any]) -> dict[str, Any]:
+    """Deep merge two dictionaries, with dict2 values taking precedence."""
+    result = dict1.copy()
+
+    for key, value in dict2.items():
+        if key in result:
+            if isinstance(result[key], dict) and isinstance(value, dict):
+                # Recursively merge nested dictionaries
+                result[key] = deep_merge_dicts(result[key], value)
+            elif isinstance(result[key], list) and isinstance(value, list):
+                # For lists, we'll concatenate and remove duplicates (if they're simple values)
+                if all(isinstance(item, (str, int, float)) for item in result[key] + value):
+                    # Simple list - remove duplicates while preserving order
+                    seen = set()
+                    merged_list = []
+                    for item in result[key] + value:
+                        if item not in seen:
+                            seen.add(item)
+                            merged_list.append(item)
+                    result[key] = merged_list
+                else:
+                    # Complex list - just concatenate
+                    result[key] = result[key] + value
+            else:
+                # For other types, dict2 value takes precedence
+                result[key] = value
+        else:
+            result[key] = value
+
+    return result
+
+
+def _merge_named_items(items1: list[Any], items2: list[Any], get_name: Any) -> list[Any]:  # noqa: ANN401
+    """Merge two lists of items identified by name, later items replacing earlier ones in place."""
+    merged = {get_name(item): item for item in items1}
+    merged.update({get_name(item): item for item in items2})
+    return list(merged.values())
+
+
+class FileMerger(ABC):
+    """Strategy for merging one type of file, working on parsed documents."""
+
+    description: str
+
+    @abstractmethod
+    def matches(self, path: PurePosixPath) -> bool:
+        """Check whether the strategy handles the file at the given project path."""
+
+    @abstractmethod
+    def parse(self, content: str) -> Any:  # noqa: ANN401
+        """Parse the content of a single layer."""
+
+    @abstractmethod
+    def merge(self, base: Any, overlay: Any) -> Any:  # noqa: ANN401
+        """Merge a parsed layer on top of the document merged so far."""
+
+    @abstractmethod
+    def dump(self, document: Any) -> str:  # noqa: ANN401
+        """Serialize the merged document."""
+
+
+class YamlMerger(FileMerger, ABC):
+    """Base strategy for YAML files, parsed with the libyaml C bindings when they are available."""
+
+    def parse(self, content: str) -> Any:  # noqa: ANN401
+        """Parse a YAML layer."""
+        import yaml
+
+        return yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))  # noqa: S506
+
+    def dump(self, document: Any) -> str:  # noqa: ANN401
+        """Serialize the merged YAML document, with a document separator at the beginning."""
+        import yaml
+
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        return f"---\n{yaml.dump(document, Dumper=dumper, default_flow_style=False, sort_keys=False)}"
+
+
+class ComposeMerger(YamlMerger):
+    """Deep merges docker-compose files, so every layer can add services, volumes and settings."""
+
+    description = "docker-compose files"
+
+    def matches(self, path: PurePosixPath) -> bool:
+        """Check whether the file is a docker-compose file."""
+        return path.name in COMPOSE_FILE_NAMES
+
+    def merge(self, base: Any, overlay: Any) -> Any:  # noqa: ANN401
+        """Deep merge compose documents."""
+        return deep_merge_dicts(base or {}, overlay or {})
+
+
+class GrafanaProvisioningMerger(YamlMerger):
+    """Merges Grafana provisioning files, combining datasources, providers etc. by their name."""
+
+    description = "Grafana provisioning files"
+
+    def matches(self, path: PurePosixPath) -> bool:
+        """Check whether the file is a Grafana provisioning file."""
+        return "provisioning" in path.parts[:-1] and "grafana" in path.parts[:-1] and path.suffix in {".yml", ".yaml"}
+
+    def merge(self, base: Any, overlay: Any) -> Any:  # noqa: ANN401
+        """Merge provisioning documents, with entries of the same name replaced by the later layer."""
+        merged = dict(base or {})
+        for key, value in (overlay or {}).items():
+            existing = merged.get(key)
+            if isinstance(existing, list) and isinstance(value, list):
+                merged[key] = _merge_named_items(
+                    existing, value, lambda item: item.get("name") if isinstance(item, dict) else repr(item)
+                )
+            else:
+                merged[key] = value
+        return merged
+
+
+class EnvMerger(FileMerger):
+    """Merges .env files, with variables of later layers replacing earlier ones in place."""
+
+    description = ".env files"
+
+    def matches(self, path: PurePosixPath) -> bool:
+        """Check whether the file is a .env file."""
+        return path.name == ".env" or path.name.startswith(".env.") or path.suffix == ".env"
+
+    def parse(self, content: str) -> list[str]:
+        """Split a .env layer into lines."""
+        return content.splitlines()
+
+    def merge(self, base: list[str], overlay: list[str]) -> list[str]:
+        """Merge .env lines, appending new variables and comments at the end."""
+        merged = list(base)
+        positions = {match.group(1): i for i, line in enumerate(merged) if (match := ENV_LINE_PATTERN.match(line))}
+        existing_lines = set(merged)
+        for line in overlay:
+            match = ENV_LINE_PATTERN.match(line)
+            if match and match.group(1) in positions:
+                merged[positions[match.group(1)]] = line
+            elif match:
+                positions[match.group(1)] = len(merged)
+                merged.append(line)
+            elif line.strip() and line not in existing_lines:
+                merged.append(line)
+        return merged
+
+    def dump(self, document: list[str]) -> str:
+        """Join the .env lines."""
+        return "\n".join(document) + "\n"
+
+
+def _normalize_requirement_name(requirement: str) -> str:
+    match = REQUIREMENT_NAME_PATTERN.match(requirement)
+    name = match.group(1) if match else requirement
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _find_array_end(text: str, start: int) -> int:
+    """Find the index of the bracket closing the TOML array opened at the given index, skipping strings."""
+    depth, i, quote = 0, start, ""
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\" and quote == '"':
+                i += 1
+            elif char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char == "#":
+            i = text.find("\n", i)
+            if i == -1:
+                break
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unterminated TOML array")
+
+
+def _format_toml_array(items: list[str]) -> str:
+    # JSON strings are valid TOML basic strings, escaping quotes of environment markers and backslashes
+    lines = "".join(f"    {json.dumps(item)},\n" for item in items)
+    return f"[\n{lines}]"
+
+
+def _set_toml_array(text: str, table: str, key: str, items: list[str]) -> str:
+    """Replace (or add) a string array in a TOML document, keeping the rest of the text untouched."""
+    header = re.search(rf"^\[{re.escape(table)}\]\s*$", text, re.MULTILINE)
+    if header is None:
+        return f"{text.rstrip()}\n\n[{table}]\n{key} = {_format_toml_array(items)}\n"
+
+    next_header = re.compile(r"^\[", re.MULTILINE).search(text, header.end())
+    table_end = next_header.start() if next_header else len(text)
+    quoted_key = re.escape(key) if re.fullmatch(r"[A-Za-z0-9_-]+", key) else re.escape(f'"{key}"')
+    assignment = re.compile(rf"^{quoted_key}\s*=\s*(?=\[)", re.MULTILINE).search(text, header.end(), table_end)
+    if assignment is None:
+        return f"{text[: header.end()]}\n{key} = {_format_toml_array(items)}{text[header.end() :]}"
+
+    array_end = _find_array_end(text, assignment.end())
+    return f"{text[: assignment.end()]}{_format_toml_array(items)}{text[array_end + 1 :]}"
+
+
+class PyprojectMerger(FileMerger):
+    """
+    Merges dependency lists of pyproject.toml files.
+
+    The latest layer provides the document, with dependencies of earlier layers added to its dependency lists.
+    Only the lists that changed are rewritten, so the formatting of the rest of the file is kept.
+    """
+
+    description = "pyproject.toml dependencies"
+
+    def matches(self, path: PurePosixPath) -> bool:
+        """Check whether the file is a pyproject.toml file."""
+        return path.name == "pyproject.toml"
+
+    @staticmethod
+    def _get_dependency_lists(data: dict[str, Any]) -> dict[tuple[str, str], list[str]]:
+        lists = {}
+        for table, key in PYPROJECT_DEPENDENCY_KEYS:
+            value: Any = data
+            for part in [*table.split("."), key]:
+                value = value.get(part, {}) if isinstance(value, dict) else {}
+            if isinstance(value, list):
+                lists[table, key] = value
+        for table in PYPROJECT_DEPENDENCY_TABLES:
+            value = data
+            for part in table.split("."):
+                value = value.get(part, {}) if isinstance(value, dict) else {}
+            for key, items in value.items():
+                if isinstance(items, list) and all(isinstance(item, str) for item in items):
+                    lists[table, key] = items
+        return lists
+
+    def parse(self, content: str) -> tuple[str, dict[tuple[str, str], list[str]]]:
+        """Parse a pyproject.toml layer into its text and dependency lists."""
+        return content, self._get_dependency_lists(tomllib.loads(content))
+
+    def merge(
+        self, base: tuple[str, dict[tuple[str, str], list[str]]], overlay: tuple[str, dict[tuple[str, str], list[str]]]
+    ) -> tuple[str, dict[tuple[str, str], list[str]]]:
+        """Merge dependency lists, with requirements of later layers replacing ones for the same package."""
+        lists = dict(base[1])
+        for location, items in overlay[1].items():
+            lists[location] = _merge_named_items(lists.get(location, []), items, _normalize_requirement_name)
+        return overlay[0], lists
+
+    def dump(self, document: tuple[str, dict[tuple[str, str], list[str]]]) -> str:
+        """Write the merged dependency lists into the text of the latest layer."""
+        text, lists = document
+        current = self._get_dependency_lists(tomllib.loads(text))
+        for (table, key), items in lists.items():
+            if current.get((table, key)) != items:
+                text = _set_toml_array(text, table, key, items)
+        return text
+
+
+MERGERS: tuple[FileMerger, ...] = (ComposeMerger(), GrafanaProvisioningMerger(), EnvMerger(), PyprojectMerger())
+
+
+def get_merger(path: PurePosixPath) -> FileMerger | None:
+    """Get the merge strategy for a file at the given project path, or None if it is overridden by later layers."""
+    return next((merger for merger in MERGERS if merger.matches(path)), None)
+
+
+def merge_layers(path: PurePosixPath, layers: Sequence[str], verbose: bool = True) -> str:
+    """
+    Merge the contents of a file provided by several template layers.
+
+    Every layer is parsed once and merged in memory, and the result is serialized once. A layer that cannot be
+    parsed or merged overrides everything before it.
+
+    Args:
+        path: Path of the file in the project
+        layers: Rendered contents of the file, in the order of the template layers
+        verbose: Whether to report merged files and merge failures on the console
+
+    Returns:
+        The merged file contents
+    """
+    merger = get_merger(path)
+    if merger is None or len(layers) == 1:
+        return layers[-1]
+
+    text, document = layers[0], None
+    merged = False
+    for layer in layers[1:]:
+        try:
+            if document is None:
+                document = merger.parse(text)
+            document = merger.merge(document, merger.parse(layer))
+            merged = True
+        except Exception as e:
+            if verbose:
+                console.print(f"[yellow]Warning: Could not merge {merger.description} at {path}: {e}[/yellow]")
+            # If merging fails, the new content overrides
+            text, document, merged = layer, None, False
+
+    if not merged or document is None:
+        return text
+    if verbose:
+        console.print(f"[cyan]Merged {merger.description} at {path}[/cyan]")
+    return merger.dump(document)
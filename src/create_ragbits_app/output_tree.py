@@ -0,0 +1,234 @@
+"""
+In-memory output tree for create-ragbits-app.
+
+This module provides functionality for:
+1. Collecting the rendered files of a project in memory, before anything is written to disk
+2. Flushing the whole tree in one batched pass into a staging directory
+3. Moving the staging directory into place atomically, so a failed generation leaves nothing behind
+4. Serializing the tree as a tar or zip archive, streamed in chunks without writing anything to disk
+"""
+
+import io
+import os
+import pathlib
+import secrets
+import shutil
+import stat
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import IO
+
+from create_ragbits_app.copying import copy_file, make_directories
+from create_ragbits_app.lockfile import hash_bytes, hash_file
+from create_ragbits_app.resources import is_archived, read_bytes
+
+# Formats the tree can be serialized as
+ARCHIVE_FORMATS = ("tar", "tar.gz", "zip")
+
+# Size of the chunks an archive is streamed in
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+DEFAULT_FILE_MODE = 0o644
+DIRECTORY_MODE = 0o755
+
+
+@dataclass(frozen=True)
+class OutputFile:
+    """A file of the output tree, either rendered content or a static file copied as-is."""
+
+    content: bytes | None = None
+    source: pathlib.Path | None = None
+
+    def get_hash(self) -> str:
+        """Get the hash of the file contents, as stored in the lockfile."""
+        if self.content is not None:
+            return hash_bytes(self.content)
+        return hash_file(self.source)  # type: ignore[arg-type]
+
+    def read(self) -> bytes:
+        """Get the file contents, reading static files from their source."""
+        if self.content is not None:
+            return self.content
+        return read_bytes(self.source)  # type: ignore[arg-type]
+
+    def get_mode(self) -> int:
+        """Get the permission bits of the file, static files on disk keep the ones of their source."""
+        if self.source is None or is_archived(self.source):
+            return DEFAULT_FILE_MODE
+        return stat.S_IMODE(self.source.stat().st_mode)
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Unseekable file object collecting everything written to it, until the written chunks are taken."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        """Take everything written since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+class OutputTree:
+    """Files of a generated project, keyed by their POSIX path relative to the project root."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, OutputFile] = {}
+        self.directories: set[str] = set()
+
+    def add_directory(self, path: str) -> None:
+        """Add a (possibly empty) directory to the tree."""
+        self.directories.add(path)
+
+    def add_content(self, path: str, content: bytes) -> None:
+        """Add a rendered file to the tree, replacing any file with the same path."""
+        self.files[path] = OutputFile(content=content)
+
+    def add_copy(self, path: str, source: pathlib.Path) -> None:
+        """Add a static file to the tree, replacing any file with the same path."""
+        self.files[path] = OutputFile(source=source)
+
+    def add_tree(self, prefix: str, tree: "OutputTree") -> None:
+        """Add all files and directories of another tree below a directory of this tree."""
+        self.add_directory(prefix)
+        self.directories.update(f"{prefix}/{directory}" for directory in tree.directories)
+        self.files.update({f"{prefix}/{path}": file for path, file in tree.files.items()})
+
+    def get_hashes(self) -> dict[str, str]:
+        """Get hashes of all files in the tree."""
+        return {path: file.get_hash() for path, file in self.files.items()}
+
+    def get_all_directories(self) -> list[str]:
+        """Get all directories of the tree, including the parents of every file, parents first."""
+        directories: set[pathlib.PurePosixPath] = set()
+        for path in [*self.directories, *self.files]:
+            pure_path = pathlib.PurePosixPath(path)
+            if path in self.directories:
+                directories.add(pure_path)
+            directories.update(parent for parent in pure_path.parents if parent.parts)
+        return [str(directory) for directory in sorted(directories, key=lambda directory: directory.parts)]
+
+    def iter_archive(
+        self, archive_format: str = "tar.gz", root: str = "", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Serialize the tree as an archive, yielding it in chunks as it is built.
+
+        Args:
+            archive_format: One of ARCHIVE_FORMATS
+            root: Directory all entries are placed in inside the archive, none by default
+            chunk_size: Minimum size of the yielded chunks, except the last one
+
+        Yields:
+            Consecutive chunks of the archive
+
+        Raises:
+            ValueError: If the archive format is not supported
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format '{archive_format}', expected one of {ARCHIVE_FORMATS}")
+
+        buffer = _ChunkBuffer()
+        prefix = f"{root.strip('/')}/" if root.strip("/") else ""
+        mtime = time.time()
+        entries: list[tuple[str, OutputFile | None]] = [
+            *((prefix + directory, None) for directory in self.get_all_directories()),
+            *((prefix + path, file) for path, file in sorted(self.files.items())),
+        ]
+
+        if archive_format == "zip":
+            import zipfile
+
+            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+                for name, file in entries:
+                    zip_info = zipfile.ZipInfo(name + "/" if file is None else name, time.localtime(mtime)[:6])
+                    mode = DIRECTORY_MODE if file is None else file.get_mode()
+                    zip_info.external_attr = ((stat.S_IFDIR if file is None else stat.S_IFREG) | mode) << 16
+                    zip_info.compress_type = zipfile.ZIP_STORED if file is None else zipfile.ZIP_DEFLATED
+                    zip_file.writestr(zip_info, b"" if file is None else file.read())
+                    if buffer.size >= chunk_size:
+                        yield buffer.take()
+        else:
+            import tarfile
+
+            tar_mode = "w|gz" if archive_format == "tar.gz" else "w|"
+            with tarfile.open(fileobj=buffer, mode=tar_mode) as tar_file:  # type: ignore[call-overload]
+                for name, file in entries:
+                    info = tarfile.TarInfo(name)
+                    info.mtime = int(mtime)
+                    if file is None:
+                        info.type, info.mode = tarfile.DIRTYPE, DIRECTORY_MODE
+                        tar_file.addfile(info)
+                    else:
+                        content = file.read()
+                        info.size, info.mode = len(content), file.get_mode()
+                        tar_file.addfile(info, io.BytesIO(content))
+                    if buffer.size >= chunk_size:
+                        yield buffer.take()
+
+        if data := buffer.take():
+            yield data
+
+    def write_archive(self, fileobj: IO[bytes], archive_format: str = "tar.gz", root: str = "") -> None:
+        """Write the tree as an archive into a binary file object."""
+        for chunk in self.iter_archive(archive_format, root):
+            fileobj.write(chunk)
+
+    def _write(self, root: pathlib.Path) -> None:
+        # Create each directory once, parents first
+        make_directories(root, [*self.directories, *(pathlib.PurePosixPath(path).parent for path in self.files)])
+
+        for path, file in self.files.items():
+            content = file.content
+            if content is None and file.source is not None and is_archived(file.source):
+                # Files inside the package archive cannot be copied by the kernel, their bytes are written instead
+                content = read_bytes(file.source)
+            if content is not None:
+                with open(root / path, "wb") as f:
+                    f.write(content)
+            else:
+                copy_file(file.source, root / path)  # type: ignore[arg-type]
+
+    def flush(self, target: pathlib.Path) -> None:
+        """
+        Write the tree into a new directory.
+
+        Files are written into a staging directory next to the target, which is renamed into place once
+        everything was written, so the target either holds the complete tree or is left untouched.
+
+        Args:
+            target: Directory to create, it must not exist or be empty
+
+        Raises:
+            FileExistsError: If the target directory is not empty
+        """
+        target = target.absolute()
+        if target.exists() and any(target.iterdir()):
+            raise FileExistsError(f"Directory '{target}' is not empty")
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Unlike tempfile.mkdtemp, os.mkdir respects the umask, so the project gets the usual permissions
+        staging = target.parent / f".{target.name}.{os.getpid()}.{secrets.token_hex(4)}.staging"
+        os.mkdir(staging)
+        try:
+            self._write(staging)
+            if target.exists():
+                # Renaming over an empty directory is not supported everywhere
+                target.rmdir()
+            staging.replace(target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
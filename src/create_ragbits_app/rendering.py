@@ -0,0 +1,161 @@
+"""
+Jinja2 rendering utilities for create-ragbits-app.
+
+This module provides functionality for:
+1. A shared Jinja2 environment with loaders rooted at the project and UI template directories
+2. A persistent on-disk bytecode cache keyed by the package version
+3. Memoized compilation of templated path segments (e.g. `{{pkg_name}}`)
+4. Static analysis of the context variables each template reads
+"""
+
+import functools
+import os
+import pathlib
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from create_ragbits_app.resources import PACKAGE_DIR, get_mtime_ns, read_text
+
+if TYPE_CHECKING:
+    import jinja2
+
+# Loader prefixes, each rooted at one of the template directories shipped with the package
+TEMPLATE_ROOTS = {
+    "templates": PACKAGE_DIR / "templates",
+    "ui": PACKAGE_DIR / "static" / "ui",
+}
+
+
+@functools.cache
+def get_package_version() -> str:
+    """Get the installed version of create-ragbits-app."""
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("create-ragbits-app")
+    except importlib.metadata.PackageNotFoundError:
+        return "0.0.0"
+
+
+def get_cache_dir() -> pathlib.Path:
+    """Get the directory used for persistent caches, honouring CREATE_RAGBITS_APP_CACHE_DIR and XDG_CACHE_HOME."""
+    if cache_dir := os.environ.get("CREATE_RAGBITS_APP_CACHE_DIR"):
+        return pathlib.Path(cache_dir)
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base_dir = pathlib.Path(xdg_cache_home) if xdg_cache_home else pathlib.Path.home() / ".cache"
+    return base_dir / "create-ragbits-app"
+
+
+def python_safe(value: str) -> str:
+    """Convert a project name into a valid Python identifier fragment."""
+    return value.replace("-", "_")
+
+
+def _get_bytecode_cache() -> "jinja2.BytecodeCache | None":
+    """Create an on-disk bytecode cache for the current package version, if the cache directory is writable."""
+    import jinja2
+
+    cache_dir = get_cache_dir() / "jinja2" / get_package_version()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return jinja2.FileSystemBytecodeCache(str(cache_dir))
+
+
+def _is_unchanged(path: pathlib.Path, mtime_ns: int) -> bool:
+    try:
+        return get_mtime_ns(path) == mtime_ns
+    except OSError:
+        return False
+
+
+def _load_template_source(root: pathlib.Path, name: str) -> tuple[str, str, Callable[[], bool]] | None:
+    """Load the source of a template below a template root, which may be inside the package archive."""
+    path = root.joinpath(*name.split("/"))
+    try:
+        mtime_ns = get_mtime_ns(path)
+        source = read_text(path)
+    except OSError:
+        return None
+    return source, str(path), functools.partial(_is_unchanged, path, mtime_ns)
+
+
+@functools.cache
+def get_environment() -> "jinja2.Environment":
+    """Get the Jinja2 environment shared by all project and UI template rendering."""
+    import jinja2
+
+    # Templates are loaded through the resources module rather than from the file system, so that they are also
+    # found when the package runs from a zip archive
+    loader = jinja2.PrefixLoader(
+        {
+            prefix: jinja2.FunctionLoader(functools.partial(_load_template_source, root))
+            for prefix, root in TEMPLATE_ROOTS.items()
+        },
+    )
+    environment = jinja2.Environment(loader=loader, bytecode_cache=_get_bytecode_cache())  # noqa: S701
+    environment.filters["python_safe"] = python_safe
+    return environment
+
+
+def _get_template_name(path: pathlib.Path) -> str | None:
+    """Map a template file path to its name in the shared loader, or None if it is outside all template roots."""
+    for prefix, root in TEMPLATE_ROOTS.items():
+        if path.is_relative_to(root):
+            return f"{prefix}/{path.relative_to(root).as_posix()}"
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_external_template(path: pathlib.Path, mtime_ns: int) -> "jinja2.Template":
+    """Compile a template file outside of the template roots, once per modification of the file."""
+    return get_environment().from_string(read_text(path))
+
+
+def get_template(path: pathlib.Path) -> "jinja2.Template":
+    """Get the compiled template for a file, loading it through the shared environment when possible."""
+    template_name = _get_template_name(path)
+    if template_name is None:
+        return _compile_external_template(path, get_mtime_ns(path))
+    return get_environment().get_template(template_name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _find_template_variables(path: pathlib.Path, mtime_ns: int) -> frozenset[str] | None:
+    """Analyze the variables of a template file once per modification of the file."""
+    from jinja2 import meta
+
+    ast = get_environment().parse(read_text(path))
+    if any(True for _ in meta.find_referenced_templates(ast)):
+        return None
+    return frozenset(meta.find_undeclared_variables(ast))
+
+
+def get_template_variables(path: pathlib.Path) -> frozenset[str] | None:
+    """
+    Get the context variables a template file reads.
+
+    Returns:
+        Names of the variables, or None if the template includes or extends other templates, whose variables
+        are not known
+    """
+    return _find_template_variables(path, get_mtime_ns(path))
+
+
+def render_file(path: pathlib.Path, context: dict[str, Any]) -> str:
+    """Render a template file with the given context."""
+    return get_template(path).render(**context)
+
+
+@functools.cache
+def _compile_path_segment(segment: str) -> "jinja2.Template":
+    """Compile a templated path segment once per process."""
+    return get_environment().from_string(segment)
+
+
+def render_path_segment(segment: str, context: dict[str, Any]) -> str:
+    """Render a single path segment, compiling it only if it contains a Jinja2 expression."""
+    if "{{" in segment and "}}" in segment:
+        return _compile_path_segment(segment).render(**context)
+    return segment
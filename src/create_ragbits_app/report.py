@@ -0,0 +1,203 @@
+"""
+Generation report for create-ragbits-app.
+
+This module provides functionality for:
+1. Recording wall time of every generation phase (config load, version lookup, render, write, UI)
+2. Recording render time, size and action (rendered, copied or merged) of every generated file
+3. Printing the report as a depth-limited tree and exporting it as JSON or a Chrome trace
+"""
+
+import contextlib
+import json
+import pathlib
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from rich.console import Console
+
+console = Console()
+
+# Directories deeper than this are collapsed into a summary line
+DEFAULT_TREE_DEPTH = 3
+
+# Order in which phases are reported, phases not listed here follow in the order they started
+PHASES = ("config load", "version lookup", "render", "write", "ui")
+
+
+@dataclass
+class FileRecord:
+    """What was written for a single file of the project."""
+
+    path: str
+    action: str
+    size: int
+    render_ms: float = 0.0
+    started_at: float = 0.0
+    thread_id: int = 0
+
+
+@dataclass
+class PhaseSpan:
+    """A single period of time spent in a generation phase."""
+
+    name: str
+    started_at: float
+    duration_ms: float
+
+
+def _format_size(size: int) -> str:
+    if size < 1024:  # noqa: PLR2004
+        return f"{size} B"
+    if size < 1024 * 1024:  # noqa: PLR2004
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+@dataclass
+class GenerationReport:
+    """Timings and file records collected while generating a project, without walking the project afterwards."""
+
+    project_path: str = ""
+    files: dict[str, FileRecord] = field(default_factory=dict)
+    spans: list[PhaseSpan] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the wall time of a generation phase, phases entered several times are summed."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = PhaseSpan(name, started_at, (time.perf_counter() - started_at) * 1000)
+            with self._lock:
+                self.spans.append(span)
+
+    def record_file(self, path: str, action: str, size: int, started_at: float = 0.0, finished_at: float = 0.0) -> None:
+        """Record a file of the project, with the time it took to render if it was rendered."""
+        record = FileRecord(
+            path=path,
+            action=action,
+            size=size,
+            render_ms=(finished_at - started_at) * 1000,
+            started_at=started_at,
+            thread_id=threading.get_ident(),
+        )
+        with self._lock:
+            self.files[path] = record
+
+    def get_phase_times(self) -> dict[str, float]:
+        """Get the total wall time of every phase in milliseconds."""
+        totals: dict[str, float] = {}
+        for span in sorted(self.spans, key=lambda span: span.started_at):
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return {
+            **{name: totals[name] for name in PHASES if name in totals},
+            **{name: total for name, total in totals.items() if name not in PHASES},
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary."""
+        return {
+            "project_path": self.project_path,
+            "phases_ms": self.get_phase_times(),
+            "total_bytes": sum(record.size for record in self.files.values()),
+            "files": [
+                {key: value for key, value in asdict(record).items() if key not in {"started_at", "thread_id"}}
+                for record in sorted(self.files.values(), key=lambda record: record.path)
+            ],
+        }
+
+    def write_json(self, path: pathlib.Path) -> None:
+        """Export the report as JSON."""
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def write_chrome_trace(self, path: pathlib.Path) -> None:
+        """Export phases and file renders in the Chrome trace event format (chrome://tracing, Perfetto)."""
+
+        def to_us(timestamp: float) -> float:
+            return (timestamp - self.started_at) * 1_000_000
+
+        events: list[dict[str, Any]] = [
+            {
+                "name": span.name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": to_us(span.started_at),
+                "dur": span.duration_ms * 1000,
+                "pid": 1,
+                "tid": 0,
+            }
+            for span in self.spans
+        ]
+        events.extend(
+            {
+                "name": record.path,
+                "cat": record.action,
+                "ph": "X",
+                "ts": to_us(record.started_at),
+                "dur": record.render_ms * 1000,
+                "pid": 1,
+                "tid": record.thread_id,
+                "args": {"size": record.size},
+            }
+            for record in self.files.values()
+            if record.render_ms
+        )
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+    def print_tree(self, max_depth: int = DEFAULT_TREE_DEPTH, title: str = "Project Structure") -> None:
+        """
+        Print the generated files as a tree.
+
+        Args:
+            max_depth: Number of directory levels to expand, deeper directories are summarized
+            title: Title of the tree
+        """
+        from rich.tree import Tree
+
+        root: dict[str, Any] = {}
+        for record in self.files.values():
+            node = root
+            *directories, name = record.path.split("/")
+            for directory in directories:
+                node = node.setdefault(directory + "/", {})
+            node[name] = record
+
+        def summarize(node: dict[str, Any]) -> tuple[int, int]:
+            files, size = 0, 0
+            for child in node.values():
+                child_files, child_size = summarize(child) if isinstance(child, dict) else (1, child.size)
+                files, size = files + child_files, size + child_size
+            return files, size
+
+        def add_nodes(tree: Tree, node: dict[str, Any], depth: int) -> None:
+            directories = sorted(name for name, child in node.items() if isinstance(child, dict))
+            for name in directories:
+                if depth > max_depth:
+                    files, size = summarize(node[name])
+                    label = f"{files} file{'s' if files != 1 else ''}, {_format_size(size)}"
+                    tree.add(f"[bold cyan]{name}[/bold cyan] [dim]{label}[/dim]")
+                else:
+                    add_nodes(tree.add(f"[bold cyan]{name}[/bold cyan]"), node[name], depth + 1)
+            for name in sorted(name for name, child in node.items() if not isinstance(child, dict)):
+                record = node[name]
+                timing = f", {record.render_ms:.1f} ms" if record.render_ms else ""
+                tree.add(f"[green]{name}[/green] [dim]{_format_size(record.size)}, {record.action}{timing}[/dim]")
+
+        tree = Tree(f"[bold blue]{title}[/bold blue]")
+        add_nodes(tree, root, 1)
+        console.print(tree)
+
+    def print_phases(self) -> None:
+        """Print the wall time of every phase."""
+        phases = self.get_phase_times()
+        if not phases:
+            return
+        files, size = len(self.files), sum(record.size for record in self.files.values())
+        timings = ", ".join(f"{name} {duration:.0f} ms" for name, duration in phases.items())
+        console.print(f"[dim]Generated {files} files ({_format_size(size)}): {timings}[/dim]")
@@ -0,0 +1,244 @@
+"""
+Package resources for create-ragbits-app.
+
+This module provides functionality for:
+1. Locating the templates shipped with the package through importlib.resources, including inside zip archives
+   (zipapps, pex files, zipped wheels), so they never have to be extracted
+2. Reading template files memory-mapped, from disk or from a memory-mapped archive
+3. Listing, sizing and fingerprinting template files the same way for both layouts
+
+Template files are always identified by `pathlib.Path` objects. Inside an archive these are virtual paths below
+the archive (e.g. `app.pyz/create_ragbits_app/templates/rag`), so they still hash, pickle and compare like any
+other path, and all reads of them go through this module.
+"""
+
+import contextlib
+import functools
+import mmap
+import os
+import pathlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import zipfile
+
+PACKAGE_DIR = pathlib.Path(__file__).parent
+
+# Files smaller than this are read with a single read() call, mapping them would cost more than copying
+MMAP_THRESHOLD = 16 * 1024
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map usable as a file object by zipfile, mmap only implements seekable() since Python 3.13."""
+
+    def seekable(self) -> bool:
+        return True
+
+
+@dataclass
+class PackageArchive:
+    """The zip archive the package is imported from, opened once over a memory map of the whole archive."""
+
+    path: pathlib.Path
+    """Path of the archive file."""
+    zip_file: "zipfile.ZipFile"
+    prefix: str
+    """Name of the package directory inside the archive, with a trailing slash."""
+    mtime_ns: int
+    """Modification time of the archive, members cannot change without changing it."""
+    directories: set[str] = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        # Zip files do not need entries for directories, so they are derived from the member names
+        for name in self.zip_file.namelist():
+            parts = name.rstrip("/").split("/")
+            self.directories.update("/".join(parts[:i]) for i in range(1, len(parts) + (name.endswith("/"))))
+
+    def get_member_name(self, path: pathlib.Path) -> str | None:
+        """Get the name of the archive member at a path, or None if the path is not inside the package."""
+        if not path.is_relative_to(PACKAGE_DIR):
+            return None
+        rel_path = path.relative_to(PACKAGE_DIR).as_posix()
+        return self.prefix.rstrip("/") if rel_path == "." else self.prefix + rel_path
+
+
+@functools.cache
+def get_package_archive() -> PackageArchive | None:
+    """
+    Get the zip archive the package is imported from.
+
+    Returns:
+        The archive, or None if the package is installed as regular files on disk
+    """
+    import importlib.resources
+    import zipfile
+
+    root = importlib.resources.files(__package__)
+    if isinstance(root, pathlib.Path) or not isinstance(root, zipfile.Path):
+        return None
+
+    # Reopen the archive over a memory map, so members are read from mapped pages instead of with seeks and reads
+    archive_path = pathlib.Path(root.root.filename or "")
+    with open(archive_path, "rb") as f:
+        mapped = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+    return PackageArchive(
+        path=archive_path,
+        zip_file=zipfile.ZipFile(mapped),  # type: ignore[arg-type]
+        prefix=root.at,
+        mtime_ns=mtime_ns,
+    )
+
+
+def _get_member(path: pathlib.Path) -> tuple[PackageArchive, str] | None:
+    archive = get_package_archive()
+    if archive is None:
+        return None
+    name = archive.get_member_name(path)
+    return None if name is None else (archive, name)
+
+
+def is_archived(path: pathlib.Path) -> bool:
+    """Check whether a path points inside the archive the package is imported from."""
+    return _get_member(path) is not None
+
+
+@contextlib.contextmanager
+def map_file(path: pathlib.Path) -> Iterator[bytes | mmap.mmap]:
+    """
+    Get the contents of a file without copying it into memory when it is large enough to be mapped.
+
+    Args:
+        path: Path of the file, on disk or inside the package archive
+
+    Yields:
+        The contents of the file, valid until the context exits
+
+    Raises:
+        OSError: If the file does not exist
+    """
+    member = _get_member(path)
+    if member is not None:
+        archive, name = member
+        try:
+            data = archive.zip_file.read(name)
+        except KeyError:
+            raise FileNotFoundError(f"No such file in {archive.path}: {name}") from None
+        yield data
+        return
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def read_bytes(path: pathlib.Path) -> bytes:
+    """Read a file, on disk or inside the package archive."""
+    with map_file(path) as data:
+        return bytes(data)
+
+
+def read_text(path: pathlib.Path) -> str:
+    """Read a UTF-8 text file, on disk or inside the package archive, decoding it straight from the mapping."""
+    with map_file(path) as data:
+        return str(data, "utf-8")
+
+
+def get_size(path: pathlib.Path) -> int:
+    """Get the size of a file in bytes, on disk or inside the package archive."""
+    member = _get_member(path)
+    if member is None:
+        return path.stat().st_size
+    archive, name = member
+    try:
+        return archive.zip_file.getinfo(name).file_size
+    except KeyError:
+        raise FileNotFoundError(f"No such file in {archive.path}: {name}") from None
+
+
+def get_mtime_ns(path: pathlib.Path) -> int:
+    """
+    Get the modification time of a file or directory, inside the package archive this is the time of the archive.
+
+    Raises:
+        OSError: If the file or directory does not exist
+    """
+    member = _get_member(path)
+    if member is None:
+        return path.stat().st_mtime_ns
+    archive, name = member
+    if name not in archive.directories and name not in archive.zip_file.NameToInfo:
+        raise FileNotFoundError(f"No such file or directory in {archive.path}: {name}")
+    return archive.mtime_ns
+
+
+def is_dir(path: pathlib.Path) -> bool:
+    """Check whether a path is a directory, on disk or inside the package archive."""
+    member = _get_member(path)
+    if member is None:
+        return path.is_dir()
+    archive, name = member
+    return name in archive.directories
+
+
+def is_file(path: pathlib.Path) -> bool:
+    """Check whether a path is a file, on disk or inside the package archive."""
+    member = _get_member(path)
+    if member is None:
+        return path.is_file()
+    archive, name = member
+    return name in archive.zip_file.NameToInfo and name not in archive.directories
+
+
+def exists(path: pathlib.Path) -> bool:
+    """Check whether a file or directory exists, on disk or inside the package archive."""
+    return is_dir(path) or is_file(path)
+
+
+def list_directory(path: pathlib.Path) -> list[str]:
+    """Get the sorted names of the entries of a directory, on disk or inside the package archive."""
+    member = _get_member(path)
+    if member is None:
+        return sorted(os.listdir(path))
+    archive, name = member
+    prefix = name + "/"
+    children = {
+        member_name[len(prefix) :].split("/", 1)[0]
+        for member_name in [*archive.zip_file.NameToInfo, *archive.directories]
+        if member_name.startswith(prefix)
+    }
+    return sorted(child for child in children if child)
+
+
+def walk(root: pathlib.Path) -> Iterator[tuple[str, bool]]:
+    """
+    Iterate over all files and directories below a directory, on disk or inside the package archive.
+
+    Args:
+        root: Directory to walk
+
+    Yields:
+        POSIX paths relative to the root in sorted order, and whether each of them is a directory
+    """
+    member = _get_member(root)
+    if member is None:
+        for item in sorted(root.glob("**/*")):
+            if item.is_dir() or item.is_file():
+                yield item.relative_to(root).as_posix(), item.is_dir()
+        return
+
+    archive, name = member
+    prefix = name + "/"
+    entries = {
+        member_name[len(prefix) :].rstrip("/"): member_name.rstrip("/") in archive.directories
+        for member_name in [*archive.zip_file.NameToInfo, *archive.directories]
+        if member_name.startswith(prefix) and member_name != prefix
+    }
+    # Sort by path segments, like the paths of the walk on disk
+    yield from sorted(entries.items(), key=lambda entry: entry[0].split("/"))
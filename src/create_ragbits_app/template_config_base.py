@@ -31,6 +31,25 @@ class Question(ABC):
         """Base method to prompt for and return an answer"""
         raise NotImplementedError("Subclasses must implement prompt()")
 
+    def default_answer(self) -> str | bool | list[str]:
+        """Get the answer used when the question is not answered explicitly"""
+        raise NotImplementedError("Subclasses must implement default_answer()")
+
+    def validate_answer(self, value: Any) -> str | bool | list[str]:  # noqa: ANN401
+        """
+        Validate an answer provided without prompting (e.g. from an answers file).
+
+        Args:
+            value: The raw answer value
+
+        Returns:
+            The answer in the same form prompt() would return it
+
+        Raises:
+            ValueError: If the answer is not valid for this question
+        """
+        raise NotImplementedError("Subclasses must implement validate_answer()")
+
 
 class TextQuestion(Question):
     """Text input question"""
@@ -43,6 +62,16 @@ class TextQuestion(Question):
 
         return text(self.message, default=self.default)
 
+    def default_answer(self) -> str:
+        """Return the default text or an empty string."""
+        return self.default if isinstance(self.default, str) else ""
+
+    def validate_answer(self, value: Any) -> str:  # noqa: ANN401
+        """Check that the answer is a string."""
+        if not isinstance(value, str):
+            raise ValueError(f"Answer to '{self.name}' must be a string, got {value!r}")
+        return value
+
 
 class ListQuestion(Question):
     """List selection question"""
@@ -65,6 +94,16 @@ class ListQuestion(Question):
 
         return list_input(self.message, choices=self.choices, default=self.default)
 
+    def default_answer(self) -> str:
+        """Return the default choice or the first one, as the prompt would."""
+        return self.default if isinstance(self.default, str) else self.choices[0]
+
+    def validate_answer(self, value: Any) -> str:  # noqa: ANN401
+        """Check that the answer is one of the choices."""
+        if value not in self.choices:
+            raise ValueError(f"Answer to '{self.name}' must be one of {self.choices}, got {value!r}")
+        return value
+
 
 class MultiSelectQuestion(Question):
     """Multi-select checkbox question"""
@@ -132,6 +171,26 @@ class MultiSelectQuestion(Question):
         # Convert selected display names back to values
         return [self._choice_map[display_name] for display_name in selected_display_names]
 
+    def default_answer(self) -> list[str]:
+        """Return the default values."""
+        return list(self.default) if isinstance(self.default, list) else []
+
+    def validate_answer(self, value: Any) -> list[str]:  # noqa: ANN401
+        """Check that the answer is a list of choices, given either as values or display names."""
+        if not isinstance(value, list):
+            raise ValueError(f"Answer to '{self.name}' must be a list, got {value!r}")
+
+        values = set(self._choice_map.values())
+        answers = []
+        for item in value:
+            if item in values:
+                answers.append(item)
+            elif item in self._choice_map:
+                answers.append(self._choice_map[item])
+            else:
+                raise ValueError(f"Invalid choice {item!r} for '{self.name}', expected one of {sorted(values)}")
+        return answers
+
 
 class ConfirmQuestion(Question):
     """Yes/No confirmation question"""
@@ -144,6 +203,16 @@ class ConfirmQuestion(Question):
 
         return confirm(self.message, default=self.default)
 
+    def default_answer(self) -> bool:
+        """Return the default or False."""
+        return bool(self.default)
+
+    def validate_answer(self, value: Any) -> bool:  # noqa: ANN401
+        """Check that the answer is a boolean."""
+        if not isinstance(value, bool):
+            raise ValueError(f"Answer to '{self.name}' must be true or false, got {value!r}")
+        return value
+
 
 class TemplateConfig:
     """Base class for template configuration"""
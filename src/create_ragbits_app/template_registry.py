@@ -0,0 +1,197 @@
+"""
+Template configuration registry for create-ragbits-app.
+
+This module provides functionality for:
+1. Loading each template_config.py once per process, keyed by its path and modification time
+2. Executing template configs under unique module names, so they never replace each other
+3. Listing template metadata from an on-disk index, without executing any template_config.py
+4. Updating the index incrementally, loading only the configurations that changed since it was written
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import pathlib
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from create_ragbits_app.rendering import get_cache_dir, get_package_version
+from create_ragbits_app.resources import exists, get_mtime_ns, is_archived, is_file, list_directory, read_text
+from create_ragbits_app.template_config_base import TemplateConfig
+
+CONFIG_FILE_NAME = "template_config.py"
+
+
+@dataclass
+class TemplateMetadata:
+    """Metadata of a template, available without executing its configuration."""
+
+    dir_name: str
+    name: str
+    description: str
+    questions: list[dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the metadata to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class TemplateRegistry:
+    """
+    Registry of template configurations found in a templates directory.
+
+    Each configuration module is executed at most once per modification of its file, and metadata of all
+    templates is persisted in an index that is revalidated by file modification times.
+    """
+
+    def __init__(self, templates_dir: pathlib.Path, index_path: pathlib.Path | None = None):
+        self.templates_dir = templates_dir
+        root_hash = hashlib.sha256(str(templates_dir.resolve()).encode()).hexdigest()[:16]
+        self.index_path = index_path or get_cache_dir() / "index" / get_package_version() / f"{root_hash}.json"
+        self._configs: dict[tuple[pathlib.Path, int], TemplateConfig] = {}
+        self._lock = threading.RLock()
+
+    def _get_config_path(self, template_name: str) -> pathlib.Path:
+        return self.templates_dir / template_name / CONFIG_FILE_NAME
+
+    def _get_module_name(self, config_path: pathlib.Path) -> str:
+        path_hash = hashlib.sha256(str(config_path.resolve()).encode()).hexdigest()[:12]
+        return f"create_ragbits_app_template_config_{config_path.parent.name}_{path_hash}"
+
+    def get_config(self, template_name: str, verbose: bool = True) -> TemplateConfig | None:
+        """
+        Get the configuration of a template, executing its template_config.py only on first use or after it changed.
+
+        Args:
+            template_name: Name of the template directory
+            verbose: Whether to print why a configuration could not be loaded
+
+        Returns:
+            The template configuration, or None if the template has no valid configuration
+        """
+        config_path = self._get_config_path(template_name)
+        try:
+            mtime = get_mtime_ns(config_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            key = (config_path, mtime)
+            if key not in self._configs:
+                try:
+                    config = self._load_config(config_path)
+                except Exception as e:
+                    if verbose:
+                        print(f"Error loading template config: {e}")
+                    return None
+                if config is None:
+                    return None
+                self._configs = {k: v for k, v in self._configs.items() if k[0] != config_path}
+                self._configs[key] = config
+            return self._configs[key]
+
+    def _load_config(self, config_path: pathlib.Path) -> TemplateConfig | None:
+        # Use importlib to safely load the module
+        module_name = self._get_module_name(config_path)
+        if is_archived(config_path):
+            # Inside a zip archive there is no file to load, so the module is executed from its source
+            spec = importlib.util.spec_from_loader(module_name, loader=None, origin=str(config_path))
+        else:
+            spec = importlib.util.spec_from_file_location(module_name, config_path)
+        if spec is None:
+            return None
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+
+        try:
+            if spec.loader is None:
+                module.__file__ = str(config_path)
+                exec(compile(read_text(config_path), str(config_path), "exec"), module.__dict__)  # noqa: S102
+            else:
+                spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[module_name]
+            raise
+
+        # Look for a 'config' variable which should be an instance of TemplateConfig
+        return getattr(module, "config", None)
+
+    def _get_fingerprint(self) -> dict[str, int]:
+        fingerprint = {".": get_mtime_ns(self.templates_dir)}
+        for name in list_directory(self.templates_dir):
+            config_path = self.templates_dir / name / CONFIG_FILE_NAME
+            if is_file(config_path):
+                fingerprint[name] = get_mtime_ns(config_path)
+        return fingerprint
+
+    def _load_index(self) -> tuple[dict[str, int], list[TemplateMetadata]] | None:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            return index["fingerprint"], [TemplateMetadata(**metadata) for metadata in index["templates"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_index(self, fingerprint: dict[str, int], templates: list[TemplateMetadata]) -> None:
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"fingerprint": fingerprint, "templates": [t.to_dict() for t in templates]}, f)
+            tmp_path.replace(self.index_path)
+        except OSError:
+            pass
+
+    def list_templates(self) -> list[TemplateMetadata]:
+        """
+        List metadata of all templates, including the shared one.
+
+        Metadata is read from the index when it is up to date. Otherwise only the configurations that were added
+        or modified since the index was written are loaded, and the index is updated.
+
+        Returns:
+            Metadata of every template with a valid configuration, sorted by directory name
+        """
+        if not exists(self.templates_dir):
+            return []
+
+        with self._lock:
+            fingerprint = self._get_fingerprint()
+            indexed_fingerprint, indexed_templates = self._load_index() or ({}, [])
+            if indexed_fingerprint == fingerprint:
+                return indexed_templates
+
+            indexed = {t.dir_name: t for t in indexed_templates if indexed_fingerprint.get(t.dir_name)}
+            templates = []
+            for dir_name in sorted(name for name in fingerprint if name != "."):
+                if dir_name in indexed and indexed_fingerprint[dir_name] == fingerprint[dir_name]:
+                    templates.append(indexed[dir_name])
+                    continue
+                config = self.get_config(dir_name)
+                if config is not None:
+                    templates.append(
+                        TemplateMetadata(
+                            dir_name=dir_name,
+                            name=config.name,
+                            description=config.description,
+                            questions=config.questions_dict,
+                        )
+                    )
+            self._save_index(fingerprint, templates)
+            return templates
+
+
+_registries: dict[pathlib.Path, TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_template_registry(templates_dir: pathlib.Path) -> TemplateRegistry:
+    """Get the registry of the given templates directory, shared across the process."""
+    with _registries_lock:
+        if templates_dir not in _registries:
+            _registries[templates_dir] = TemplateRegistry(templates_dir)
+        return _registries[templates_dir]
@@ -0,0 +1,439 @@
+"""
+Template sources for create-ragbits-app.
+
+This module provides functionality for:
+1. Finding templates in several sources: the bundled templates, local directories, git repositories and HTTP indexes
+2. Keeping a local index of template metadata for every source, synced incrementally with ETags and commit hashes,
+   so templates can be listed without downloading them or executing any template_config.py
+3. Fetching a template only once it is selected, and reusing it until it changes
+
+Sources are given as specifications on the command line (`--template-source`) or in the
+`CREATE_RAGBITS_APP_TEMPLATE_SOURCES` environment variable, separated by whitespace:
+
+- `bundled`: templates shipped with create-ragbits-app, always searched last
+- `path/to/templates`: a local directory with one subdirectory per template
+- `git+https://github.com/org/repo.git@main#templates`: a git repository, with an optional ref and subdirectory
+- `https://templates.example.com/index.json`: an HTTP index of templates
+
+An HTTP index lists the metadata of every template, and a zip archive with its files:
+
+```json
+{
+  "templates": [
+    {
+      "dir_name": "billing-rag",
+      "name": "Billing RAG",
+      "description": "RAG over billing documents",
+      "questions": [],
+      "archive": "archives/billing-rag-1.2.0.zip",
+      "sha256": "<checksum of the archive>"
+    }
+  ]
+}
+```
+
+The `dir_name` of every template must be a single directory name, an index with any other name is rejected.
+Templates that do not ship a `shared` template are rendered with the bundled one.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import subprocess
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Any
+
+from rich.console import Console
+
+from create_ragbits_app.archive_cache import ArchiveCache
+from create_ragbits_app.lockfile import BUNDLED_TEMPLATE_SOURCE
+from create_ragbits_app.output_tree import OutputTree
+from create_ragbits_app.rendering import get_cache_dir
+from create_ragbits_app.resources import exists
+from create_ragbits_app.template_registry import TemplateMetadata, get_template_registry
+from create_ragbits_app.template_utils import TEMPLATES_DIR
+
+console = Console()
+
+TEMPLATE_SOURCES_ENV = "CREATE_RAGBITS_APP_TEMPLATE_SOURCES"
+
+# How long a synced index is used without checking the source for changes
+DEFAULT_SYNC_TTL_SECONDS = 60 * 60
+
+METADATA_FIELDS = tuple(f.name for f in fields(TemplateMetadata))
+
+
+def _get_source_cache_dir(kind: str, spec: str) -> pathlib.Path:
+    return get_cache_dir() / "sources" / kind / hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def _load_state(path: pathlib.Path) -> dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_safe_dir_name(name: object) -> bool:
+    """Check whether a name is a single path segment, safe to join into paths, like template or project names."""
+    return isinstance(name, str) and name not in {"", ".", ".."} and not any(char in name for char in "/\\:\0")
+
+
+def _save_state(path: pathlib.Path, state: dict[str, Any]) -> None:
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+class TemplateSource(ABC):
+    """A place templates are found in."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        """Specification of the source, as given by the user and recorded in project lockfiles."""
+
+    @abstractmethod
+    def list_templates(self) -> list[TemplateMetadata]:
+        """
+        List metadata of the templates of the source, without fetching the templates.
+
+        Raises:
+            ValueError: If the source cannot be reached and nothing is cached for it
+        """
+
+    @abstractmethod
+    def get_templates_dir(self, template_name: str) -> pathlib.Path:
+        """
+        Get a local directory containing the given template, fetching the template if needed.
+
+        Raises:
+            ValueError: If the template is not in the source or cannot be fetched
+        """
+
+
+class DirectorySource(TemplateSource):
+    """Templates in a local directory, including the templates bundled with the package."""
+
+    def __init__(self, templates_dir: pathlib.Path, spec: str | None = None):
+        super().__init__(spec or str(templates_dir))
+        self.templates_dir = templates_dir
+
+    def list_templates(self) -> list[TemplateMetadata]:
+        """List metadata of the templates in the directory, from the index of the template registry."""
+        if not exists(self.templates_dir):
+            raise ValueError(f"Template directory {self.templates_dir} does not exist")
+        return [t for t in get_template_registry(self.templates_dir).list_templates() if t.dir_name != "shared"]
+
+    def get_templates_dir(self, template_name: str) -> pathlib.Path:
+        """Get the directory, templates in it are used in place."""
+        if not exists(self.templates_dir / template_name):
+            raise ValueError(f"Template '{template_name}' not found in {self.templates_dir}")
+        return self.templates_dir
+
+
+class GitSource(TemplateSource):
+    """
+    Templates in a git repository, checked out shallowly into the cache.
+
+    The remote is asked for the commit of the ref at most once per TTL, and the checkout is only fetched when the
+    commit changed. The template registry index then reloads only the configurations that changed in that commit.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ref: str | None = None,
+        subdirectory: str = "",
+        spec: str | None = None,
+        ttl: float = DEFAULT_SYNC_TTL_SECONDS,
+    ):
+        location = f"{url}@{ref}" if ref else url
+        super().__init__(spec or f"git+{location}" + (f"#{subdirectory}" if subdirectory else ""))
+        self.url = url
+        self.ref = ref
+        self.subdirectory = subdirectory
+        self.ttl = ttl
+        self.cache_dir = _get_source_cache_dir("git", self.spec)
+        self.checkout_dir = self.cache_dir / "checkout"
+        self.state_path = self.cache_dir / "state.json"
+        self._synced = False
+
+    @property
+    def templates_dir(self) -> pathlib.Path:
+        """Directory of the checkout containing the templates."""
+        return self.checkout_dir / self.subdirectory if self.subdirectory else self.checkout_dir
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(["git", *args], capture_output=True, text=True, check=True)  # noqa: S603, S607
+        return result.stdout
+
+    def _fetch(self) -> str:
+        """Fetch the ref into the checkout and return the commit it points to."""
+        if not (self.checkout_dir / ".git").is_dir():
+            self.checkout_dir.mkdir(parents=True, exist_ok=True)
+            self._git("init", "--quiet", str(self.checkout_dir))
+        checkout = str(self.checkout_dir)
+        # URLs and refs come from the command line or lockfiles, "--" keeps git from reading them as options
+        self._git("-C", checkout, "fetch", "--quiet", "--depth", "1", "--", self.url, self.ref or "HEAD")
+        self._git("-C", checkout, "checkout", "--quiet", "--force", "--detach", "FETCH_HEAD")
+        return self._git("-C", checkout, "rev-parse", "HEAD").strip()
+
+    def sync(self) -> None:
+        """
+        Bring the checkout up to date with the remote, falling back to the checkout when the remote is unreachable.
+
+        Raises:
+            ValueError: If the repository cannot be fetched and was never checked out
+        """
+        if self._synced:
+            return
+        state = _load_state(self.state_path)
+        has_checkout = bool(state.get("commit")) and self.templates_dir.is_dir()
+        if has_checkout and time.time() - state.get("checked_at", 0) < self.ttl:
+            self._synced = True
+            return
+
+        try:
+            # Asking for the commit of the ref is much cheaper than fetching, even shallowly
+            remote_refs = self._git("ls-remote", "--", self.url, self.ref or "HEAD").split()
+            commit = remote_refs[0] if remote_refs else None
+            if not has_checkout or commit != state.get("commit"):
+                commit = self._fetch()
+        except (OSError, subprocess.CalledProcessError) as e:
+            error = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else str(e)
+            if not has_checkout:
+                raise ValueError(f"Could not fetch {self.url}: {error}") from e
+            console.print(f"[yellow]Warning: Could not sync {self.spec}, using cached templates: {error}[/yellow]")
+        else:
+            _save_state(self.state_path, {"commit": commit, "checked_at": time.time()})
+        self._synced = True
+
+    def list_templates(self) -> list[TemplateMetadata]:
+        """List metadata of the templates in the repository, syncing the checkout first."""
+        self.sync()
+        return DirectorySource(self.templates_dir).list_templates()
+
+    def get_templates_dir(self, template_name: str) -> pathlib.Path:
+        """Get the directory of the checkout containing the templates."""
+        self.sync()
+        return DirectorySource(self.templates_dir).get_templates_dir(template_name)
+
+
+class HttpIndexSource(TemplateSource):
+    """
+    Templates listed in an index served over HTTP, each one downloaded as a zip archive when it is selected.
+
+    The index is revalidated with its ETag at most once per TTL. Archives are cached by their checksum and extracted
+    once, so templates that did not change between two versions of the index are never downloaded again.
+    """
+
+    def __init__(self, url: str, spec: str | None = None, ttl: float = DEFAULT_SYNC_TTL_SECONDS):
+        super().__init__(spec or url)
+        self.url = url
+        self.ttl = ttl
+        self.cache_dir = _get_source_cache_dir("http", self.spec)
+        self.state_path = self.cache_dir / "index.json"
+        self._entries: list[dict[str, Any]] | None = None
+
+    def sync(self) -> list[dict[str, Any]]:
+        """
+        Get the entries of the index, revalidating the cached index when it is older than the TTL.
+
+        The index is synced at most once per source instance, later calls reuse the entries.
+
+        Raises:
+            ValueError: If the index cannot be downloaded or is not valid, and nothing is cached for it
+        """
+        if self._entries is None:
+            self._entries = self._sync_index()
+        return self._entries
+
+    def _sync_index(self) -> list[dict[str, Any]]:
+        import requests
+
+        state = _load_state(self.state_path)
+        cached_entries = state.get("index", {}).get("templates")
+        if cached_entries is not None and time.time() - state.get("checked_at", 0) < self.ttl:
+            return cached_entries
+
+        headers = {"If-None-Match": state["etag"]} if cached_entries is not None and state.get("etag") else {}
+        try:
+            response = requests.get(self.url, headers=headers, timeout=30)
+            if response.status_code == 304 and cached_entries is not None:  # noqa: PLR2004
+                _save_state(self.state_path, {**state, "checked_at": time.time()})
+                return cached_entries
+            response.raise_for_status()
+            index = response.json()
+            entries = index["templates"]
+            if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+                raise ValueError("'templates' must be a list of template entries")
+            for entry in entries:
+                if "dir_name" not in entry:
+                    continue
+                # Template names become paths in the cache, an index must not be able to point outside of it
+                if not is_safe_dir_name(entry["dir_name"]):
+                    raise ValueError(f"Invalid template name {entry['dir_name']!r}")
+                # Entries are listed as template metadata, which needs a name and a description
+                has_metadata = isinstance(entry.get("name"), str) and isinstance(entry.get("description"), str)
+                if not has_metadata or not isinstance(entry.get("questions", []), list):
+                    raise ValueError(f"Template {entry['dir_name']!r} needs a name, a description and questions")
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            if cached_entries is None:
+                raise ValueError(f"Could not load template index {self.url}: {e}") from e
+            console.print(f"[yellow]Warning: Could not sync {self.spec}, using cached index: {e}[/yellow]")
+            return cached_entries
+
+        _save_state(self.state_path, {"index": index, "etag": response.headers.get("ETag"), "checked_at": time.time()})
+        return entries
+
+    def list_templates(self) -> list[TemplateMetadata]:
+        """List metadata of the templates from the index."""
+        return [
+            TemplateMetadata(**{key: entry[key] for key in METADATA_FIELDS if key in entry})
+            for entry in self.sync()
+            if entry.get("dir_name") and entry.get("dir_name") != "shared"
+        ]
+
+    def get_templates_dir(self, template_name: str) -> pathlib.Path:
+        """Download and extract the archive of the template, unless it was already extracted."""
+        import requests
+
+        entry = next((entry for entry in self.sync() if entry.get("dir_name") == template_name), None)
+        if entry is None or not entry.get("archive") or not is_safe_dir_name(template_name):
+            raise ValueError(f"Template '{template_name}' not found in {self.url}")
+
+        archive_url = urllib.parse.urljoin(self.url, entry["archive"])
+        try:
+            archive_path = ArchiveCache().fetch(archive_url)
+        except (requests.RequestException, OSError) as e:
+            raise ValueError(f"Could not download template '{template_name}' from {archive_url}: {e}") from e
+
+        # Cached archives are named after their checksum
+        checksum = archive_path.stem
+        if entry.get("sha256") and entry["sha256"] != checksum:
+            raise ValueError(f"Checksum of {archive_url} does not match the template index")
+
+        templates_dir = self.cache_dir / "templates" / checksum
+        if not (templates_dir / template_name).is_dir():
+            _extract_template(archive_path, templates_dir / template_name)
+        return templates_dir
+
+
+def _extract_template(archive_path: pathlib.Path, target: pathlib.Path) -> None:
+    """Extract a template archive, with its files at the root or in a single top-level directory."""
+    import zipfile
+
+    with zipfile.ZipFile(archive_path) as zip_ref:
+        members = [member for member in zip_ref.infolist() if not member.is_dir()]
+        names = [pathlib.PurePosixPath(member.filename) for member in members]
+        top_level = {name.parts[0] for name in names}
+        strip = 1 if len(top_level) == 1 and all(len(name.parts) > 1 for name in names) else 0
+
+        tree = OutputTree()
+        for member, name in zip(members, names, strict=True):
+            parts = name.parts[strip:]
+            if name.is_absolute() or ".." in parts:
+                continue  # Never write outside of the template directory
+            tree.add_content("/".join(parts), zip_ref.read(member))
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # The template may have been extracted by another process in the meantime
+    with contextlib.suppress(FileExistsError):
+        tree.flush(target)
+
+
+def parse_template_source(spec: str) -> TemplateSource:
+    """
+    Create a template source from its specification.
+
+    Args:
+        spec: `bundled`, a local directory, `git+<url>[@<ref>][#<subdirectory>]` or the URL of an HTTP index
+
+    Returns:
+        The template source
+    """
+    if spec == BUNDLED_TEMPLATE_SOURCE:
+        return DirectorySource(TEMPLATES_DIR, BUNDLED_TEMPLATE_SOURCE)
+
+    if spec.startswith("git+"):
+        location, _, subdirectory = spec.removeprefix("git+").partition("#")
+        url, _, ref = location.rpartition("@")
+        # An "@" before the path is part of the URL (e.g. git@github.com:org/repo.git), not a ref
+        if not url or "/" in ref or ":" in ref:
+            url, ref = location, ""
+        return GitSource(url, ref or None, subdirectory, spec)
+
+    if spec.startswith(("http://", "https://")):
+        return HttpIndexSource(spec)
+
+    templates_dir = pathlib.Path(spec).expanduser().resolve()
+    return DirectorySource(templates_dir, str(templates_dir))
+
+
+def get_template_sources(specs: list[str] | None = None) -> list[TemplateSource]:
+    """
+    Get the template sources to search, in order.
+
+    Args:
+        specs: Specifications given on the command line, searched after the ones from the environment
+
+    Returns:
+        Template sources without duplicates, the bundled templates always come last
+    """
+    all_specs = [*os.environ.get(TEMPLATE_SOURCES_ENV, "").split(), *(specs or []), BUNDLED_TEMPLATE_SOURCE]
+    sources = [parse_template_source(spec) for spec in all_specs]
+    unique_sources = {source.spec: source for source in reversed(sources)}
+    return list(reversed(unique_sources.values()))
+
+
+@dataclass(frozen=True)
+class SourcedTemplate:
+    """Metadata of a template together with the source it was found in."""
+
+    source: TemplateSource
+    metadata: TemplateMetadata
+
+
+def _list_templates_safely(source: TemplateSource) -> list[TemplateMetadata]:
+    try:
+        return source.list_templates()
+    except ValueError as e:
+        console.print(f"[yellow]Warning: Skipping template source {source.spec}: {e}[/yellow]")
+        return []
+
+
+def list_source_templates(sources: list[TemplateSource]) -> list[SourcedTemplate]:
+    """
+    List templates of all sources, syncing the sources concurrently.
+
+    Args:
+        sources: Sources to list, a template found in several sources is taken from the first one
+
+    Returns:
+        Templates of all sources, in the order of the sources
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as executor:
+        listings = list(executor.map(_list_templates_safely, sources))
+
+    templates: dict[str, SourcedTemplate] = {}
+    for source, metadata_list in zip(sources, listings, strict=True):
+        for metadata in metadata_list:
+            templates.setdefault(metadata.dir_name, SourcedTemplate(source, metadata))
+    return list(templates.values())
+
+
+def find_template(template_name: str, sources: list[TemplateSource]) -> SourcedTemplate | None:
+    """Find a template by its directory name in the first source that has it."""
+    return next((t for t in list_source_templates(sources) if t.metadata.dir_name == template_name), None)
@@ -12,66 +12,58 @@ The module works with template directories that contain:
 - Static files: Other files to be copied as-is
 """
 
-import importlib.util
-import os
 import pathlib
-import shutil
 import sys
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
-import jinja2
-import yaml
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.tree import Tree
 
+from create_ragbits_app.lockfile import BUNDLED_TEMPLATE_SOURCE, LOCKFILE_NAME, build_lockfile, dump_lockfile
+from create_ragbits_app.manifest import ConditionalPrefixTree, ManifestEntry, get_template_manifest
+from create_ragbits_app.merging import deep_merge_dicts, get_merger, merge_layers
+from create_ragbits_app.output_tree import OutputTree
+from create_ragbits_app.rendering import TEMPLATE_ROOTS, render_file, render_path_segment
+from create_ragbits_app.report import DEFAULT_TREE_DEPTH, GenerationReport
+from create_ragbits_app.resources import exists, get_size, read_text
 from create_ragbits_app.template_config_base import TemplateConfig
+from create_ragbits_app.template_registry import get_template_registry
 
 # Get templates directory
-TEMPLATES_DIR = pathlib.Path(__file__).parent / "templates"
+TEMPLATES_DIR = TEMPLATE_ROOTS["templates"]
 SHARED_DIR = TEMPLATES_DIR / "shared"
 
 console = Console()
 
 
-def get_available_templates() -> list[dict]:
+def get_available_templates(templates_dir: pathlib.Path = TEMPLATES_DIR) -> list[dict]:
     """Get list of available templates from templates directory with their metadata."""
-    if not TEMPLATES_DIR.exists():
-        return []
+    return [
+        {"dir_name": t.dir_name, "name": t.name, "description": t.description}
+        for t in get_template_registry(templates_dir).list_templates()
+        if t.dir_name != "shared"
+    ]
 
-    templates = []
-    for d in TEMPLATES_DIR.iterdir():
-        if d.is_dir() and d.name != "shared":
-            # Get template config to extract name and description
-            config = get_template_config(d.name)
-            templates.append({"dir_name": d.name, "name": config.name, "description": config.description})
 
-    return templates
-
-
-def get_template_config(template_name: str) -> TemplateConfig:
+def get_template_config(template_name: str, templates_dir: pathlib.Path = TEMPLATES_DIR) -> TemplateConfig:
     """Get template configuration if available."""
-    config_path = TEMPLATES_DIR / template_name / "template_config.py"
-    if not config_path.exists():
+    config = get_template_registry(templates_dir).get_config(template_name)
+    if config is None:
         return {}  # type: ignore[return-value]
+    return config
 
-    # Use importlib to safely load the module
-    spec = importlib.util.spec_from_file_location("template_config", config_path)
-    if spec is None or spec.loader is None:
-        return {}  # type: ignore[return-value]
 
-    module = importlib.util.module_from_spec(spec)
-    sys.modules["template_config"] = module
+def get_shared_templates_dir(templates_dir: pathlib.Path = TEMPLATES_DIR) -> pathlib.Path:
+    """Get the directory of the shared template used with a templates directory, the bundled one if it has none."""
+    return templates_dir if exists(templates_dir / "shared") else TEMPLATES_DIR
 
-    try:
-        spec.loader.exec_module(module)
-        # Look for a 'config' variable which should be an instance of TemplateConfig
-        if hasattr(module, "config"):
-            return module.config
-        return {}  # type: ignore[return-value]
-    except Exception as e:
-        print(f"Error loading template config: {e}")
-        return {}  # type: ignore[return-value]
+
+def get_shared_config(templates_dir: pathlib.Path = TEMPLATES_DIR) -> TemplateConfig:
+    """Get the configuration of the shared template used with a templates directory."""
+    return get_template_config("shared", get_shared_templates_dir(templates_dir))
 
 
 def prompt_template_questions(template_config: TemplateConfig) -> dict:
@@ -79,186 +71,319 @@ def prompt_template_questions(template_config: TemplateConfig) -> dict:
     return {q.name: q.prompt() for q in template_config.questions}
 
 
-def merge_docker_compose_files(existing_content: str, new_content: str) -> str:
-    """Merge two docker-compose YAML files intelligently."""
-    try:
-        existing_data = yaml.safe_load(existing_content)
-        new_data = yaml.safe_load(new_content)
-
-        # Deep merge the YAML data
-        merged_data = deep_merge_dicts(existing_data, new_data)
-
-        # Convert back to YAML with proper formatting and document separator
-        yaml_content = yaml.dump(merged_data, default_flow_style=False, sort_keys=False)
-        # Add the document separator at the beginning
-        return f"---\n{yaml_content}"
-    except Exception as e:
-        console.print(f"[yellow]Warning: Could not merge docker-compose files: {e}[/yellow]")
-        # If merging fails, return the new content (override)
-        return new_content
-
-
-def deep_merge_dicts(dict1: dict[str, Any], dict2: dict[str, Any]) -> dict[str, Any]:
-    """Deep merge two dictionaries, with dict2 values taking precedence."""
-    result = dict1.copy()
-
-    for key, value in dict2.items():
-        if key in result:
-            if isinstance(result[key], dict) and isinstance(value, dict):
-                # Recursively merge nested dictionaries
-                result[key] = deep_merge_dicts(result[key], value)
-            elif isinstance(result[key], list) and isinstance(value, list):
-                # For lists, we'll concatenate and remove duplicates (if they're simple values)
-                if all(isinstance(item, (str, int, float)) for item in result[key] + value):
-                    # Simple list - remove duplicates while preserving order
-                    seen = set()
-                    merged_list = []
-                    for item in result[key] + value:
-                        if item not in seen:
-                            seen.add(item)
-                            merged_list.append(item)
-                    result[key] = merged_list
-                else:
-                    # Complex list - just concatenate
-                    result[key] = result[key] + value
-            else:
-                # For other types, dict2 value takes precedence
-                result[key] = value
-        else:
-            result[key] = value
-
-    return result
-
-
-def create_project(template_name: str, project_path: str, context: dict) -> None:
-    """Create a new project from the selected template and shared template."""
-    template_path = TEMPLATES_DIR / template_name
-    shared_template_path = TEMPLATES_DIR / "shared"
-
-    # Create project directory if it doesn't exist
-    os.makedirs(project_path, exist_ok=True)
+def resolve_template_answers(template_config: TemplateConfig, answers: dict[str, Any]) -> dict:
+    """
+    Validate answers provided without prompting against template-specific questions.
+
+    Args:
+        template_config: Configuration of the template the answers are for
+        answers: Answers keyed by question name, questions without an answer get their default
+
+    Returns:
+        Answers in the same form as returned by prompt_template_questions
+
+    Raises:
+        ValueError: If any of the answers is not valid
+    """
+    return {
+        q.name: q.validate_answer(answers[q.name]) if q.name in answers else q.default_answer()
+        for q in template_config.questions
+    }
+
+
+def build_project_context(
+    project_name: str,
+    template_config: TemplateConfig,
+    shared_config: TemplateConfig,
+    answers: dict[str, Any],
+    shared_answers: dict[str, Any],
+    ui_options: Mapping[str, Any],
+    ragbits_version: str,
+) -> dict:
+    """Build the context used to render a project from the answers to all questions."""
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+
+    # Create base context for template rendering
+    context = {
+        "project_name": project_name,
+        "pkg_name": project_name.replace("-", "_"),
+        "ragbits_version": ragbits_version,
+        "python_version": python_version,
+        **answers,
+        **ui_options,
+        **shared_answers,
+    }
+
+    # Build additional context using template config's build_context method
+    additional_context = template_config.build_context(context)
+    context.update(additional_context)
+    # Build additional context using shared template config's build_context method
+    additional_shared_context = shared_config.build_context(context)
+    return deep_merge_dicts(context, additional_shared_context)
+
+
+@dataclass
+class ProjectPlan:
+    """Files of a project mapped to the template files they are built from, before anything is rendered."""
+
+    # Target paths mapped to the source files they are built from, in processing order
+    files: dict[str, list[pathlib.Path]] = field(default_factory=dict)
+    directories: set[str] = field(default_factory=set)
+
+
+def plan_project(template_name: str, context: dict, templates_dir: pathlib.Path = TEMPLATES_DIR) -> ProjectPlan:
+    """
+    Decide which template files make up a project, and where they go, without rendering them.
+
+    Args:
+        template_name: Name of the template to render
+        context: Context for template rendering
+        templates_dir: Directory containing the template, and the shared template unless the bundled one is used
+
+    Returns:
+        The plan of the project
+    """
+    template_path = templates_dir / template_name
+    shared_template_path = get_shared_templates_dir(templates_dir) / "shared"
 
     # Get template configurations
-    template_config = get_template_config(template_name)
-    shared_config = get_template_config("shared")
+    template_config = get_template_config(template_name, templates_dir)
+    shared_config = get_shared_config(templates_dir)
 
+    # Conditional directories of the selected template apply to both templates, the shared ones only to shared files
     conditional_directories = template_config.get_conditional_directories()
     shared_conditional_directories = shared_config.get_conditional_directories()
+    template_rules = ConditionalPrefixTree(conditional_directories)
+    shared_rules = ConditionalPrefixTree(conditional_directories, shared_conditional_directories)
 
-    def should_include_path(path: pathlib.Path, base_path: pathlib.Path, config: TemplateConfig) -> bool:
+    def should_include_path(entry: ManifestEntry, rules: ConditionalPrefixTree, config: TemplateConfig) -> bool:
         """Check if a path should be included based on conditional directories and file inclusion logic."""
-        rel_path = path.relative_to(base_path)
-
-        # Check conditional directories
-        for dir_name, context_var in conditional_directories.items():
-            if (str(rel_path).startswith(dir_name) or str(rel_path) == dir_name) and not context.get(
-                context_var, False
-            ):
-                return False
-
-        # Check shared conditional directories if processing shared template
-        if base_path == shared_template_path:
-            for dir_name, context_var in shared_conditional_directories.items():
-                if (str(rel_path).startswith(dir_name) or str(rel_path) == dir_name) and not context.get(
-                    context_var, False
-                ):
-                    return False
+        if not rules.is_included(entry.parts, context):
+            return False
 
         # Check template config's custom file inclusion logic
-        return config.should_include_file(rel_path, context)
-
-    def process_template_file(item: pathlib.Path, target_path: pathlib.Path) -> None:
-        """Process a single template file."""
-        if item.suffix == ".j2":
-            with open(item) as f:
-                template_content = f.read()
-
-            # Render template with context
-            template = jinja2.Template(template_content)
-            rendered_content = template.render(**context)
-
-            # Remove .j2 extension for target
-            target_path = target_path.with_suffix("")
-
-            # Special handling for docker-compose files
-            if (
-                target_path.name in ["docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml"]
-                and target_path.exists()
-            ):
-                # Read existing content and merge
-                with open(target_path) as f:
-                    existing_content = f.read()
-                rendered_content = merge_docker_compose_files(existing_content, rendered_content)
-                console.print(f"[cyan]Merged docker-compose files at {target_path.relative_to(project_path)}[/cyan]")
-
-            # Write the (possibly merged) content
-            with open(target_path, "w") as f:
-                f.write(rendered_content)
-        else:
-            # Create parent directories if they don't exist
-            os.makedirs(target_path.parent, exist_ok=True)
-            # Simple file copy
-            shutil.copy2(item, target_path)
+        return config.should_include_file(pathlib.Path(entry.path), context)
+
+    def get_target_path(entry: ManifestEntry) -> pathlib.PurePosixPath:
+        """Get the target path of a template entry, rendering Jinja templated segments (for directory names)."""
+        if entry.has_jinja_segments:
+            return pathlib.PurePosixPath(*(render_path_segment(part, context) for part in entry.parts))
+        return pathlib.PurePosixPath(entry.path)
+
+    def process_template_files(source_path: pathlib.Path, config: TemplateConfig, rules: ConditionalPrefixTree) -> None:
+        """Collect files from a template directory into the render plan."""
+        manifest = get_template_manifest(source_path)
 
-    def process_template_files(source_path: pathlib.Path, config: TemplateConfig) -> None:
-        """Process files from a template directory."""
-        for item in source_path.glob("**/*"):
-            if item.name == "template_config.py":
-                continue  # Skip template config file
+        for entry in manifest.directories:
+            if should_include_path(entry, rules, config):
+                plan.directories.add(str(get_target_path(entry)))
 
+        for entry in manifest.files:
             # Check if this path should be included
-            if not should_include_path(item, source_path, config):
+            if not should_include_path(entry, rules, config):
                 continue
 
-            # Get relative path from template root
-            rel_path = str(item.relative_to(source_path))
-
-            # Process path parts for Jinja templating (for directory names)
-            path_parts = []
-            for part in pathlib.Path(rel_path).parts:
-                if "{{" in part and "}}" in part:
-                    # Render the directory name as a template
-                    name_template = jinja2.Template(part)
-                    rendered_part = name_template.render(**context)
-                    path_parts.append(rendered_part)
-                else:
-                    path_parts.append(part)
-
-            # Construct the target path with processed directory names
-            target_rel_path = os.path.join(*path_parts) if path_parts else ""
-            target_path = pathlib.Path(project_path) / target_rel_path
-
-            if item.is_dir():
-                os.makedirs(target_path, exist_ok=True)
-            elif item.is_file():
-                process_template_file(item, target_path)
+            target_path = get_target_path(entry)
+            if entry.is_jinja:
+                # Remove .j2 extension for target
+                target_path = target_path.with_suffix("")
+
+            item = source_path / entry.path
+            target = str(target_path)
+            if target in plan.files and get_merger(target_path) is not None:
+                # Compose, pyproject.toml, .env and Grafana provisioning files are merged with the ones before them
+                plan.files[target].append(item)
+            else:
+                # Any other file overrides the one collected before it
+                plan.files[target] = [item]
+
+    plan = ProjectPlan()
+
+    # First, collect shared template files
+    if exists(shared_template_path):
+        process_template_files(shared_template_path, shared_config, shared_rules)
+
+    # Then, collect selected template files (can override or merge with shared files)
+    process_template_files(template_path, template_config, template_rules)
+    return plan
+
+
+def render_target(target_path: str, sources: list[pathlib.Path], context: dict, verbose: bool = True) -> bytes:
+    """Render a single target file from its source files, merging them in order."""
+    # Render templates with context using the shared, cached environment
+    layers = [render_file(source, context) if source.suffix == ".j2" else read_text(source) for source in sources]
+    return merge_layers(pathlib.PurePosixPath(target_path), layers, verbose).encode()
+
+
+def build_output_tree(
+    template_name: str,
+    context: dict,
+    verbose: bool = True,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    report: GenerationReport | None = None,
+    render_workers: int = 1,
+) -> OutputTree:
+    """
+    Render the selected template and shared template into an in-memory output tree.
+
+    Args:
+        template_name: Name of the template to render
+        context: Context for template rendering
+        verbose: Whether to report merged files on the console
+        templates_dir: Directory containing the template and the shared template
+        report: Report to record the render time, size and action of every file in
+        render_workers: Number of threads rendering files, 1 renders them in the calling thread
+
+    Returns:
+        The project files, with all merges already applied
+    """
+    plan = plan_project(template_name, context, templates_dir)
+    tree = OutputTree()
+    for directory in plan.directories:
+        tree.add_directory(directory)
+
+    def render_and_record(target_path: str, sources: list[pathlib.Path]) -> bytes:
+        started_at = time.perf_counter()
+        content = render_target(target_path, sources, context, verbose)
+        if report is not None:
+            action = "merged" if len(sources) > 1 else "rendered"
+            report.record_file(target_path, action, len(content), started_at, time.perf_counter())
+        return content
+
+    # Static files are copied as-is when the tree is flushed, the rest is rendered
+    to_render = {
+        target: sources for target, sources in plan.files.items() if len(sources) > 1 or sources[0].suffix == ".j2"
+    }
+    if render_workers > 1 and len(to_render) > 1:
+        # Opt-in only: Jinja rendering holds the GIL, so the pool is slower unless the interpreter runs without it
+        with ThreadPoolExecutor(max_workers=render_workers) as executor:
+            contents = dict(zip(to_render, executor.map(render_and_record, to_render, to_render.values()), strict=True))
+    else:
+        contents = {target: render_and_record(target, sources) for target, sources in to_render.items()}
+
+    for target, sources in plan.files.items():
+        if target in contents:
+            tree.add_content(target, contents[target])
+        else:
+            tree.add_copy(target, sources[0])
+            if report is not None:
+                report.record_file(target, "copied", get_size(sources[0]))
+    return tree
+
+
+def build_project_tree(
+    template_name: str,
+    context: dict,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    verbose: bool = True,
+    report: GenerationReport | None = None,
+    render_workers: int = 1,
+) -> OutputTree:
+    """
+    Render a project into an in-memory output tree, together with its lockfile.
+
+    Args:
+        template_name: Name of the template to render
+        context: Context for template rendering
+        templates_dir: Directory containing the template and the shared template
+        template_source: Specification of the template source, recorded so that the project can be updated
+        verbose: Whether to report merged files on the console
+        report: Report to record the render time, size and action of every file in
+        render_workers: Number of threads rendering files, 1 renders them in the calling thread
+
+    Returns:
+        The project files, including the lockfile
+    """
+    output_tree = build_output_tree(template_name, context, verbose, templates_dir, report, render_workers)
+
+    # Record the answers and rendered files, so the project can be updated later
+    lockfile = build_lockfile(
+        template_name,
+        get_template_config(template_name, templates_dir),
+        get_shared_config(templates_dir),
+        context,
+        output_tree.get_hashes(),
+        template_source,
+    )
+    lockfile_content = dump_lockfile(lockfile)
+    output_tree.add_content(LOCKFILE_NAME, lockfile_content)
+    if report is not None:
+        report.record_file(LOCKFILE_NAME, "rendered", len(lockfile_content))
+    return output_tree
+
+
+def render_project(
+    template_name: str,
+    project_path: str,
+    context: dict,
+    verbose: bool = True,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+) -> dict[str, str]:
+    """
+    Render the selected template and shared template into a new directory.
+
+    Args:
+        template_name: Name of the template to render
+        project_path: Directory to render the project into, it must not exist or be empty
+        context: Context for template rendering
+        verbose: Whether to report merged files on the console
+        templates_dir: Directory containing the template and the shared template
+
+    Returns:
+        Hashes of the rendered files, keyed by their POSIX path relative to the project directory
+    """
+    tree = build_output_tree(template_name, context, verbose, templates_dir)
+    tree.flush(pathlib.Path(project_path))
+    return tree.get_hashes()
+
+
+def create_project(
+    template_name: str,
+    project_path: str,
+    context: dict,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    report: GenerationReport | None = None,
+    tree_depth: int = DEFAULT_TREE_DEPTH,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    render_workers: int = 1,
+) -> GenerationReport:
+    """
+    Create a new project from the selected template and shared template.
+
+    Args:
+        template_name: Name of the template to use
+        project_path: Directory to create the project in, it must not exist or be empty
+        context: Context for template rendering
+        templates_dir: Directory containing the template and the shared template
+        report: Report to record the phases and files in, a new one is created if not given
+        tree_depth: Number of directory levels of the project structure to print
+        template_source: Specification of the template source, recorded so that the project can be updated
+        render_workers: Number of threads rendering files, 1 renders them in the calling thread
+
+    Returns:
+        Report of the generation
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    report = report or GenerationReport()
+    report.project_path = project_path
 
     # Process files with progress indicator
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
-        # First, process shared template files
-        if shared_template_path.exists():
-            progress.add_task("[cyan]Processing shared template files...", total=None)
-            process_template_files(shared_template_path, shared_config)
-
-        # Then, process selected template files (can override or merge with shared files)
+        progress.add_task("[cyan]Processing shared template files...", total=None)
         progress.add_task("[cyan]Creating project structure...", total=None)
-        process_template_files(template_path, template_config)
+        with report.phase("render"):
+            output_tree = build_project_tree(
+                template_name, context, templates_dir, template_source, report=report, render_workers=render_workers
+            )
+
+        # The project appears on disk only once all files were written
+        with report.phase("write"):
+            output_tree.flush(pathlib.Path(project_path))
 
-    # Display project structure
+    # Display project structure from what was written, without walking the project again
     console.print("\n[bold green]✓ Project created successfully![/bold green]")
     console.print(f"[bold]Project location:[/bold] {project_path}\n")
-
-    # Create and display project tree
-    tree = Tree("[bold blue]Project Structure[/bold blue]")
-    project_root = pathlib.Path(project_path)
-
-    def build_tree(node: Tree, path: pathlib.Path) -> None:
-        for item in path.iterdir():
-            if item.is_dir():
-                branch = node.add(f"[bold cyan]{item.name}[/bold cyan]")
-                build_tree(branch, item)
-            else:
-                node.add(f"[green]{item.name}[/green]")
-
-    build_tree(tree, project_root)
-    console.print(tree)
+    report.print_tree(tree_depth)
+    return report
@@ -0,0 +1,142 @@
+"""
+Caches for repeated chat questions.
+
+Two layers are used by the chat:
+1. Retrieval results keyed by the normalized question, skipping query rephrasing and vector search
+2. Final answers matched by embedding similarity, so rephrased versions of a question get the same answer
+
+Both layers expire entries after a TTL and evict the least recently used ones when they are full. They are cleared
+by the chat whenever documents were ingested or removed, see `get_ingest_generation`.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ragbits.core.embeddings import Embedder
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+ValueT = TypeVar("ValueT")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a question for exact matching: case, punctuation and whitespace are ignored."""
+    return " ".join(_PUNCTUATION.sub(" ", query.casefold()).split())
+
+
+class TTLCache(Generic[ValueT]):
+    """Mapping with a maximum size and a time to live, evicting the least recently used entries."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, ValueT]] = OrderedDict()
+
+    def get(self, key: Hashable) -> ValueT | None:
+        """Get the value of a key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: ValueT) -> None:
+        """Store a value, evicting the least recently used entries when the cache is full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def items(self) -> list[tuple[Hashable, ValueT]]:
+        """Get the entries that did not expire, dropping the expired ones."""
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        return [(key, value) for key, (_, value) in self._entries.items()]
+
+
+class RetrievalCache(TTLCache[list]):
+    """Search results keyed by the normalized question."""
+
+    def get_results(self, query: str) -> list | None:
+        """Get the cached search results of a question."""
+        return self.get(normalize_query(query))
+
+    def set_results(self, query: str, results: list) -> None:
+        """Cache the search results of a question."""
+        self.set(normalize_query(query), results)
+
+
+class SemanticAnswerCache:
+    """
+    Final answers, stored as the chunks they were streamed in, found by the similarity of question embeddings.
+
+    A question matches a cached one when it normalizes to the same text, which needs no embedding, or when the
+    cosine similarity of their embeddings reaches the threshold.
+    """
+
+    def __init__(self, embedder: "Embedder", threshold: float = 0.95, max_entries: int = 1000, ttl: float = 3600):
+        self.embedder = embedder
+        self.threshold = threshold
+        self._answers: TTLCache[tuple[np.ndarray, list[str]]] = TTLCache(max_entries, ttl)
+        # Matrix of the normalized embeddings of all cached questions, rebuilt after the cache changes
+        self._matrix: tuple[list[Hashable], np.ndarray] | None = None
+
+    async def _embed(self, query: str) -> np.ndarray:
+        (vector,) = await self.embedder.embed_text([query])
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _get_matrix(self) -> tuple[list[Hashable], np.ndarray]:
+        # Rebuilt when entries expired as well, so expired questions never shadow less similar ones
+        items = self._answers.items()
+        if self._matrix is None or set(self._matrix[0]) != {key for key, _ in items}:
+            keys = [key for key, _ in items]
+            vectors = [vector for _, (vector, _) in items]
+            self._matrix = keys, np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        return self._matrix
+
+    async def get(self, query: str) -> list[str] | None:
+        """Get the answer to the most similar cached question, if it is similar enough."""
+        key = normalize_query(query)
+        if (entry := self._answers.get(key)) is not None:
+            return entry[1]
+        if not len(self._answers):
+            return None
+
+        keys, matrix = self._get_matrix()
+        if not keys:
+            return None
+        similarities = matrix @ await self._embed(query)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        entry = self._answers.get(keys[best])
+        return None if entry is None else entry[1]
+
+    async def set(self, query: str, chunks: list[str]) -> None:
+        """Cache the answer to a question."""
+        self._answers.set(normalize_query(query), (await self._embed(query), chunks))
+        self._matrix = None
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        self._answers.clear()
+        self._matrix = None
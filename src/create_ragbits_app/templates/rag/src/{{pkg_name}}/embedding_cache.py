@@ -0,0 +1,130 @@
+"""
+Persistent cache of text embeddings.
+
+Embeddings are cached by embedding model, embedding options and a hash of the text, in two tiers: an in-process
+LRU for repeated queries, backed by a SQLite database shared by ingestion runs and the application. Only texts
+missing from both tiers are sent to the embedder.
+"""
+
+import array
+import hashlib
+import json
+import sqlite3
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TypeAlias
+
+from ragbits.core.embeddings import Embedder, SparseVector
+
+DENSE_FORMAT = b"D"
+SPARSE_FORMAT = b"S"
+
+Vector: TypeAlias = list[float] | SparseVector
+
+
+def encode_vector(vector: Vector) -> bytes:
+    """Serialize a dense vector (list of floats) or a sparse vector (indices and values) as float32 values."""
+    if isinstance(vector, list):
+        return DENSE_FORMAT + array.array("f", vector).tobytes()
+    size = len(vector.indices)
+    return SPARSE_FORMAT + struct.pack(f"<I{size}I{size}f", size, *vector.indices, *vector.values)
+
+
+def decode_vector(data: bytes) -> Vector:
+    """Deserialize a vector written by encode_vector."""
+    if data[:1] == DENSE_FORMAT:
+        return array.array("f", data[1:]).tolist()
+
+    (size,) = struct.unpack_from("<I", data, 1)
+    values = struct.unpack_from(f"<{size}I{size}f", data, 5)
+    return SparseVector(indices=list(values[:size]), values=list(values[size:]))
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: an in-process LRU in front of a SQLite database."""
+
+    def __init__(self, path: Path, max_memory_entries: int = 10_000):
+        self.max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[str, Vector] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        """Get the cache key of a text embedded by a model with the given options."""
+        return hashlib.sha256(f"{namespace}\0{text}".encode()).hexdigest()
+
+    def _remember(self, key: str, vector: Vector) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Vector]:
+        """Get the cached vectors of the given keys, from memory first and then from the database."""
+        found: dict[str, Vector] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            missing = [key for key in keys if key not in found]
+            if missing:
+                # The keys are passed as one JSON array, so any number of them fits in a single query
+                rows = self._connection.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN (SELECT value FROM json_each(?))",
+                    (json.dumps(missing),),
+                )
+                for key, data in rows:
+                    found[key] = decode_vector(data)
+                    self._remember(key, found[key])
+        return found
+
+    def put_many(self, vectors: dict[str, Vector]) -> None:
+        """Store vectors in both tiers."""
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                    [(key, encode_vector(vector)) for key, vector in vectors.items()],
+                )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def wrap(self, embedder: Embedder, model_name: str) -> Embedder:
+        """
+        Cache the text embeddings of an embedder, dense or sparse.
+
+        The embedder keeps its type, so vector stores configure their indexes for it as before.
+        """
+        embed_text = embedder.embed_text
+
+        async def cached_embed_text(data: list[str], options: object | None = None) -> list[Vector]:
+            namespace = model_name if options is None else f"{model_name}:{options!r}"
+            keys = [self.make_key(namespace, text) for text in data]
+            vectors = self.get_many(keys)
+
+            # Texts repeated in the batch are embedded once
+            missing = {key: text for key, text in zip(keys, data, strict=True) if key not in vectors}
+            if missing:
+                embedded = await embed_text(list(missing.values()), options)
+                new_vectors = dict(zip(missing, embedded, strict=True))
+                self.put_many(new_vectors)
+                vectors.update(new_vectors)
+            return [vectors[key] for key in keys]
+
+        embedder.embed_text = cached_embed_text
+        return embedder
@@ -0,0 +1,153 @@
+"""
+Manifest of the documents ingested into the vector store.
+
+Every ingested document is recorded with the hash of its content, so later ingestion runs skip documents that did
+not change, replace the ones that changed and remove the chunks of documents that are gone.
+
+The manifest also counts generations of the ingested documents, a new one starting whenever documents are ingested or
+removed, so running apps can tell when results cached from the vector store are stale.
+"""
+
+import hashlib
+import sqlite3
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from ragbits.core.vector_stores import VectorStore
+
+# Size of the pages the vector store is listed in when removing documents
+LIST_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """A document recorded in the manifest."""
+
+    source_id: str
+    content_hash: str
+    size: int
+    mtime_ns: int
+
+
+def hash_file(path: Path) -> str:
+    """Get the hash of a file's content."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class IngestManifest:
+    """Documents ingested into the vector store, stored in a local SQLite database."""
+
+    def __init__(self, path: Path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                source_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                ingested_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.connection.commit()
+
+    def _start_generation(self) -> None:
+        self.connection.execute(
+            "INSERT INTO state VALUES ('generation', 1) ON CONFLICT (key) DO UPDATE SET value = value + 1"
+        )
+
+    def get_entries(self) -> dict[str, ManifestEntry]:
+        """Get all recorded documents keyed by their source id."""
+        rows = self.connection.execute("SELECT source_id, content_hash, size, mtime_ns FROM documents")
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def record(self, entries: Iterable[ManifestEntry], content_changed: bool = True) -> None:
+        """
+        Record documents as ingested, replacing their earlier versions.
+
+        Args:
+            entries: Documents to record
+            content_changed: Whether the documents were ingested, starting a new generation, or only their file
+                metadata changed
+        """
+        now = time.time()
+        rows = [(e.source_id, e.content_hash, e.size, e.mtime_ns, now) for e in entries]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)", rows)
+            if rows and content_changed:
+                self._start_generation()
+
+    def remove(self, source_ids: Iterable[str]) -> None:
+        """Forget documents removed from the vector store, starting a new generation."""
+        with self.connection:
+            self.connection.executemany("DELETE FROM documents WHERE source_id = ?", [(i,) for i in source_ids])
+            self._start_generation()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+
+def get_ingest_generation(path: Path) -> int:
+    """
+    Get the generation of the documents recorded in a manifest, without creating the manifest.
+
+    Returns:
+        A number growing whenever documents are ingested or removed, 0 if nothing was ingested yet
+    """
+    if not path.exists():
+        return 0
+    connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        row = connection.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()
+    except sqlite3.OperationalError:
+        return 0  # Written before generations were counted
+    finally:
+        connection.close()
+    return row[0] if row else 0
+
+
+def check_document(path: Path, source_id: str, recorded: ManifestEntry | None) -> tuple[ManifestEntry, bool]:
+    """
+    Check whether a fetched document differs from the version recorded in the manifest.
+
+    Files whose size and modification time match the recorded ones are not hashed again.
+
+    Returns:
+        The entry describing the document now, and whether its content changed
+    """
+    stat = path.stat()
+    if recorded is not None and (recorded.size, recorded.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+        return recorded, False
+    entry = ManifestEntry(source_id, hash_file(path), stat.st_size, stat.st_mtime_ns)
+    return entry, recorded is None or recorded.content_hash != entry.content_hash
+
+
+async def remove_documents(vector_store: "VectorStore", source_ids: set[str]) -> int:
+    """
+    Remove all chunks of the given documents from the vector store.
+
+    Returns:
+        Number of removed chunks
+    """
+    entry_ids: list[UUID] = []
+    offset = 0
+    while entries := await vector_store.list(limit=LIST_PAGE_SIZE, offset=offset):
+        entry_ids.extend(
+            entry.id
+            for entry in entries
+            if entry.metadata.get("document_meta", {}).get("source", {}).get("id") in source_ids
+        )
+        offset += len(entries)
+    if entry_ids:
+        await vector_store.remove(entry_ids)
+    return len(entry_ids)
@@ -47,8 +47,16 @@ class RagTemplateConfig(TemplateConfig):
                     "display_name": "Image description with multi-modal LLM",
                     "value": "image_description",
                 },
+                {
+                    "display_name": "Persistent embedding cache",
+                    "value": "embedding_cache",
+                },
+                {
+                    "display_name": "Semantic answer and retrieval cache for repeated questions",
+                    "value": "answer_cache",
+                },
             ],
-            default=["hybrid_search", "image_description"],
+            default=["hybrid_search", "image_description", "embedding_cache"],
         ),
     ]
 
@@ -61,6 +69,8 @@ class RagTemplateConfig(TemplateConfig):
         # Check for specific features
         hybrid_search = "hybrid_search" in additional_features
         image_description = "image_description" in additional_features
+        embedding_cache = "embedding_cache" in additional_features
+        answer_cache = "answer_cache" in additional_features
 
         # Collect all ragbits extras
         ragbits_extras = []
@@ -80,15 +90,21 @@ class RagTemplateConfig(TemplateConfig):
         dependencies = [
             f"ragbits[{','.join(ragbits_extras)}]=={context.get('ragbits_version')}",
             "pydantic-settings",
+            "httpx",
         ]
 
         if parser == "unstructured":
             dependencies.append("unstructured[pdf]>=0.17.2")
 
+        if answer_cache:
+            dependencies.append("numpy")
+
         return {
             "dependencies": dependencies,
             "hybrid_search": hybrid_search,
             "image_description": image_description,
+            "embedding_cache": embedding_cache,
+            "answer_cache": answer_cache,
         }
 
     def get_conditional_directories(self) -> dict[str, str]:
@@ -97,6 +113,13 @@ class RagTemplateConfig(TemplateConfig):
 
     def should_include_file(self, file_path: pathlib.Path, context: dict) -> bool:
         """Custom file inclusion logic for RAG template."""
+        # Exclude embedding_cache.py when the embedding cache is disabled
+        if file_path.name == "embedding_cache.py" and not context.get("embedding_cache", False):
+            return False
+        # Exclude answer_cache.py when the answer cache is disabled
+        if file_path.name == "answer_cache.py" and not context.get("answer_cache", False):
+            return False
+
         return True
 
 
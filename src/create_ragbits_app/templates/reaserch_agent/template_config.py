@@ -28,6 +28,7 @@ class DeepResearchTemplateConfig(TemplateConfig):
             "docling",
             "markdownify",
             "tavily-python",
+            "httpx",
         ]
         return {
             "dependencies": dependencies,
@@ -0,0 +1,90 @@
+"""
+Closing of the clients and pools shared by the whole process.
+
+The ragbits chat API gives chat apps no hook into the shutdown of its server, so `Lifecycle.close_on_shutdown`
+relies on the event loop instead: `ragbits api run` serves the app with `asyncio.run`, which cancels the tasks still
+running once the server stopped, and the cancelled task closes the resources. When the process is killed, or the app
+runs on an event loop that is closed without cancelling its tasks, the connections are dropped without being closed.
+
+Clients and pools can only be used on the event loop they were created on. `Lifecycle.open` binds the resources to
+the running loop, so a process running several loops one after another (tests, `asyncio.run` in scripts, reloading
+servers) creates them again for each loop instead of reusing connections of a closed one.
+"""
+
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable
+
+CloseCallback = Callable[[], Awaitable[object] | object]
+
+
+class Lifecycle:
+    """Resources to close together, registered when they are created."""
+
+    def __init__(self) -> None:
+        self._close_callbacks: list[CloseCallback] = []
+        self._shutdown_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+
+    def open(self) -> asyncio.Lock:
+        """
+        Bind the resources to the running event loop and return the lock guarding their creation on that loop.
+
+        Resources created on another event loop are forgotten without being closed, as that loop can no longer run
+        their closing. Resources created outside of any event loop are bound to the first loop using them.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and loop is not self._loop:
+            if self._loop is not None:
+                self._close_callbacks.clear()
+                self.reset()
+            self._loop = loop
+            self._lock = None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def reset(self) -> None:
+        """Forget the created resources once they are closed, so that they are created again when used."""
+
+    def on_close(self, callback: CloseCallback) -> None:
+        """Register a function or coroutine function closing a resource."""
+        self._close_callbacks.append(callback)
+
+    async def close(self) -> None:
+        """
+        Close the registered resources, the most recently registered first, each of them once.
+
+        Every resource is closed even if closing another one fails, the first error is raised afterwards. The resources
+        and their event loop are forgotten, resources used afterwards are created again.
+        """
+        error: Exception | None = None
+        async with self.open():
+            while self._close_callbacks:
+                callback = self._close_callbacks.pop()
+                try:
+                    result = callback()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as exc:
+                    error = error or exc
+            self.reset()
+        self._loop = None
+        self._lock = None
+        if error is not None:
+            raise error
+
+    def close_on_shutdown(self) -> None:
+        """Close the resources when the running event loop cancels its remaining tasks at shutdown."""
+        if self._shutdown_task is None or self._shutdown_task.done():
+            self._shutdown_task = asyncio.create_task(self._close_when_cancelled())
+
+    async def _close_when_cancelled(self) -> None:
+        try:
+            await asyncio.Future()
+        finally:
+            await self.close()
@@ -1,7 +1,7 @@
 import textwrap
+from dataclasses import dataclass
 from typing import Optional
 
-from pydantic import BaseModel, Field
 from rich.console import Console
 from rich.panel import Panel
 
@@ -14,13 +14,14 @@ class AsciiArtCombiner:
     with customizable vertical alignment and spacing.
     """
 
-    class Config(BaseModel):
+    @dataclass
+    class Config:
         """Configuration options for combining ASCII art"""
 
-        vertical_offset: int = Field(
-            default=0, description="Line number where the right graphic starts relative to the left"
-        )
-        horizontal_spacing: int = Field(default=2, description="Number of spaces between the two graphics")
+        vertical_offset: int = 0
+        """Line number where the right graphic starts relative to the left"""
+        horizontal_spacing: int = 2
+        """Number of spaces between the two graphics"""
 
     @staticmethod
     def combine(left: str, right: str, config: Optional[Config] = None) -> str:
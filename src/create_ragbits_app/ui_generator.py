@@ -5,21 +5,27 @@ This module provides functionality for:
 1. Using the default hosted UI on localhost:8000
 2. Downloading UI from ragbits GitHub repository for customization
 3. Creating UI projects from templates (TypeScript or React)
+4. Building the UI of a project as an in-memory output tree, without console output
 """
 
 import json
+import os
 import pathlib
-import shutil
 import tempfile
 import urllib.parse
 import zipfile
+from collections.abc import Iterator
 from enum import Enum
-from typing import Any, TypedDict
+from typing import IO, Any, TypedDict
 
-import jinja2
-import requests
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+
+from create_ragbits_app.archive_cache import ArchiveCache
+from create_ragbits_app.manifest import get_template_manifest
+from create_ragbits_app.output_tree import OutputTree
+from create_ragbits_app.rendering import TEMPLATE_ROOTS, render_file, render_path_segment
+from create_ragbits_app.resources import exists
+from create_ragbits_app.versions import VersionResolver, get_version_resolver
 
 console = Console()
 
@@ -48,107 +54,141 @@ class UIOptions(TypedDict):
 
 
 # Path to UI templates
-UI_TEMPLATES_DIR = pathlib.Path(__file__).parent / "static" / "ui"
+UI_TEMPLATES_DIR = TEMPLATE_ROOTS["ui"]
+
+# Environment variable with the base URL of a mirror serving ragbits release archives as <base URL>/<tag>.zip
+UI_MIRROR_ENV = "CREATE_RAGBITS_APP_UI_MIRROR"
+
+# Directories of the ragbits UI that are never copied into projects
+UI_EXCLUDED_NAMES = ("node_modules", ".vite")
+
+# Downloaded archives up to this size are kept in memory
+ARCHIVE_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+
+def _get_ui_mirror() -> str | None:
+    """Get the configured mirror of ragbits release archives, if any."""
+    mirror = os.environ.get(UI_MIRROR_ENV)
+    return mirror.rstrip("/") if mirror else None
+
+
+def _get_ui_archive_url(version: str) -> str:
+    """Get the URL of the ragbits release archive, served by the configured mirror or GitHub."""
+    base_url = _get_ui_mirror() or "https://github.com/deepsense-ai/ragbits/archive/refs/tags"
+    return f"{base_url}/{version}.zip"
 
 
 def _validate_url(url: str) -> bool:
     """Validate that URL is safe to open."""
+    allowed_hosts = {"api.github.com", "github.com"}
+    if mirror := _get_ui_mirror():
+        allowed_hosts.add(urllib.parse.urlparse(mirror).netloc)
+
     parsed = urllib.parse.urlparse(url)
-    return parsed.scheme in ("http", "https") and parsed.netloc in ("api.github.com", "github.com")
+    return parsed.scheme in ("http", "https") and parsed.netloc in allowed_hosts
 
 
 def _get_latest_version() -> str:
     """Get the latest release version from GitHub API."""
-    api_url = "https://api.github.com/repos/deepsense-ai/ragbits/releases/latest"
+    latest_version = get_version_resolver().resolve("ragbits_ui")
+    if latest_version.source == "default":
+        console.print(f"[yellow]Warning: Could not fetch latest release, using {latest_version.version}[/yellow]")
+    return latest_version.version
 
-    if not _validate_url(api_url):
-        raise ValueError("Invalid API URL")
+
+def _open_ui_archive(archive_url: str, verbose: bool = False) -> IO[bytes]:
+    """
+    Open the ragbits release archive from the local cache, downloading it when needed.
+
+    Raises:
+        requests.RequestException: If the archive cannot be downloaded
+    """
+    import requests
 
     try:
-        response = requests.get(api_url, timeout=30)
+        return open(ArchiveCache(verbose=verbose).fetch(archive_url), "rb")  # noqa: SIM115
+    except requests.RequestException:
+        raise
+    except OSError:
+        # The cache directory is not writable, download the archive without caching it
+        pass
+
+    # Small archives stay in memory, bigger ones spill over to a temporary file
+    archive = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MAX_SIZE)  # noqa: SIM115
+    try:
+        response = requests.get(archive_url, timeout=60, stream=True)
         response.raise_for_status()
-        release_data = response.json()
-        return release_data["tag_name"]
-    except Exception as e:
-        console.print(f"[yellow]Warning: Could not fetch latest release, using v1.0.0: {e}[/yellow]")
-        return "v1.0.0"
-
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            archive.write(chunk)
+    except BaseException:
+        archive.close()
+        raise
 
-def _download_and_extract_ui(github_url: str, temp_path: pathlib.Path) -> pathlib.Path | None:
-    """Download and extract the UI from GitHub."""
-    if not _validate_url(github_url):
-        console.print("[red]Error: Invalid GitHub URL[/red]")
-        return None
+    archive.seek(0)
+    return archive
 
-    zip_path = temp_path / "ragbits.zip"
 
-    try:
-        response = requests.get(github_url, timeout=60, stream=True)
-        response.raise_for_status()
-        with open(zip_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-    except Exception as e:
-        console.print(f"[red]Error downloading zip file: {e}[/red]")
+def _find_ui_prefix(zip_ref: zipfile.ZipFile, verbose: bool = True) -> str | None:
+    """Find the prefix of the UI directory members in the repository archive."""
+    names = zip_ref.namelist()
+    if not names:
         return None
 
-    try:
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(temp_path)
-    except Exception as e:
-        console.print(f"[red]Error extracting zip file: {e}[/red]")
-        return None
+    # GitHub archives contain a single top-level "ragbits-<version>/" directory
+    root = names[0].split("/", 1)[0] + "/"
 
-    # Find the extracted directory
-    for item in temp_path.iterdir():
-        if item.is_dir() and item.name.startswith("ragbits-"):
-            return item
+    # Try the current path first, then alternative paths
+    ui_prefixes = [f"{root}typescript/ui/", f"{root}ui/"]  # v1.0.0
+    for ui_prefix in ui_prefixes:
+        if any(name.startswith(ui_prefix) for name in names):
+            if verbose and ui_prefix != ui_prefixes[0]:
+                console.print(f"[blue]Found UI at: {ui_prefix}[/blue]")
+            return ui_prefix
 
+    if verbose:
+        console.print(f"[red]Error: UI directory not found. Searched paths: {ui_prefixes}[/red]")
     return None
 
 
-def _find_ui_directory(extracted_dir: pathlib.Path) -> pathlib.Path | None:
-    """Find the UI directory in the extracted repository."""
-    # Try the current path first
-    ragbits_ui_source = extracted_dir / "typescript" / "ui"
-    if ragbits_ui_source.exists():
-        return ragbits_ui_source
-
-    # Try alternative paths
-    old_paths = [extracted_dir / "ui"]  # v1.0.0
+def _is_safe_member_path(rel_path: str) -> bool:
+    """Check that an archive member path stays inside the directory it is extracted to, on any platform."""
+    # Windows paths also treat "\\" as a separator and have drives, so they catch every way of escaping
+    windows_path = pathlib.PureWindowsPath(rel_path)
+    return not windows_path.anchor and ".." not in windows_path.parts
 
-    for path in old_paths:
-        if path.exists():
-            console.print(f"[blue]Found UI at: {path}[/blue]")
-            return path
 
-    console.print(f"[red]Error: UI directory not found. Searched paths: {[str(p) for p in old_paths]}[/red]")
-    return None
+def _iter_ui_members(
+    zip_ref: zipfile.ZipFile, ui_prefix: str
+) -> Iterator[tuple[pathlib.PurePosixPath, zipfile.ZipInfo]]:
+    """
+    Iterate over the UI directory members of the archive, with their paths relative to the UI directory.
 
+    Members in excluded directories are skipped, and so are members with absolute paths or ".." segments, which
+    would be written outside of the UI directory.
+    """
+    for member in zip_ref.infolist():
+        if not member.filename.startswith(ui_prefix):
+            continue
 
-def _update_package_json(ui_path: pathlib.Path) -> None:
-    """Update package.json to use published versions instead of workspace versions."""
-    package_json_path = ui_path / "package.json"
-    if not package_json_path.exists():
-        return
+        name = member.filename[len(ui_prefix) :]
+        if not _is_safe_member_path(name):
+            continue
+        rel_path = pathlib.PurePosixPath(name)
+        if not rel_path.parts or any(part in UI_EXCLUDED_NAMES for part in rel_path.parts):
+            continue
+        yield rel_path, member
 
-    try:
-        with open(package_json_path) as f:
-            package_data = json.load(f)
 
-        # Replace "*" versions with actual published versions for @ragbits packages
-        if "dependencies" in package_data and "@ragbits/api-client-react" in package_data["dependencies"]:
-            package_data["dependencies"]["@ragbits/api-client-react"] = "^0.0.3"
+def _patch_package_json(package_data: dict[str, Any]) -> None:
+    """Replace "*" versions with actual published versions for @ragbits packages."""
+    if "dependencies" in package_data and "@ragbits/api-client-react" in package_data["dependencies"]:
+        package_data["dependencies"]["@ragbits/api-client-react"] = "^0.0.3"
 
-        # Write back the updated package.json
-        with open(package_json_path, "w") as f:
-            json.dump(package_data, f, indent=2)
-    except Exception as e:
-        console.print(f"[yellow]Warning: Could not update package.json: {e}[/yellow]")
 
+def copy_ui_from_ragbits(project_path: str, context: dict[str, Any]) -> bool:
+    """Download and copy UI from ragbits GitHub repository, returning whether it was copied."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
 
-def copy_ui_from_ragbits(project_path: str, context: dict[str, Any]) -> None:
-    """Download and copy UI from ragbits GitHub repository."""
     ui_path = pathlib.Path(project_path) / "ui"
 
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
@@ -156,126 +196,162 @@ def copy_ui_from_ragbits(project_path: str, context: dict[str, Any]) -> None:
 
         # Get the latest release version
         latest_version = _get_latest_version()
-        github_url = f"https://github.com/deepsense-ai/ragbits/archive/refs/tags/{latest_version}.zip"
 
         try:
-            # Create a temporary directory for the download
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = pathlib.Path(temp_dir)
+            # Read only the UI directory of the archive, then write it into the project in one pass
+            build_ragbits_ui_tree(latest_version, verbose=True).flush(ui_path)
+        except Exception as e:
+            console.print(f"[red]Error downloading UI: {e}[/red]")
+            return False
 
-                # Download and extract the UI
-                extracted_dir = _download_and_extract_ui(github_url, temp_path)
-                if not extracted_dir:
-                    return
+    console.print(f"[green]✓ UI downloaded and copied to {ui_path}[/green]")
+    return True
 
-                # Find the UI directory
-                ragbits_ui_source = _find_ui_directory(extracted_dir)
-                if not ragbits_ui_source:
-                    return
 
-                # Copy the UI directory
-                shutil.copytree(ragbits_ui_source, ui_path, dirs_exist_ok=True)
+def build_ui_template_tree(context: dict[str, Any], template_type: Template_Type) -> OutputTree:
+    """
+    Render a UI template into an in-memory output tree.
 
-                # Clean up temporary files
-                for cleanup_path in [ui_path / "node_modules", ui_path / ".vite"]:
-                    if cleanup_path.exists():
-                        shutil.rmtree(cleanup_path)
+    Args:
+        context: Context for template rendering
+        template_type: UI template to render
 
-                # Update package.json
-                _update_package_json(ui_path)
+    Returns:
+        The files of the UI project, relative to the UI directory
 
-        except Exception as e:
-            console.print(f"[red]Error downloading UI: {e}[/red]")
-            return
+    Raises:
+        FileNotFoundError: If the UI template does not exist
+    """
+    template_path = UI_TEMPLATES_DIR / template_type.value
+    if not exists(template_path):
+        raise FileNotFoundError(f"Template not found at {template_path}")
+
+    output_tree = OutputTree()
+    for entry in get_template_manifest(template_path).files:
+        item = template_path / entry.path
+
+        # Process path parts for Jinja templating (for directory names)
+        target_path = pathlib.PurePosixPath(*(render_path_segment(part, context) for part in entry.parts))
+
+        # Process as template if it's a .j2 file
+        if entry.is_jinja:
+            # Render template with context using the shared, cached environment, save without .j2 extension
+            output_tree.add_content(str(target_path.with_suffix("")), render_file(item, context).encode())
+        else:
+            # Simple file copy, sharing data blocks with the template where the filesystem allows it
+            output_tree.add_copy(str(target_path), item)
+    return output_tree
+
+
+def build_ragbits_ui_tree(version: str, verbose: bool = False) -> OutputTree:
+    """
+    Build the UI of the given ragbits release as an in-memory output tree, from the cached release archive.
+
+    Args:
+        version: Release tag of ragbits
+        verbose: Whether to report using a cached archive or an alternative UI directory on the console
+
+    Returns:
+        The files of the UI project, relative to the UI directory
+
+    Raises:
+        ValueError: If the archive URL is not allowed or the archive has no UI directory
+        requests.RequestException: If the archive cannot be downloaded
+    """
+    archive_url = _get_ui_archive_url(version)
+    if not _validate_url(archive_url):
+        raise ValueError(f"Invalid UI archive URL {archive_url}")
+
+    output_tree = OutputTree()
+    with _open_ui_archive(archive_url, verbose) as archive, zipfile.ZipFile(archive) as zip_ref:
+        ui_prefix = _find_ui_prefix(zip_ref, verbose)
+        if not ui_prefix:
+            raise ValueError(f"UI directory not found in {archive_url}")
+        for rel_path, member in _iter_ui_members(zip_ref, ui_prefix):
+            if member.is_dir():
+                output_tree.add_directory(str(rel_path))
+            else:
+                output_tree.add_content(str(rel_path), zip_ref.read(member))
+
+    if "package.json" in output_tree.files:
+        package_data = json.loads(output_tree.files["package.json"].read())
+        _patch_package_json(package_data)
+        output_tree.add_content("package.json", json.dumps(package_data, indent=2).encode())
+    return output_tree
+
+
+def build_ui_tree(
+    context: dict[str, Any], ui_version: str | None = None, version_resolver: VersionResolver | None = None
+) -> tuple[str, OutputTree] | None:
+    """
+    Build the UI selected in the context as an in-memory output tree, without any console output.
+
+    Args:
+        context: Context of the project, with its UI options
+        ui_version: Ragbits release to copy the UI from, the latest one by default
+        version_resolver: Resolver of the latest release, the one shared by the process by default
+
+    Returns:
+        The directory of the UI inside the project and its files, or None for the default hosted UI
+    """
+    ui_type = context.get("ui_type", UI_Type.DEFAULT)
+    if ui_type == UI_Type.COPY:
+        resolver = version_resolver or get_version_resolver()
+        return "ui", build_ragbits_ui_tree(ui_version or resolver.resolve("ragbits_ui").version)
+    if ui_type == UI_Type.CREATE:
+        template_type = context.get("framework") or Template_Type.VANILLA_TS
+        return context.get("ui_project_name", "ui"), build_ui_template_tree(context, template_type)
+    return None
 
-    console.print(f"[green]✓ UI downloaded and copied to {ui_path}[/green]")
 
+def create_ui_from_template(project_path: str, context: dict[str, Any], template_type: Template_Type) -> bool:
+    """Create UI project from template files, returning whether it was created."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
 
-def create_ui_from_template(project_path: str, context: dict[str, Any], template_type: Template_Type) -> None:
-    """Create UI project from template files."""
     ui_project_name = context.get("ui_project_name", "ui")
     ui_path = pathlib.Path(project_path) / ui_project_name
-    template_path = UI_TEMPLATES_DIR / template_type.value
-
-    if not template_path.exists():
-        console.print(f"[red]Error: Template not found at {template_path}[/red]")
-        return
 
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
         progress.add_task("[cyan]Creating UI project...", total=None)
 
-        # Create UI directory
-        ui_path.mkdir(parents=True, exist_ok=True)
-
-        # Process all template files
-        for item in template_path.glob("**/*"):
-            if item.is_file():
-                # Get relative path from template root
-                rel_path = item.relative_to(template_path)
-
-                # Process path parts for Jinja templating (for directory names)
-                path_parts = []
-                for part in rel_path.parts:
-                    if "{{" in part and "}}" in part:
-                        # Render the directory name as a template
-                        name_template = jinja2.Template(part)
-                        rendered_part = name_template.render(**context)
-                        path_parts.append(rendered_part)
-                    else:
-                        path_parts.append(part)
-
-                # Construct the target path with processed directory names
-                target_rel_path = pathlib.Path(*path_parts) if path_parts else pathlib.Path()
-                target_path = ui_path / target_rel_path
-
-                # Create parent directories if they don't exist
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                # Process as template if it's a .j2 file
-                if item.suffix == ".j2":
-                    with open(item) as f:
-                        template_content = f.read()
-
-                    # Render template with context
-                    template = jinja2.Template(template_content)
-                    rendered_content = template.render(**context)
-
-                    # Save to target path without .j2 extension
-                    target_path = target_path.with_suffix("")
-                    with open(target_path, "w") as f:
-                        f.write(rendered_content)
-                else:
-                    # Simple file copy
-                    shutil.copy2(item, target_path)
+        # Render all template files in memory, then write them in one pass with directories created once
+        try:
+            output_tree = build_ui_template_tree(context, template_type)
+        except FileNotFoundError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            return False
+        output_tree.flush(ui_path)
 
     console.print(f"[green]✓ UI project created at {ui_path}[/green]")
+    return True
 
 
-def create_typescript_ui(project_path: str, context: dict[str, Any]) -> None:
+def create_typescript_ui(project_path: str, context: dict[str, Any]) -> bool:
     """Create an empty TypeScript UI project."""
-    create_ui_from_template(project_path, context, Template_Type.VANILLA_TS)
+    return create_ui_from_template(project_path, context, Template_Type.VANILLA_TS)
 
 
-def create_react_ui(project_path: str, context: dict[str, Any]) -> None:
+def create_react_ui(project_path: str, context: dict[str, Any]) -> bool:
     """Create an empty React UI project."""
-    create_ui_from_template(project_path, context, Template_Type.REACT_TS)
+    return create_ui_from_template(project_path, context, Template_Type.REACT_TS)
 
 
-def generate_ui(project_path: str, context: dict[str, Any]) -> None:
-    """Generate UI based on the selected option."""
+def generate_ui(project_path: str, context: dict[str, Any]) -> bool:
+    """Generate UI based on the selected option, returning whether it was generated or the hosted UI is used."""
     ui_type = context.get("ui_type", UI_Type.DEFAULT)
 
     if ui_type == UI_Type.DEFAULT:
         console.print("[yellow]Using default hosted UI on localhost:8000[/yellow]")
         console.print("[blue]You can access the UI at http://localhost:8000 when your Ragbits app is running[/blue]")
-        return
+        return True
 
     elif ui_type == UI_Type.COPY:
-        copy_ui_from_ragbits(project_path, context)
+        return copy_ui_from_ragbits(project_path, context)
 
     elif ui_type == UI_Type.CREATE:
         framework = context.get("framework", Template_Type.VANILLA_TS)
         if framework == Template_Type.VANILLA_TS:
-            create_typescript_ui(project_path, context)
+            return create_typescript_ui(project_path, context)
         elif framework == Template_Type.REACT_TS:
-            create_react_ui(project_path, context)
+            return create_react_ui(project_path, context)
+    return False
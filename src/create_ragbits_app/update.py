@@ -0,0 +1,272 @@
+"""
+Incremental project updates for create-ragbits-app.
+
+This module provides functionality for:
+1. Re-rendering a generated project from the answers recorded in its lockfile, with optional overrides
+2. Applying only the rendered files that changed, leaving files edited by the user untouched
+3. Three-way merging user edits with template changes, when the original render can be reproduced
+"""
+
+import pathlib
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any
+
+from rich.console import Console
+
+from create_ragbits_app.copying import make_directories, move_file
+from create_ragbits_app.lockfile import (
+    BUNDLED_TEMPLATE_SOURCE,
+    build_lockfile,
+    hash_file,
+    load_lockfile,
+    write_lockfile,
+)
+from create_ragbits_app.template_sources import parse_template_source
+from create_ragbits_app.template_utils import get_shared_config, get_template_config, render_project
+
+console = Console()
+
+
+@dataclass
+class UpdateResult:
+    """Files affected by a project update, as POSIX paths relative to the project root."""
+
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    merged: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)
+    writes: dict[str, bytes | pathlib.Path] = field(default_factory=dict, repr=False)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the update changes any file of the project."""
+        return bool(self.created or self.updated or self.merged or self.deleted)
+
+
+def _build_context_from_lockfile(
+    lockfile: dict[str, Any], answers: dict[str, Any], ragbits_version: str, templates_dir: pathlib.Path
+) -> dict[str, Any]:
+    """Validate the given answers and build the context of the project recorded in a lockfile."""
+    from create_ragbits_app.batch import build_batch_context
+
+    template_name = lockfile["template"]
+    project = {
+        "project_name": lockfile["project_name"],
+        "template": template_name,
+        "answers": answers,
+        "ui": lockfile.get("ui"),
+    }
+    return build_batch_context(
+        project, get_template_config(template_name, templates_dir), get_shared_config(templates_dir), ragbits_version
+    )
+
+
+def _render_from_lockfile(
+    lockfile: dict[str, Any], context: dict[str, Any], templates_dir: pathlib.Path, output_path: pathlib.Path
+) -> dict[str, str]:
+    """Render the project recorded in a lockfile with the given context into a scratch directory."""
+    return render_project(lockfile["template"], str(output_path), context, verbose=False, templates_dir=templates_dir)
+
+
+def _merge_file(current: pathlib.Path, base: pathlib.Path, new: pathlib.Path) -> tuple[bytes, bool] | None:
+    """
+    Three-way merge template changes into a file edited by the user.
+
+    Returns:
+        The merged content and whether it is free of conflicts, or None if git is not available
+    """
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["git", "merge-file", "-p", "-L", "yours", "-L", "original", "-L", "template", current, base, new],  # noqa: S607
+            capture_output=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if result.returncode < 0 or result.returncode > 127:  # noqa: PLR2004
+        return None
+    return result.stdout, result.returncode == 0
+
+
+def _plan_update(
+    project_path: pathlib.Path,
+    lockfile: dict[str, Any],
+    new_files: dict[str, str],
+    templates_dir: pathlib.Path,
+    new_root: pathlib.Path,
+    base_root: pathlib.Path,
+) -> UpdateResult:
+    """Compare the new render with the lockfile and the files on disk, deciding what to do with every file."""
+    locked_files: dict[str, str] = lockfile["files"]
+    base_files: dict[str, str] | None = None
+    result = UpdateResult()
+
+    for rel_path, new_hash in sorted(new_files.items()):
+        target = project_path / rel_path
+        disk_hash = hash_file(target) if target.is_file() else None
+        locked_hash = locked_files.get(rel_path)
+        if new_hash in (disk_hash, locked_hash):
+            continue  # already up to date, or unchanged in the template and edited or deleted by the user
+        if disk_hash is None:
+            if locked_hash is None:
+                result.created.append(rel_path)
+                result.writes[rel_path] = new_root / rel_path
+            else:
+                result.kept.append(rel_path)  # deleted by the user
+            continue
+        if disk_hash == locked_hash:
+            result.updated.append(rel_path)
+            result.writes[rel_path] = new_root / rel_path
+            continue
+
+        # Edited by the user, merge only against the exact content it was edited from
+        if base_files is None:
+            base_context = _build_context_from_lockfile(
+                lockfile, lockfile["answers"], lockfile["ragbits_version"], templates_dir
+            )
+            base_files = _render_from_lockfile(lockfile, base_context, templates_dir, base_root)
+        merged = None
+        if locked_hash is not None and base_files.get(rel_path) == locked_hash:
+            merged = _merge_file(target, base_root / rel_path, new_root / rel_path)
+        if merged is None or not merged[1]:
+            result.conflicts.append(rel_path)
+            continue
+        result.merged.append(rel_path)
+        result.writes[rel_path] = merged[0]
+
+    _plan_removed_files(project_path, locked_files, new_files, result)
+    return result
+
+
+def _plan_removed_files(
+    project_path: pathlib.Path, locked_files: dict[str, str], new_files: dict[str, str], result: UpdateResult
+) -> None:
+    """Delete files no longer rendered by the template, unless the user edited them."""
+    for rel_path, locked_hash in sorted(locked_files.items()):
+        target = project_path / rel_path
+        if rel_path in new_files or not target.is_file():
+            continue
+        if hash_file(target) == locked_hash:
+            result.deleted.append(rel_path)
+        else:
+            result.kept.append(rel_path)
+
+
+def _apply_update(project_path: pathlib.Path, result: UpdateResult) -> None:
+    """Write the planned changes into the project."""
+    make_directories(project_path, [pathlib.PurePosixPath(rel_path).parent for rel_path in result.writes])
+    for rel_path, content in result.writes.items():
+        target = project_path / rel_path
+        if isinstance(content, pathlib.Path):
+            # Files rendered into the scratch directory are moved into place instead of copied
+            move_file(content, target)
+        else:
+            target.write_bytes(content)
+    for rel_path in result.deleted:
+        (project_path / rel_path).unlink()
+
+
+def _get_locked_files(locked_files: dict[str, str], new_files: dict[str, str], result: UpdateResult) -> dict[str, str]:
+    """
+    Get the file hashes to record in the lockfile after an update.
+
+    The lockfile records pristine renders, so merged files are still detected as edited by the next update.
+    Conflicting files keep their old hash, or no hash when the template added a file the user already had, so the
+    conflict is reported again until it is resolved.
+    """
+    files = dict(new_files)
+    for rel_path in result.conflicts:
+        if rel_path in locked_files:
+            files[rel_path] = locked_files[rel_path]
+        else:
+            del files[rel_path]
+    return files
+
+
+def update_project(
+    project_path: pathlib.Path,
+    answers: dict[str, Any] | None = None,
+    ragbits_version: str | None = None,
+    dry_run: bool = False,
+) -> UpdateResult:
+    """
+    Update a generated project to new answers, ragbits version or template changes.
+
+    Files the user did not edit are replaced with their new render, and files removed from the template are
+    deleted. Edited files are three-way merged when the original render can be reproduced, otherwise they are
+    kept and reported as conflicts. UI directories created by generate_ui are not touched.
+
+    Args:
+        project_path: Root directory of the generated project
+        answers: Answers overriding the ones recorded in the lockfile
+        ragbits_version: Ragbits version to render into the project, defaults to the recorded one
+        dry_run: Only report what would change, without writing anything
+
+    Returns:
+        Files affected by the update
+
+    Raises:
+        ValueError: If the project has no valid lockfile, its template is no longer available, or the answers are
+            not valid
+    """
+    lockfile = load_lockfile(project_path)
+    template_name = lockfile["template"]
+    # Projects created before template sources were recorded always come from the bundled templates
+    template_source = parse_template_source(lockfile.get("template_source", BUNDLED_TEMPLATE_SOURCE))
+    try:
+        templates_dir = template_source.get_templates_dir(template_name)
+    except ValueError as e:
+        raise ValueError(f"Template '{template_name}' is no longer available: {e}") from e
+
+    locked_files: dict[str, str] = lockfile["files"]
+    new_answers = {**lockfile["answers"], **(answers or {})}
+    new_version = ragbits_version or lockfile["ragbits_version"]
+
+    with tempfile.TemporaryDirectory(prefix="create-ragbits-app-") as tmp_dir:
+        new_root, base_root = pathlib.Path(tmp_dir) / "new", pathlib.Path(tmp_dir) / "base"
+        new_context = _build_context_from_lockfile(lockfile, new_answers, new_version, templates_dir)
+        new_files = _render_from_lockfile(lockfile, new_context, templates_dir, new_root)
+        result = _plan_update(project_path, lockfile, new_files, templates_dir, new_root, base_root)
+        if dry_run:
+            return result
+
+        # The new lockfile is built before the project is touched, so nothing is written if building it fails. It
+        # records the validated answers the project was rendered with, not the overrides as they were given
+        new_lockfile = build_lockfile(
+            template_name,
+            get_template_config(template_name, templates_dir),
+            get_shared_config(templates_dir),
+            new_context,
+            _get_locked_files(locked_files, new_files, result),
+            template_source.spec,
+        )
+        _apply_update(project_path, result)
+
+    write_lockfile(project_path, new_lockfile)
+    return result
+
+
+def print_update_summary(result: UpdateResult, dry_run: bool = False) -> None:
+    """Print the files affected by a project update."""
+    prefix = "Would update" if dry_run else "Updated"
+    if not result.changed and not result.conflicts and not result.kept:
+        console.print("[green]Project is up to date.[/green]")
+        return
+
+    sections = [
+        ("created", result.created, "green"),
+        ("updated", result.updated, "green"),
+        ("merged with your changes", result.merged, "cyan"),
+        ("deleted", result.deleted, "yellow"),
+    ]
+    for label, paths, color in sections:
+        for path in paths:
+            console.print(f"[{color}]{prefix}: {path} ({label})[/{color}]")
+    for path in result.conflicts:
+        console.print(f"[red]Conflict: {path} was edited and changed in the template, left untouched[/red]")
+    for path in result.kept:
+        console.print(f"[yellow]Kept: {path} was edited or deleted by you, left as is[/yellow]")
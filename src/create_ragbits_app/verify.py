@@ -0,0 +1,246 @@
+"""
+Combinatorial template verification for create-ragbits-app.
+
+This module provides functionality for:
+1. Enumerating every combination of answers to the questions of a template, the shared template and the UI options
+2. Rendering each file once per distinct value of the context variables it reads, in a process pool
+3. Checking that every rendered file compiles as Python or parses as YAML, JSON or TOML
+"""
+
+import itertools
+import json
+import os
+import pathlib
+import time
+import tomllib
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from rich.console import Console
+
+from create_ragbits_app.rendering import get_template_variables
+from create_ragbits_app.template_config_base import ConfirmQuestion, ListQuestion, MultiSelectQuestion, Question
+from create_ragbits_app.template_utils import (
+    TEMPLATES_DIR,
+    build_project_context,
+    get_available_templates,
+    get_shared_config,
+    get_template_config,
+    plan_project,
+    render_target,
+    resolve_template_answers,
+)
+from create_ragbits_app.ui_generator import Template_Type, UI_Type, UIOptions
+
+console = Console()
+
+VERIFY_PROJECT_NAME = "verify-app"
+VERIFY_RAGBITS_VERSION = "1.0.0"
+
+UI_OPTION_CHOICES: tuple[UIOptions, ...] = (
+    {"ui_type": UI_Type.DEFAULT, "framework": None, "ui_project_name": "ui"},
+    {"ui_type": UI_Type.COPY, "framework": None, "ui_project_name": "ui"},
+    {"ui_type": UI_Type.CREATE, "framework": Template_Type.VANILLA_TS, "ui_project_name": "ui"},
+    {"ui_type": UI_Type.CREATE, "framework": Template_Type.REACT_TS, "ui_project_name": "ui"},
+)
+
+
+def get_question_options(question: Question) -> list[Any]:
+    """Get every possible answer to a question, multi-select questions give the whole power set of their choices."""
+    if isinstance(question, ListQuestion):
+        return list(question.choices)
+    if isinstance(question, ConfirmQuestion):
+        return [True, False]
+    if isinstance(question, MultiSelectQuestion):
+        values = [choice["value"] if isinstance(choice, dict) else choice for choice in question.choices]
+        return [list(subset) for size in range(len(values) + 1) for subset in itertools.combinations(values, size)]
+    return [question.default_answer()]
+
+
+def iter_answer_combinations(questions: list[Question]) -> Iterator[dict[str, Any]]:
+    """Iterate over every combination of answers to the given questions."""
+    options = [get_question_options(question) for question in questions]
+    for values in itertools.product(*options):
+        yield {question.name: value for question, value in zip(questions, values, strict=True)}
+
+
+def check_content(path: pathlib.PurePosixPath, content: str) -> None:
+    """
+    Check that a generated file is syntactically valid for its type.
+
+    Raises:
+        Exception: Any error raised while compiling or parsing the file
+    """
+    if path.suffix == ".py":
+        compile(content, str(path), "exec")
+    elif path.suffix in {".yml", ".yaml"}:
+        import yaml
+
+        list(yaml.load_all(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)))  # noqa: S506
+    elif path.suffix == ".json":
+        json.loads(content)
+    elif path.suffix == ".toml":
+        tomllib.loads(content)
+
+
+def verify_file(target: str, sources: tuple[pathlib.Path, ...], context: dict[str, Any]) -> str | None:
+    """
+    Render a single file and check its contents, runs in worker processes.
+
+    Returns:
+        Description of the error, or None if the file is valid
+    """
+    try:
+        content = render_target(target, list(sources), context, verbose=False).decode()
+        check_content(pathlib.PurePosixPath(target), content)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+@dataclass
+class RenderJob:
+    """A file rendered with a distinct subset of the context, shared by all combinations that produce it."""
+
+    target: str
+    sources: tuple[pathlib.Path, ...]
+    context: dict[str, Any]
+    answers: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class VerifyFailure:
+    """A file that failed to render or is not valid."""
+
+    target: str
+    error: str
+    answers: list[dict[str, Any]]
+
+
+@dataclass
+class VerifyResult:
+    """Outcome of verifying templates over all answer combinations."""
+
+    combinations: int = 0
+    files: int = 0
+    renders: int = 0
+    elapsed: float = 0.0
+    failures: list[VerifyFailure] = field(default_factory=list)
+
+
+def _get_job_context(sources: list[pathlib.Path], context: dict[str, Any]) -> dict[str, Any]:
+    """Get the part of the context a file reads, or the whole context if it cannot be determined."""
+    variables: set[str] = set()
+    for source in sources:
+        if source.suffix != ".j2":
+            continue
+        source_variables = get_template_variables(source)
+        if source_variables is None:
+            return context
+        variables |= source_variables
+    return {name: context[name] for name in sorted(variables) if name in context}
+
+
+def collect_jobs(
+    template_names: list[str], templates_dir: pathlib.Path = TEMPLATES_DIR
+) -> tuple[list[RenderJob], VerifyResult]:
+    """
+    Plan every answer combination of the templates and deduplicate the files they render.
+
+    Args:
+        template_names: Names of the templates to verify
+        templates_dir: Directory containing the templates and the shared template
+
+    Returns:
+        Render jobs, one per template file and relevant context, and the result to fill in
+    """
+    shared_config = get_shared_config(templates_dir)
+    # Shared files rendered with the same variables are the same for every template, so they are keyed without it
+    jobs: dict[tuple[str, tuple[pathlib.Path, ...], str], RenderJob] = {}
+    result = VerifyResult()
+
+    for template_name in template_names:
+        template_config = get_template_config(template_name, templates_dir)
+        questions = [*template_config.questions, *shared_config.questions]
+        for answers, ui_options in itertools.product(iter_answer_combinations(questions), UI_OPTION_CHOICES):
+            context = build_project_context(
+                VERIFY_PROJECT_NAME,
+                template_config,
+                shared_config,
+                resolve_template_answers(template_config, answers),
+                resolve_template_answers(shared_config, answers),
+                ui_options,
+                VERIFY_RAGBITS_VERSION,
+            )
+            result.combinations += 1
+
+            plan = plan_project(template_name, context, templates_dir)
+            for target, sources in plan.files.items():
+                result.files += 1
+                job_context = _get_job_context(sources, context)
+                key = (target, tuple(sources), json.dumps(job_context, sort_keys=True, default=str))
+                if key not in jobs:
+                    jobs[key] = RenderJob(target, tuple(sources), job_context)
+                jobs[key].answers.append({"template": template_name, **answers, "ui_type": ui_options["ui_type"].value})
+
+    result.renders = len(jobs)
+    return list(jobs.values()), result
+
+
+def verify_templates(
+    template_names: list[str] | None = None,
+    workers: int | None = None,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+) -> VerifyResult:
+    """
+    Render and check templates over every combination of answers.
+
+    Args:
+        template_names: Names of the templates to verify, all templates by default
+        workers: Number of worker processes, all CPUs by default, 1 renders in the current process
+        templates_dir: Directory containing the templates and the shared template
+
+    Returns:
+        Counts of combinations, files and renders, and the files that failed
+    """
+    started_at = time.perf_counter()
+    if template_names is None:
+        template_names = [t["dir_name"] for t in get_available_templates(templates_dir)]
+
+    job_list, result = collect_jobs(template_names, templates_dir)
+    args = ([job.target for job in job_list], [job.sources for job in job_list], [job.context for job in job_list])
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        errors = list(map(verify_file, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(verify_file, *args, chunksize=max(1, len(job_list) // (workers * 4))))
+
+    result.failures = [
+        VerifyFailure(job.target, error, job.answers)
+        for job, error in zip(job_list, errors, strict=True)
+        if error is not None
+    ]
+    result.elapsed = time.perf_counter() - started_at
+    return result
+
+
+def print_verify_result(result: VerifyResult) -> None:
+    """Print the outcome of a verification."""
+    for failure in result.failures:
+        console.print(f"[red]✗ {failure.target}[/red]")
+        error = failure.error.replace("\n", "\n    ")
+        console.print(f"    {error}")
+        console.print(f"    in {len(failure.answers)} combinations, e.g. {failure.answers[0]}")
+
+    summary = (
+        f"{result.combinations} combinations, {result.files} files checked with {result.renders} unique renders "
+        f"in {result.elapsed:.2f}s"
+    )
+    if result.failures:
+        console.print(f"\n[bold red]{len(result.failures)} renders failed: {summary}[/bold red]")
+    else:
+        console.print(f"[bold green]✓ All templates valid: {summary}[/bold green]")
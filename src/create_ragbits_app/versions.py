@@ -0,0 +1,173 @@
+"""
+Version resolution for create-ragbits-app.
+
+This module provides functionality for:
+1. Resolving the latest ragbits package version (PyPI) and UI release tag (GitHub) concurrently
+2. Running the lookups in the background, so prompts never wait on the network
+3. Caching results on disk with a TTL and ETag revalidation, falling back to the cache when offline
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
+
+from create_ragbits_app.rendering import get_cache_dir
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# How long a cached version is used without revalidating it
+DEFAULT_TTL_SECONDS = 60 * 60
+
+# Time allowed for each lookup. Commands that need a version before any prompt (batch, the API) wait for the lookups,
+# so a slow network falls back to the cached or default version instead of stalling them
+LOOKUP_TIMEOUT_SECONDS = 1
+
+
+@dataclass(frozen=True)
+class VersionSource:
+    """Remote source of a version."""
+
+    url: str
+    extract: Callable[[Any], str]
+    """Function extracting the version from the JSON response."""
+    default: str
+    """Version used when neither the network nor the cache can provide one."""
+
+
+VERSION_SOURCES = {
+    "ragbits": VersionSource(
+        url="https://pypi.org/pypi/ragbits/json",
+        extract=lambda data: data["info"]["version"],
+        default="0.10.0",
+    ),
+    "ragbits_ui": VersionSource(
+        url="https://api.github.com/repos/deepsense-ai/ragbits/releases/latest",
+        extract=lambda data: data["tag_name"],
+        default="v1.0.0",
+    ),
+}
+
+
+class ResolvedVersion(NamedTuple):
+    """Version together with where it was resolved from."""
+
+    version: str
+    source: Literal["network", "cache", "default"]
+
+
+class VersionResolver:
+    """
+    Resolves versions of all sources concurrently in a background thread.
+
+    Results are cached on disk. A cached version younger than the TTL is used as is, an older one is
+    revalidated with its ETag, and it is used as a fallback when the lookup fails.
+    """
+
+    def __init__(
+        self,
+        sources: dict[str, VersionSource] | None = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        cache_path: os.PathLike | None = None,
+    ):
+        self.sources = sources if sources is not None else VERSION_SOURCES
+        self.ttl = ttl
+        self.cache_path = cache_path if cache_path is not None else get_cache_dir() / "versions.json"
+        self._future: concurrent.futures.Future[dict[str, ResolvedVersion]] | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> concurrent.futures.Future[dict[str, ResolvedVersion]]:
+        """Start resolving all versions in the background, if not started yet."""
+        with self._lock:
+            if self._future is None:
+                self._future = concurrent.futures.Future()
+                threading.Thread(target=self._run, args=(self._future,), name="version-resolver", daemon=True).start()
+            return self._future
+
+    def resolve(self, name: str) -> ResolvedVersion:
+        """Wait for and return the version of the given source."""
+        return self.start().result()[name]
+
+    async def resolve_async(self, name: str) -> ResolvedVersion:
+        """Wait for and return the version of the given source without blocking the event loop."""
+        return (await asyncio.wrap_future(self.start()))[name]
+
+    def cached_version(self, name: str) -> str:
+        """Get the last known version of the given source without touching the network."""
+        entry = self._load_cache().get(name)
+        return entry["version"] if entry else self.sources[name].default
+
+    def _run(self, future: concurrent.futures.Future[dict[str, ResolvedVersion]]) -> None:
+        try:
+            future.set_result(asyncio.run(self._resolve_all()))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _load_cache(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: dict[str, dict[str, Any]]) -> None:
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    async def _resolve_all(self) -> dict[str, ResolvedVersion]:
+        import aiohttp
+
+        cache = self._load_cache()
+        timeout = aiohttp.ClientTimeout(total=LOOKUP_TIMEOUT_SECONDS)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            resolved = await asyncio.gather(
+                *(self._resolve_one(session, name, source, cache) for name, source in self.sources.items())
+            )
+        self._save_cache(cache)
+        return dict(zip(self.sources, resolved, strict=True))
+
+    async def _resolve_one(
+        self,
+        session: "aiohttp.ClientSession",
+        name: str,
+        source: VersionSource,
+        cache: dict[str, dict[str, Any]],
+    ) -> ResolvedVersion:
+        entry = cache.get(name)
+        if entry and time.time() - entry.get("fetched_at", 0) < self.ttl:
+            return ResolvedVersion(entry["version"], "cache")
+
+        headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else {}
+        try:
+            async with session.get(source.url, headers=headers) as response:
+                if response.status == 304 and entry:  # noqa: PLR2004
+                    entry["fetched_at"] = time.time()
+                    return ResolvedVersion(entry["version"], "network")
+                response.raise_for_status()
+                version = source.extract(await response.json())
+                cache[name] = {"version": version, "etag": response.headers.get("ETag"), "fetched_at": time.time()}
+                return ResolvedVersion(version, "network")
+        except Exception:
+            # Offline, rate limited or unexpected response, fall back to the last known version
+            if entry:
+                return ResolvedVersion(entry["version"], "cache")
+            return ResolvedVersion(source.default, "default")
+
+
+@functools.cache
+def get_version_resolver() -> VersionResolver:
+    """Get the version resolver shared by all steps of a CLI run."""
+    return VersionResolver()
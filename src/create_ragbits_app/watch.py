@@ -0,0 +1,402 @@
+"""
+Watch mode for template authors.
+
+This module provides functionality for:
+1. Rendering a project once from a fixed set of answers, and keeping it in sync while its templates are edited
+2. Polling the selected template, the shared template and the answers file for changes
+3. Re-rendering only the files affected by a change, using a graph of the template files and context variables
+   every output file depends on
+
+Changes to a template_config.py or to the answers file rebuild the context. Only the files reading a context
+variable whose value changed are rendered again, together with files added to or removed from the project.
+"""
+
+import contextlib
+import os
+import pathlib
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import jinja2
+from rich.console import Console
+
+from create_ragbits_app.batch import build_batch_context, load_answers_file
+from create_ragbits_app.lockfile import (
+    BUNDLED_TEMPLATE_SOURCE,
+    LOCKFILE_NAME,
+    build_lockfile,
+    dump_lockfile,
+    hash_bytes,
+    load_lockfile,
+)
+from create_ragbits_app.rendering import get_template_variables
+from create_ragbits_app.resources import is_archived, read_bytes
+from create_ragbits_app.template_registry import CONFIG_FILE_NAME
+from create_ragbits_app.template_utils import (
+    TEMPLATES_DIR,
+    ProjectPlan,
+    get_shared_config,
+    get_shared_templates_dir,
+    get_template_config,
+    plan_project,
+    render_target,
+)
+
+console = Console()
+
+# Time between two scans of the watched files, bounding the latency between an edit and the re-render
+POLL_INTERVAL_SECONDS = 0.2
+
+# Directories below the watched roots whose changes never affect the project
+IGNORED_DIRECTORIES = frozenset({"__pycache__", ".git"})
+
+
+@dataclass
+class DependencyGraph:
+    """Output files of a project mapped to the template files and context variables they are rendered from."""
+
+    sources: dict[str, tuple[pathlib.Path, ...]] = field(default_factory=dict)
+    # Context variables read by each output file, None if they are not known and any change may affect it
+    variables: dict[str, frozenset[str] | None] = field(default_factory=dict)
+    dependents: dict[pathlib.Path, set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_plan(cls, plan: ProjectPlan) -> "DependencyGraph":
+        """Build the graph of all files in a project plan."""
+        graph = cls()
+        for target, sources in plan.files.items():
+            graph.add(target, sources)
+        return graph
+
+    def add(self, target: str, sources: list[pathlib.Path]) -> None:
+        """Add an output file built from the given template files."""
+        self.sources[target] = tuple(sources)
+        variables: set[str] | None = set()
+        for source in sources:
+            self.dependents.setdefault(source, set()).add(target)
+            if source.suffix != ".j2" or variables is None:
+                continue
+            try:
+                source_variables = get_template_variables(source)
+            except jinja2.TemplateSyntaxError:
+                # The error is reported when the file is rendered, until then any change may fix it
+                source_variables = None
+            variables = None if source_variables is None else variables | source_variables
+        self.variables[target] = None if variables is None else frozenset(variables)
+
+    def get_affected(self, changed_files: set[pathlib.Path], changed_variables: set[str]) -> set[str]:
+        """
+        Get the output files affected by changes of template files and context variables.
+
+        Args:
+            changed_files: Template files that were modified, added or removed
+            changed_variables: Context variables whose value changed
+
+        Returns:
+            Paths of the output files that have to be rendered again
+        """
+        affected: set[str] = set()
+        for path in changed_files:
+            affected |= self.dependents.get(path, set())
+
+        # Files with unknown dependencies may include any template, or read any variable
+        templates_changed = any(path.suffix == ".j2" for path in changed_files)
+        for target, variables in self.variables.items():
+            if variables is None:
+                if templates_changed or changed_variables:
+                    affected.add(target)
+            elif not variables.isdisjoint(changed_variables):
+                affected.add(target)
+        return affected
+
+
+@dataclass
+class WatchUpdate:
+    """Outcome of rendering the project after a change."""
+
+    written: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    rendered: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def _get_changed_variables(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    return {name for name in old.keys() | new.keys() if name not in old or name not in new or old[name] != new[name]}
+
+
+def _write_file(path: pathlib.Path, content: bytes) -> None:
+    """Replace a file atomically, so tools watching the project never see it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_file(root: pathlib.Path, path: str) -> None:
+    """Remove a file of the project, and its parent directories left empty."""
+    target = root / path
+    with contextlib.suppress(FileNotFoundError):
+        target.unlink()
+    for parent in target.relative_to(root).parents:
+        if not parent.parts:
+            break
+        try:
+            (root / parent).rmdir()
+        except OSError:
+            break
+
+
+class ProjectWatcher:
+    """
+    A project rendered from a template and an answers file, re-rendered incrementally as they change.
+
+    Output files are tracked by the hash of their rendered content, so a change only writes the files whose
+    content actually changed. Files removed from the plan are deleted from the project.
+    """
+
+    def __init__(
+        self,
+        template_name: str,
+        answers_file: pathlib.Path,
+        project_path: pathlib.Path,
+        ragbits_version: str,
+        templates_dir: pathlib.Path = TEMPLATES_DIR,
+        template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    ):
+        if is_archived(templates_dir):
+            raise ValueError("Templates inside a zip archive cannot be watched, use a --template-source directory")
+        self.template_name = template_name
+        self.answers_file = answers_file
+        self.project_path = project_path.absolute()
+        self.ragbits_version = ragbits_version
+        self.templates_dir = templates_dir
+        self.template_source = template_source
+        self.watched_roots = [templates_dir / template_name, get_shared_templates_dir(templates_dir) / "shared"]
+
+        self.context: dict[str, Any] = {}
+        self.graph = DependencyGraph()
+        self.hashes: dict[str, str] = {}
+        self.snapshot: dict[pathlib.Path, tuple[int, int]] = {}
+        # Changed files not rendered yet because the project could not be planned, and files that failed to render
+        self.pending_files: set[pathlib.Path] = set()
+        self.failed: set[str] = set()
+
+    def scan(self) -> dict[pathlib.Path, tuple[int, int]]:
+        """Get the modification time and size of every watched file."""
+        snapshot = {}
+        for root in [*self.watched_roots, self.answers_file]:
+            if root.is_file():
+                stat = root.stat()
+                snapshot[root] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames if name not in IGNORED_DIRECTORIES]
+                for name in filenames:
+                    path = pathlib.Path(dirpath, name)
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = path.stat()
+                        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def build_context(self) -> dict[str, Any]:
+        """
+        Build the context of the project from the answers file and the current template configurations.
+
+        Raises:
+            ValueError: If the answers are not valid or a template configuration cannot be loaded
+        """
+        project = load_answers_file(self.answers_file)[0]
+        if not project.get("project_name"):
+            raise ValueError(f"Answers file {self.answers_file} must set a project_name")
+        project["template"] = self.template_name
+        project.pop("path", None)
+        template_config = get_template_config(self.template_name, self.templates_dir)
+        shared_config = get_shared_config(self.templates_dir)
+        if not template_config or not shared_config:
+            raise ValueError(f"Could not load the {CONFIG_FILE_NAME} of '{self.template_name}' or the shared template")
+        return build_batch_context(project, template_config, shared_config, self.ragbits_version)
+
+    def start(self) -> WatchUpdate:
+        """
+        Render the whole project for the first time.
+
+        Raises:
+            ValueError: If the project directory is not empty and was not generated, or the answers are not valid
+        """
+        previous_files: list[str] = []
+        if self.project_path.exists() and any(self.project_path.iterdir()):
+            # Only a project generated before, e.g. by an earlier watch session, is rendered over
+            try:
+                previous_files = list(load_lockfile(self.project_path)["files"])
+            except ValueError:
+                raise ValueError(
+                    f"Directory '{self.project_path}' is not empty and is not a generated project"
+                ) from None
+
+        self.snapshot = self.scan()
+        self.context = self.build_context()
+        update = self._render(self.context, set(), set())
+        for path in previous_files:
+            if path not in self.graph.sources:
+                _remove_file(self.project_path, path)
+                update.removed.append(path)
+        return update
+
+    def poll(self) -> WatchUpdate | None:
+        """
+        Check the watched files for changes, and render the files affected by them.
+
+        Returns:
+            The outcome of rendering, or None if nothing changed
+        """
+        snapshot = self.scan()
+        if snapshot == self.snapshot:
+            return None
+        changed_files = {
+            path for path in snapshot.keys() | self.snapshot.keys() if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        self.pending_files |= changed_files
+
+        context = self.context
+        if self.answers_file in changed_files or any(path.name == CONFIG_FILE_NAME for path in changed_files):
+            try:
+                context = self.build_context()
+            except Exception as e:
+                return WatchUpdate(errors={"context": f"{type(e).__name__}: {e}"})
+        return self._render(context, self.pending_files, _get_changed_variables(self.context, context))
+
+    def _render(
+        self, context: dict[str, Any], changed_files: set[pathlib.Path], changed_variables: set[str]
+    ) -> WatchUpdate:
+        started_at = time.perf_counter()
+        update = WatchUpdate()
+        try:
+            plan = plan_project(self.template_name, context, self.templates_dir)
+            graph = DependencyGraph.from_plan(plan)
+        except Exception as e:
+            update.errors["plan"] = f"{type(e).__name__}: {e}"
+            return update
+
+        # Files that are new or built from other sources, files depending on what changed and files that failed
+        affected = {target for target, sources in graph.sources.items() if self.graph.sources.get(target) != sources}
+        affected |= self.graph.get_affected(changed_files, changed_variables) | self.failed
+        affected &= graph.sources.keys()
+
+        for directory in plan.directories:
+            (self.project_path / directory).mkdir(parents=True, exist_ok=True)
+        for target in sorted(affected):
+            sources = list(graph.sources[target])
+            try:
+                if len(sources) == 1 and sources[0].suffix != ".j2":
+                    content = read_bytes(sources[0])
+                else:
+                    content = render_target(target, sources, context, verbose=False)
+            except Exception as e:
+                # The previous version of the file is kept until the template renders again
+                update.errors[target] = f"{type(e).__name__}: {e}"
+                continue
+            update.rendered += 1
+            content_hash = hash_bytes(content)
+            if self.hashes.get(target) != content_hash:
+                _write_file(self.project_path / target, content)
+                self.hashes[target] = content_hash
+                update.written.append(target)
+
+        for target in sorted(self.graph.sources.keys() - graph.sources.keys()):
+            _remove_file(self.project_path, target)
+            self.hashes.pop(target, None)
+            update.removed.append(target)
+
+        self.context = context
+        self.graph = graph
+        self.pending_files = set()
+        self.failed = set(update.errors)
+        if update.written or update.removed:
+            self._write_lockfile()
+        update.elapsed = time.perf_counter() - started_at
+        return update
+
+    def _write_lockfile(self) -> None:
+        lockfile = build_lockfile(
+            self.template_name,
+            get_template_config(self.template_name, self.templates_dir),
+            get_shared_config(self.templates_dir),
+            self.context,
+            self.hashes,
+            self.template_source,
+        )
+        _write_file(self.project_path / LOCKFILE_NAME, dump_lockfile(lockfile))
+
+    def watch(
+        self, interval: float = POLL_INTERVAL_SECONDS, on_update: Callable[[WatchUpdate], None] | None = None
+    ) -> None:
+        """
+        Poll for changes until interrupted, rendering the affected files after each one.
+
+        Args:
+            interval: Seconds between two scans of the watched files
+            on_update: Called with the outcome of every render, prints it by default
+        """
+        on_update = on_update or print_watch_update
+        while True:
+            time.sleep(interval)
+            update = self.poll()
+            if update is not None:
+                on_update(update)
+
+
+def print_watch_update(update: WatchUpdate) -> None:
+    """Print the outcome of rendering the project after a change."""
+    timestamp = time.strftime("%H:%M:%S")
+    for target, error in update.errors.items():
+        console.print(f"[red]{timestamp} ✗ {target}: {error}[/red]")
+    for target in update.written:
+        console.print(f"[green]{timestamp} ✓ {target}[/green]")
+    for target in update.removed:
+        console.print(f"[yellow]{timestamp} - {target}[/yellow]")
+    if not update.errors:
+        unchanged = update.rendered - len(update.written)
+        console.print(
+            f"[dim]{timestamp} rendered {update.rendered} files ({unchanged} unchanged) "
+            f"in {update.elapsed * 1000:.0f}ms[/dim]"
+        )
+
+
+def watch_project(
+    template_name: str,
+    answers_file: pathlib.Path,
+    project_path: pathlib.Path,
+    ragbits_version: str,
+    templates_dir: pathlib.Path = TEMPLATES_DIR,
+    template_source: str = BUNDLED_TEMPLATE_SOURCE,
+    interval: float = POLL_INTERVAL_SECONDS,
+) -> None:
+    """
+    Render a project and re-render it whenever its templates or answers change, until interrupted.
+
+    Args:
+        template_name: Name of the template to render
+        answers_file: YAML or JSON file with the answers of the project, only its first project is used
+        project_path: Directory to render the project into
+        ragbits_version: Ragbits version to render into the project
+        templates_dir: Directory containing the template, and the shared template unless the bundled one is used
+        template_source: Specification of the template source, recorded in the lockfile of the project
+        interval: Seconds between two scans of the watched files
+
+    Raises:
+        ValueError: If the project cannot be rendered for the first time
+    """
+    watcher = ProjectWatcher(template_name, answers_file, project_path, ragbits_version, templates_dir, template_source)
+    update = watcher.start()
+    for target, error in update.errors.items():
+        console.print(f"[red]✗ {target}: {error}[/red]")
+    console.print(
+        f"[bold]Rendered {update.rendered} files into {watcher.project_path} in {update.elapsed * 1000:.0f}ms, "
+        f"watching {', '.join(str(root) for root in watcher.watched_roots)} and {answers_file} (Ctrl+C to stop)[/bold]"
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        watcher.watch(interval)
@@ -0,0 +1,77 @@
+import pathlib
+from collections.abc import Callable
+
+import pytest
+
+SHARED_CONFIG = """
+from create_ragbits_app.template_config_base import TemplateConfig
+
+
+class SharedTemplateConfig(TemplateConfig):
+    name: str = "Shared content"
+    description: str = "Shared content between templates"
+
+
+config = SharedTemplateConfig()
+"""
+
+DEMO_CONFIG = """
+from create_ragbits_app.template_config_base import ConfirmQuestion, TemplateConfig
+
+
+class DemoTemplateConfig(TemplateConfig):
+    name: str = "{name}"
+    description: str = "Demo template"
+
+    questions = [ConfirmQuestion(name="with_docs", message="Include docs?", default=True)]
+
+    def should_include_file(self, file_path, context):
+        return file_path.name != "docs.md" or context["with_docs"]
+
+
+config = DemoTemplateConfig()
+"""
+
+DEMO_FILES = {
+    "README.md.j2": "# {{ project_name }}\n\nInstall with `pip install {{ project_name }}`.\n",
+    "docs.md": "Documentation\n",
+    "static.txt": "static content\n",
+    "src/{{pkg_name}}/__init__.py": "",
+    "src/{{pkg_name}}/main.py.j2": 'print("Hello from {{ project_name }}")\n',
+}
+
+
+def write_files(root: pathlib.Path, files: dict[str, str]) -> None:
+    """Write files given by their path relative to the root."""
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+
+
+def write_template(templates_dir: pathlib.Path, name: str, display_name: str = "Demo") -> pathlib.Path:
+    """Write a demo template into a templates directory."""
+    write_files(templates_dir / name, {"template_config.py": DEMO_CONFIG.format(name=display_name), **DEMO_FILES})
+    return templates_dir / name
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Keep the persistent caches of every test in its own directory."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("CREATE_RAGBITS_APP_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def make_template() -> Callable[..., pathlib.Path]:
+    """Factory writing demo templates into templates directories."""
+    return write_template
+
+
+@pytest.fixture
+def templates_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Templates directory with a shared template and a demo template."""
+    root = tmp_path / "templates"
+    write_files(root / "shared", {"template_config.py": SHARED_CONFIG})
+    write_template(root, "demo")
+    return root
@@ -0,0 +1,167 @@
+import io
+import json
+import pathlib
+import tarfile
+import zipfile
+
+import pytest
+import requests
+
+from create_ragbits_app.api import build_context, build_project, generate_project, stream_archive, stream_project
+from create_ragbits_app.archive_cache import ArchiveCache
+from create_ragbits_app.lockfile import LOCKFILE_NAME
+from create_ragbits_app.output_tree import OutputTree
+
+PROJECT_FILES = [
+    LOCKFILE_NAME,
+    "README.md",
+    "docs.md",
+    "src/demo_app/__init__.py",
+    "src/demo_app/main.py",
+    "static.txt",
+]
+
+
+def read_files(tree: OutputTree) -> dict[str, bytes]:
+    return {path: file.read() for path, file in tree.files.items()}
+
+
+def test_build_context(templates_dir: pathlib.Path) -> None:
+    context = build_context(
+        "demo", "demo-app", ragbits_version="1.0.0", answers={"with_docs": False}, templates_dir=templates_dir
+    )
+
+    assert context["project_name"] == "demo-app"
+    assert context["pkg_name"] == "demo_app"
+    assert context["ragbits_version"] == "1.0.0"
+    assert context["with_docs"] is False
+
+
+@pytest.mark.parametrize(
+    ("answers", "ui"),
+    [({"unknown": True}, None), ({}, {"ui_type": "unknown"})],
+)
+def test_build_context_with_invalid_answers(
+    templates_dir: pathlib.Path, answers: dict[str, bool], ui: dict[str, str] | None
+) -> None:
+    with pytest.raises(ValueError):
+        build_context("demo", "demo-app", ragbits_version="1.0.0", answers=answers, ui=ui, templates_dir=templates_dir)
+
+
+@pytest.mark.parametrize(
+    ("project_name", "ui"),
+    [
+        ("../../outside", None),
+        ("/etc", None),
+        ("nested/app", None),
+        ("..", None),
+        ("demo-app", {"ui_type": "create", "ui_project_name": "../ui"}),
+        ("demo-app", {"ui_type": "create", "ui_project_name": "/srv/ui"}),
+    ],
+)
+def test_build_context_with_unsafe_names(
+    templates_dir: pathlib.Path, project_name: str, ui: dict[str, str] | None
+) -> None:
+    with pytest.raises(ValueError, match="single path segment"):
+        build_context("demo", project_name, ragbits_version="1.0.0", ui=ui, templates_dir=templates_dir)
+
+
+@pytest.mark.parametrize("key", ["project_name", "pkg_name", "ui_project_name"])
+async def test_stream_project_with_unsafe_names(templates_dir: pathlib.Path, key: str) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    context[key] = "../../outside"
+
+    with pytest.raises(ValueError, match="single path segment"):
+        build_project("demo", context, templates_dir=templates_dir)
+    with pytest.raises(ValueError, match="single path segment"):
+        async for _ in stream_project("demo", context, templates_dir=templates_dir):
+            pass
+
+
+def test_unknown_template(templates_dir: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (templates_dir / "broken").mkdir()
+    (templates_dir / "broken" / "template_config.py").write_text("raise RuntimeError('broken')\n")
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+
+    for template_name in ("missing", "broken"):
+        with pytest.raises(ValueError, match=template_name):
+            build_context(template_name, "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+        with pytest.raises(ValueError, match=template_name):
+            build_project(template_name, context, templates_dir=templates_dir, include_ui=False)
+
+    assert capsys.readouterr().out == ""
+
+
+def test_build_project(templates_dir: pathlib.Path, tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+
+    tree = build_project("demo", context, templates_dir=templates_dir, template_source=str(templates_dir))
+
+    files = read_files(tree)
+    assert sorted(files) == PROJECT_FILES
+    assert files["src/demo_app/main.py"] == b'print("Hello from demo-app")'
+    lockfile = json.loads(files[LOCKFILE_NAME])
+    assert (lockfile["template"], lockfile["template_source"]) == ("demo", str(templates_dir))
+    # Only the persistent caches are written, never the project
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cache", "templates"]
+    assert capsys.readouterr().out == ""
+
+
+def test_build_project_with_template_errors(templates_dir: pathlib.Path) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    (templates_dir / "demo" / "README.md.j2").write_text("{% if %}\n")
+
+    with pytest.raises(ValueError, match="Could not render template 'demo'"):
+        build_project("demo", context, templates_dir=templates_dir)
+
+
+def test_build_project_with_unreachable_ui(templates_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fetch(self: ArchiveCache, url: str) -> pathlib.Path:
+        raise requests.ConnectionError(f"Could not connect to {url}")
+
+    monkeypatch.setattr(ArchiveCache, "fetch", fetch)
+    context = build_context(
+        "demo", "demo-app", ragbits_version="1.0.0", ui={"ui_type": "copy"}, templates_dir=templates_dir
+    )
+
+    with pytest.raises(OSError, match="Could not connect"):
+        build_project("demo", context, templates_dir=templates_dir, ui_version="v1.0.0")
+
+
+def test_build_project_with_created_ui(templates_dir: pathlib.Path) -> None:
+    context = build_context(
+        "demo", "demo-app", ragbits_version="1.0.0", ui={"ui_type": "create"}, templates_dir=templates_dir
+    )
+
+    files = read_files(build_project("demo", context, templates_dir=templates_dir))
+
+    assert "ui/package.json" in files
+    assert sorted(path for path in files if not path.startswith("ui/")) == PROJECT_FILES
+
+
+async def test_generate_and_stream_project(templates_dir: pathlib.Path) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    tree = await generate_project("demo", context, templates_dir=templates_dir, include_ui=False)
+
+    zip_archive = b"".join([chunk async for chunk in stream_archive(tree, "zip", chunk_size=64)])
+    tar_archive = b"".join(
+        [chunk async for chunk in stream_project("demo", context, templates_dir=templates_dir, include_ui=False)]
+    )
+
+    with zipfile.ZipFile(io.BytesIO(zip_archive)) as zip_file:
+        assert sorted(name for name in zip_file.namelist() if not name.endswith("/")) == PROJECT_FILES
+        assert zip_file.read("static.txt") == b"static content\n"
+    with tarfile.open(fileobj=io.BytesIO(tar_archive), mode="r:gz") as tar_file:
+        names = [member.name for member in tar_file.getmembers() if member.isfile()]
+    assert sorted(names) == [f"demo-app/{path}" for path in PROJECT_FILES]
+
+
+async def test_stream_unsupported_archive_format(templates_dir: pathlib.Path) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+
+    with pytest.raises(ValueError, match="Unsupported archive format"):
+        async for _ in stream_project("demo", context, archive_format="rar", templates_dir=templates_dir):
+            pass
+    with pytest.raises(ValueError, match="Unsupported archive format"):
+        async for _ in stream_archive(OutputTree(), archive_format="rar"):
+            pass
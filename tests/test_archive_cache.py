@@ -0,0 +1,130 @@
+import hashlib
+import pathlib
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+import requests
+
+from create_ragbits_app import ui_generator
+from create_ragbits_app.archive_cache import ArchiveCache
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """HTTP server of fixed archives, answering conditional requests with their ETags."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), ArchiveRequestHandler)
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str | None]] = []
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{path}"
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    server: ArchiveServer
+
+    def do_GET(self) -> None:
+        path = self.path.lstrip("/")
+        if_none_match = self.headers.get("If-None-Match")
+        self.server.requests.append((path, if_none_match))
+        if path not in self.server.files:
+            self.send_error(404)
+            return
+        content = self.server.files[path]
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        if if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: ANN401
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[ArchiveServer]:
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = ArchiveServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def blob_names(cache_dir: pathlib.Path) -> list[str]:
+    return sorted(path.name for path in (cache_dir / "blobs").iterdir())
+
+
+def test_fetch_stores_archives_by_checksum(server: ArchiveServer, cache_dir: pathlib.Path) -> None:
+    server.files = {"v1.0.0.zip": b"release", "mirror/v1.0.0.zip": b"release"}
+    cache = ArchiveCache(verbose=False)
+
+    path = cache.fetch(server.url("v1.0.0.zip"))
+
+    assert path.read_bytes() == b"release"
+    assert path.name == f"{hashlib.sha256(b'release').hexdigest()}.zip"
+    # Fresh archives are used without a request, the same content from another URL is stored once
+    assert cache.fetch(server.url("v1.0.0.zip")) == path
+    assert cache.fetch(server.url("mirror/v1.0.0.zip")) == path
+    assert blob_names(cache_dir / "archives") == [path.name]
+    assert [path for path, _ in server.requests] == ["v1.0.0.zip", "mirror/v1.0.0.zip"]
+
+
+def test_fetch_revalidates_archives_with_their_etag(server: ArchiveServer) -> None:
+    server.files = {"v1.0.0.zip": b"release"}
+    cache = ArchiveCache(revalidate_after=0, verbose=False)
+    path = cache.fetch(server.url("v1.0.0.zip"))
+
+    assert cache.fetch(server.url("v1.0.0.zip")) == path
+    etag = server.requests[1][1]
+    assert etag is not None
+
+    server.files["v1.0.0.zip"] = b"retagged release"
+    assert cache.fetch(server.url("v1.0.0.zip")).read_bytes() == b"retagged release"
+    assert server.requests == [("v1.0.0.zip", None), ("v1.0.0.zip", etag), ("v1.0.0.zip", etag)]
+
+
+def test_fetch_downloads_corrupted_archives_again(server: ArchiveServer) -> None:
+    server.files = {"v1.0.0.zip": b"release"}
+    cache = ArchiveCache(verbose=False)
+    path = cache.fetch(server.url("v1.0.0.zip"))
+    path.write_bytes(b"truncated")
+
+    assert cache.fetch(server.url("v1.0.0.zip")).read_bytes() == b"release"
+    # The corrupted copy is not revalidated with its ETag
+    assert server.requests[1] == ("v1.0.0.zip", None)
+
+
+def test_fetch_uses_cached_archives_when_offline(server: ArchiveServer, capsys: pytest.CaptureFixture[str]) -> None:
+    server.files = {"v1.0.0.zip": b"release"}
+    path = ArchiveCache().fetch(server.url("v1.0.0.zip"))
+    server.files.clear()
+
+    assert ArchiveCache(revalidate_after=0).fetch(server.url("v1.0.0.zip")) == path
+    assert "using cached archive" in " ".join(capsys.readouterr().out.split())
+    with pytest.raises(requests.HTTPError):
+        ArchiveCache().fetch(server.url("v2.0.0.zip"))
+
+
+def test_ui_archives_from_mirror(server: ArchiveServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert ui_generator._get_ui_archive_url("v1.0.0") == (
+        "https://github.com/deepsense-ai/ragbits/archive/refs/tags/v1.0.0.zip"
+    )
+    assert not ui_generator._validate_url(server.url("v1.0.0.zip"))
+
+    monkeypatch.setenv(ui_generator.UI_MIRROR_ENV, server.url("releases/"))
+
+    assert ui_generator._get_ui_archive_url("v1.0.0") == server.url("releases/v1.0.0.zip")
+    assert ui_generator._validate_url(server.url("releases/v1.0.0.zip"))
+    assert not ui_generator._validate_url("https://example.com/v1.0.0.zip")
@@ -0,0 +1,118 @@
+import argparse
+import json
+import pathlib
+from collections.abc import Callable
+
+import pytest
+import requests
+
+from create_ragbits_app import main, ui_generator
+from create_ragbits_app.archive_cache import ArchiveCache
+from create_ragbits_app.batch import load_answers_file, run_batch
+from create_ragbits_app.template_sources import DirectorySource, TemplateSource
+from create_ragbits_app.versions import ResolvedVersion
+
+
+@pytest.fixture
+def sources(templates_dir: pathlib.Path, make_template: Callable[..., pathlib.Path]) -> list[TemplateSource]:
+    broken = make_template(templates_dir, "broken", display_name="Broken")
+    (broken / "src" / "{{pkg_name}}" / "main.py.j2").write_text("{% if %}\n")
+    return [DirectorySource(templates_dir)]
+
+
+@pytest.fixture
+def offline_ui(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make copying the ragbits UI fail as if GitHub could not be reached."""
+
+    def fetch(self: ArchiveCache, url: str) -> pathlib.Path:
+        raise requests.ConnectionError(f"Could not connect to {url}")
+
+    monkeypatch.setattr(ui_generator, "_get_latest_version", lambda: "v1.0.0")
+    monkeypatch.setattr(ArchiveCache, "fetch", fetch)
+
+
+@pytest.fixture
+def answers_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "answers.json"
+    projects = [
+        {"project_name": "first-app", "answers": {"with_docs": False}},
+        {"project_name": "unknown-answer", "answers": {"unknown": True}},
+        {"template": "demo"},
+        {"project_name": "broken-app", "template": "broken"},
+        {"project_name": "copied-ui", "ui": {"ui_type": "copy"}},
+        {"project_name": "last-app", "path": "nested/last-app", "ui": {"ui_type": "create"}},
+    ]
+    path.write_text(json.dumps({"defaults": {"template": "demo"}, "projects": projects}))
+    return path
+
+
+def test_load_answers_file(answers_file: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    projects = load_answers_file(answers_file)
+
+    assert [project.get("template") for project in projects] == ["demo", "demo", "demo", "broken", "demo", "demo"]
+
+    (tmp_path / "single.yaml").write_text("project_name: single-app\ntemplate: demo\n")
+    assert load_answers_file(tmp_path / "single.yaml") == [{"project_name": "single-app", "template": "demo"}]
+    (tmp_path / "invalid.yaml").write_text("- not a project\n")
+    with pytest.raises(ValueError, match="must contain"):
+        load_answers_file(tmp_path / "invalid.yaml")
+
+
+@pytest.mark.usefixtures("offline_ui")
+def test_run_batch_keeps_going_after_failures(
+    answers_file: pathlib.Path,
+    tmp_path: pathlib.Path,
+    sources: list[TemplateSource],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    output_dir = tmp_path / "output"
+
+    failures = run_batch(answers_file, output_dir, "1.0.0", sources)
+
+    assert failures == 4
+    assert sorted(path.name for path in output_dir.iterdir()) == ["copied-ui", "first-app", "nested"]
+    assert not (output_dir / "first-app" / "docs.md").exists()
+    assert (output_dir / "nested" / "last-app" / "ui" / "package.json").is_file()
+    # The project is generated even though its UI could not be copied
+    assert not (output_dir / "copied-ui" / "ui").exists()
+    out = " ".join(capsys.readouterr().out.split())
+    assert "Skipping unknown-answer" in out
+    assert "Failed to generate broken-app" in out
+    assert "Generated copied-ui without its UI" in out
+    assert "Generated 2 of 6 projects" in out
+
+
+def test_run_batch_skips_non_empty_directories(
+    answers_file: pathlib.Path, tmp_path: pathlib.Path, sources: list[TemplateSource]
+) -> None:
+    answers_file.write_text(json.dumps({"project_name": "first-app", "template": "demo"}))
+    (tmp_path / "output" / "first-app").mkdir(parents=True)
+    (tmp_path / "output" / "first-app" / "notes.txt").write_text("My notes\n")
+
+    assert run_batch(answers_file, tmp_path / "output", "1.0.0", sources) == 1
+    assert [path.name for path in (tmp_path / "output" / "first-app").iterdir()] == ["notes.txt"]
+
+
+@pytest.mark.usefixtures("offline_ui")
+def test_batch_command_exit_code(
+    answers_file: pathlib.Path,
+    tmp_path: pathlib.Path,
+    templates_dir: pathlib.Path,
+    sources: list[TemplateSource],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class OfflineResolver:
+        async def resolve_async(self, name: str) -> ResolvedVersion:
+            return ResolvedVersion("1.0.0", "default")
+
+    monkeypatch.setattr(main, "get_version_resolver", OfflineResolver)
+
+    def run(output_dir: pathlib.Path) -> int:
+        args = argparse.Namespace(
+            command="batch", answers_file=answers_file, output_dir=output_dir, template_sources=[str(templates_dir)]
+        )
+        return main.run_command(args)
+
+    assert run(tmp_path / "failing") == 1
+    answers_file.write_text(json.dumps({"project_name": "first-app", "template": "demo"}))
+    assert run(tmp_path / "passing") == 0
@@ -0,0 +1,77 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+from create_ragbits_app.template_config_base import ConfirmQuestion, ListQuestion, MultiSelectQuestion, TemplateConfig
+
+spec = importlib.util.spec_from_file_location(
+    "generator_benchmark", pathlib.Path(__file__).parents[1] / "benchmarks" / "generator.py"
+)
+assert spec is not None
+assert spec.loader is not None
+generator = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = generator
+spec.loader.exec_module(generator)
+
+
+class MatrixConfig(TemplateConfig):
+    questions = [
+        ListQuestion(name="vector_store", message="Vector store?", choices=["Qdrant", "pgvector"]),
+        ConfirmQuestion(name="hybrid", message="Hybrid search?"),
+        MultiSelectQuestion(
+            name="features", message="Features?", choices=[{"display_name": "Docs", "value": "docs"}, "cache"]
+        ),
+    ]
+
+
+def test_answer_combinations() -> None:
+    combinations = generator.get_answer_combinations(MatrixConfig())
+
+    assert len(combinations) == 8
+    assert combinations[0] == {"vector_store": "Qdrant", "hybrid": True, "features": ["docs", "cache"]}
+    assert generator.describe_answers(combinations[-1]) == "vector_store=pgvector,hybrid=False,features=none"
+
+
+def test_compare_results(capsys: pytest.CaptureFixture[str]) -> None:
+    baseline = {
+        "fast": {"median_ms": 0.2},
+        "slow": {"median_ms": 10.0},
+        "stable": {"median_ms": 10.0},
+    }
+    results = {
+        # Doubled, but below the noise floor
+        "fast": {"median_ms": 0.4},
+        "slow": {"median_ms": 20.0},
+        "stable": {"median_ms": 11.0},
+        "new": {"median_ms": 5.0},
+    }
+
+    assert generator.compare_results(baseline, results, max_regression=1.25) == ["slow"]
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_stress_project_benchmark(tmp_path: pathlib.Path) -> None:
+    templates_dir = generator.create_stress_templates(tmp_path, files=6, depth=3, dashboards=2)
+    context = generator.build_context("stress", {}, templates_dir)
+    runner = generator.BenchmarkRunner(tmp_path / "work", runs=2)
+    output_paths: list[pathlib.Path] = []
+
+    def generate(output_path: pathlib.Path) -> None:
+        output_paths.append(output_path)
+        generator.generate_project("stress", context, templates_dir, 1, output_path)
+        modules = sorted(path.name for path in output_path.rglob("module_*.py"))
+        assert modules == [f"module_{index}.py" for index in range(6)]
+        assert (output_path / "src" / "bench_stress" / "bench_stress_0" / "bench_stress_1" / "static_4.txt").is_file()
+        assert len(list((output_path / "observability" / "dashboards").glob("*.json"))) == 2
+
+    runner.run("create_project[stress]", generate)
+    runner.pattern = "other"
+    runner.run("create_project[filtered]", generate)
+
+    assert list(runner.results) == ["create_project[stress]"]
+    assert runner.results["create_project[stress]"]["runs"] == 2
+    # Every run generates into a fresh directory, removed afterwards
+    assert len(set(output_paths)) == 2
+    assert not any(path.exists() for path in output_paths)
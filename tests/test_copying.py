@@ -0,0 +1,166 @@
+import errno
+import os
+import pathlib
+from collections.abc import Callable
+
+import pytest
+
+from create_ragbits_app import copying
+from create_ragbits_app.copying import copy_file, make_directories, move_file
+
+
+@pytest.fixture(autouse=True)
+def unsupported(monkeypatch: pytest.MonkeyPatch) -> set[tuple[str, int, int]]:
+    """Start every test without strategies remembered as unsupported."""
+    strategies: set[tuple[str, int, int]] = set()
+    monkeypatch.setattr(copying, "_unsupported", strategies)
+    return strategies
+
+
+@pytest.fixture
+def source(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "source.bin"
+    path.write_bytes(os.urandom(256 * 1024))
+    path.chmod(0o640)
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return path
+
+
+def failing_strategy(error: int, partial: bool = False) -> Callable[[int, int, int], int]:
+    def strategy(source_fd: int, target_fd: int, size: int) -> int:
+        if partial:
+            os.write(target_fd, os.read(source_fd, size // 2))
+        raise OSError(error, os.strerror(error))
+
+    return strategy
+
+
+def test_copy_file(source: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    target = tmp_path / "target.bin"
+    target.write_bytes(b"previous content, longer than nothing")
+
+    strategy = copy_file(source, target)
+
+    assert strategy in {name for name, _ in copying.COPY_STRATEGIES} | {"read/write"}
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mode == source.stat().st_mode
+    assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+
+def test_copy_empty_file(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "empty").touch()
+
+    assert copy_file(tmp_path / "empty", tmp_path / "copy") == "read/write"
+    assert (tmp_path / "copy").read_bytes() == b""
+
+
+def test_copy_file_falls_back_to_next_strategy(
+    source: pathlib.Path,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    unsupported: set[tuple[str, int, int]],
+) -> None:
+    monkeypatch.setattr(
+        copying,
+        "COPY_STRATEGIES",
+        (
+            ("reflink", failing_strategy(errno.EOPNOTSUPP)),
+            ("copy_file_range", failing_strategy(errno.EXDEV, partial=True)),
+        ),
+    )
+
+    strategy = copy_file(source, tmp_path / "target.bin")
+
+    assert strategy == "read/write"
+    # The part written by the failed strategy is discarded
+    assert (tmp_path / "target.bin").read_bytes() == source.read_bytes()
+    assert {name for name, *_ in unsupported} == {"reflink", "copy_file_range"}
+
+
+def test_copy_file_skips_unsupported_strategies(
+    source: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[str] = []
+
+    def reflink(source_fd: int, target_fd: int, size: int) -> int:
+        calls.append("reflink")
+        raise OSError(errno.ENOTTY, "Not supported")
+
+    monkeypatch.setattr(copying, "COPY_STRATEGIES", (("reflink", reflink), *copying.COPY_STRATEGIES[1:]))
+
+    copy_file(source, tmp_path / "first.bin")
+    copy_file(source, tmp_path / "second.bin")
+
+    assert calls == ["reflink"]
+    assert (tmp_path / "second.bin").read_bytes() == source.read_bytes()
+
+
+@pytest.mark.parametrize(("chunks", "expected_strategy"), [([1000, 24], "copy_file_range"), ([], "read/write")])
+def test_copy_file_completes_short_copies(
+    source: pathlib.Path,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    chunks: list[int],
+    expected_strategy: str,
+) -> None:
+    remaining = iter(chunks)
+
+    def copy_file_range(source_fd: int, target_fd: int, count: int) -> int:
+        # Stops before the end of the file, as copy_file_range does on some filesystems
+        return os.write(target_fd, os.read(source_fd, next(remaining, 0)))
+
+    monkeypatch.setattr(os, "copy_file_range", copy_file_range, raising=False)
+    monkeypatch.setattr(copying, "COPY_STRATEGIES", (("copy_file_range", copying._copy_file_range),))
+
+    assert copy_file(source, tmp_path / "target.bin") == expected_strategy
+    assert (tmp_path / "target.bin").read_bytes() == source.read_bytes()
+
+
+def test_copy_file_raises_real_errors(
+    source: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(copying, "COPY_STRATEGIES", (("reflink", failing_strategy(errno.ENOSPC)),))
+
+    with pytest.raises(OSError) as exc_info:
+        copy_file(source, tmp_path / "target.bin")
+
+    assert exc_info.value.errno == errno.ENOSPC
+
+
+def test_move_file(source: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    content = source.read_bytes()
+
+    move_file(source, tmp_path / "moved.bin")
+
+    assert not source.exists()
+    assert (tmp_path / "moved.bin").read_bytes() == content
+
+
+def test_move_file_across_filesystems(
+    source: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def replace(source: pathlib.Path, target: pathlib.Path) -> None:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(copying.os, "replace", replace)
+    content = source.read_bytes()
+
+    move_file(source, tmp_path / "moved.bin")
+
+    assert not source.exists()
+    assert (tmp_path / "moved.bin").read_bytes() == content
+
+
+def test_make_directories(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "existing").mkdir()
+
+    make_directories(tmp_path, ["src/demo/api", "src/demo", "existing/nested", pathlib.PurePosixPath("docs")])
+
+    assert sorted(str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*")) == [
+        "docs",
+        "existing",
+        "existing/nested",
+        "src",
+        "src/demo",
+        "src/demo/api",
+    ]
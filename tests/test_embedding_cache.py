@@ -0,0 +1,99 @@
+import importlib.util
+import pathlib
+import sys
+from typing import Any
+
+import pytest
+
+from create_ragbits_app.template_utils import TEMPLATES_DIR
+
+embeddings = pytest.importorskip("ragbits.core.embeddings")
+
+spec = importlib.util.spec_from_file_location(
+    "rag_template_embedding_cache", TEMPLATES_DIR / "rag" / "src" / "{{pkg_name}}" / "embedding_cache.py"
+)
+assert spec is not None
+assert spec.loader is not None
+embedding_cache = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = embedding_cache
+spec.loader.exec_module(embedding_cache)
+
+
+class FakeEmbedder:
+    """Embeds texts as vectors of their length, counting the embedded texts."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def embed_text(self, data: list[str], options: object | None = None) -> list[list[float]]:
+        self.calls.append(data)
+        return [[float(len(text)), 0.5] for text in data]
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path) -> Any:  # noqa: ANN401
+    cache = embedding_cache.EmbeddingCache(tmp_path / "embeddings.sqlite", max_memory_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_encode_vector_round_trips_dense_vectors() -> None:
+    vector = [0.25, -1.5, 3.0, 0.0]
+
+    data = embedding_cache.encode_vector(vector)
+
+    assert data[:1] == embedding_cache.DENSE_FORMAT
+    assert embedding_cache.decode_vector(data) == vector
+    assert embedding_cache.decode_vector(embedding_cache.encode_vector([])) == []
+
+
+def test_encode_vector_round_trips_sparse_vectors() -> None:
+    vector = embeddings.SparseVector(indices=[3, 17, 40000], values=[0.5, -2.0, 1.25])
+
+    data = embedding_cache.encode_vector(vector)
+
+    assert data[:1] == embedding_cache.SPARSE_FORMAT
+    decoded = embedding_cache.decode_vector(data)
+    assert isinstance(decoded, embeddings.SparseVector)
+    assert (decoded.indices, decoded.values) == (vector.indices, vector.values)
+
+
+def test_encode_vector_stores_float32_values() -> None:
+    assert embedding_cache.decode_vector(embedding_cache.encode_vector([0.1])) == pytest.approx([0.1])
+
+
+def test_embedding_cache_reads_database_when_not_in_memory(cache: Any, tmp_path: pathlib.Path) -> None:  # noqa: ANN401
+    cache.put_many({"first": [1.0], "second": [2.0], "third": [3.0]})
+
+    # Only the most recently stored vectors stay in memory, the others are read from the database
+    assert list(cache._memory) == ["second", "third"]
+    assert cache.get_many(["first", "third", "missing"]) == {"first": [1.0], "third": [3.0]}
+    assert list(cache._memory) == ["third", "first"]
+
+    reopened = embedding_cache.EmbeddingCache(tmp_path / "embeddings.sqlite")
+    assert reopened.get_many(["second"]) == {"second": [2.0]}
+    reopened.close()
+
+
+async def test_wrap_embeds_only_missing_texts(cache: Any) -> None:  # noqa: ANN401
+    fake = FakeEmbedder()
+    embedder = cache.wrap(fake, "text-embedding-3-small")
+
+    assert await embedder.embed_text(["one", "three", "one"]) == [[3.0, 0.5], [5.0, 0.5], [3.0, 0.5]]
+    assert await embedder.embed_text(["three", "seven"]) == [[5.0, 0.5], [5.0, 0.5]]
+
+    assert embedder is fake
+    assert fake.calls == [["one", "three"], ["seven"]]
+
+
+async def test_wrap_caches_by_model_and_options(cache: Any) -> None:  # noqa: ANN401
+    fake = FakeEmbedder()
+    embedder = cache.wrap(fake, "text-embedding-3-small")
+    await embedder.embed_text(["text"])
+    await embedder.embed_text(["text"], {"dimensions": 256})
+
+    other = FakeEmbedder()
+    await cache.wrap(other, "text-embedding-3-large").embed_text(["text"])
+
+    assert fake.calls == [["text"], ["text"]]
+    assert other.calls == [["text"]]
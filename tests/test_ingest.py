@@ -0,0 +1,137 @@
+import asyncio
+import importlib
+import json
+import pathlib
+import sys
+from collections.abc import Iterator
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from create_ragbits_app.api import build_context, build_project
+
+pytest.importorskip("ragbits.document_search")
+pytest.importorskip("pydantic_settings")
+
+
+@pytest.fixture
+def ingest(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[ModuleType]:
+    """Ingestion CLI of a generated RAG project, with its components replaced as they need running services."""
+    context = build_context("rag", "ingest-app", ragbits_version="1.0.0")
+    for path, file in build_project("rag", context, include_ui=False).files.items():
+        if path.startswith("src/"):
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).write_bytes(file.read())
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setitem(sys.modules, "ingest_app.components", ModuleType("ingest_app.components"))
+    sys.modules["ingest_app.components"].components = None  # type: ignore[attr-defined]
+    sys.modules["ingest_app.components"].get_document_search = None  # type: ignore[attr-defined]
+
+    yield importlib.import_module("ingest_app.ingest")
+
+    for name in [name for name in sys.modules if name.startswith("ingest_app")]:
+        del sys.modules[name]
+
+
+class FakeSource:
+    """Source fetched from a local file, optionally failing."""
+
+    def __init__(self, path: pathlib.Path, error: str | None = None) -> None:
+        self.path = path
+        self.id = f"local://{path}"
+        self.error = error
+
+    async def fetch(self) -> pathlib.Path:
+        if self.error:
+            raise OSError(self.error)
+        return self.path
+
+
+class FakeDocumentSearch:
+    """Document search failing documents whose name contains "broken", tracking the batches ingested at once."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def ingest(self, sources: list[FakeSource], fail_on_error: bool) -> SimpleNamespace:
+        self.batches.append([source.id for source in sources])
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        results = [SimpleNamespace(document_uri=source.id, error="Parsing failed") for source in sources]
+        return SimpleNamespace(
+            successful=[result for result in results if "broken" not in result.document_uri],
+            failed=[result for result in results if "broken" in result.document_uri],
+        )
+
+
+def test_read_source_file(ingest: ModuleType, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "sources.txt").write_text("docs/\n# A comment\n\nweb://https://example.com  # Inline comment\n")
+    (tmp_path / "sources.json").write_text(json.dumps({"sources": ["s3://bucket/*.pdf"]}))
+    (tmp_path / "list.json").write_text(json.dumps(["gcs://bucket/doc.md"]))
+
+    assert ingest.read_source_file(tmp_path / "sources.txt") == ["docs/", "web://https://example.com"]
+    assert ingest.read_source_file(tmp_path / "sources.json") == ["s3://bucket/*.pdf"]
+    assert ingest.read_source_file(tmp_path / "list.json") == ["gcs://bucket/doc.md"]
+
+
+def test_expand_source(ingest: ModuleType, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "docs" / "nested").mkdir(parents=True)
+    for name in ["docs/a.md", "docs/b.pdf", "docs/nested/c.md"]:
+        (tmp_path / name).write_text(name)
+
+    assert ingest.expand_source("web://https://example.com") == ["web://https://example.com"]
+    assert ingest.expand_source(str(tmp_path / "docs")) == [
+        f"local://{tmp_path / name}" for name in ["docs/a.md", "docs/b.pdf", "docs/nested/c.md"]
+    ]
+    assert ingest.expand_source(str(tmp_path / "docs" / "**" / "*.md")) == [
+        f"local://{tmp_path / name}" for name in ["docs/a.md", "docs/nested/c.md"]
+    ]
+    assert ingest.expand_source(str(tmp_path / "docs" / "b.pdf")) == [f"local://{tmp_path / 'docs' / 'b.pdf'}"]
+    assert ingest.expand_source(str(tmp_path / "missing.md")) == []
+
+
+async def test_find_changed_sources(ingest: ModuleType, tmp_path: pathlib.Path) -> None:
+    manifest = ingest.IngestManifest(tmp_path / "manifest.sqlite")
+    paths = [tmp_path / name for name in ["unchanged.md", "changed.md", "new.md"]]
+    for path in paths:
+        path.write_text(f"First version of {path.name}")
+    unchanged, changed, new = (FakeSource(path) for path in paths)
+    manifest.record(ingest.check_document(path, f"local://{path}", None)[0] for path in paths[:2])
+    paths[1].write_text("Second version")
+
+    sources = [unchanged, changed, new, FakeSource(tmp_path / "missing.md", error="Not found")]
+    found, failed = await ingest.find_changed_sources(sources, manifest, concurrency=2, full=False)
+
+    assert [source for source, _ in found] == [changed, new]
+    assert [entry.source_id for _, entry in found] == [changed.id, new.id]
+    assert failed == [(f"local://{tmp_path / 'missing.md'}", "Not found")]
+    # Found documents are recorded only once they are ingested
+    assert manifest.get_entries()[changed.id].content_hash != found[0][1].content_hash
+
+    found, _ = await ingest.find_changed_sources(sources[:3], manifest, concurrency=2, full=True)
+    assert [source for source, _ in found] == [unchanged, changed, new]
+    manifest.close()
+
+
+async def test_ingest_batches_records_successful_documents(ingest: ModuleType, tmp_path: pathlib.Path) -> None:
+    manifest = ingest.IngestManifest(tmp_path / "manifest.sqlite")
+    documents = []
+    for name in ["a.md", "b.md", "broken.md", "c.md", "d.md"]:
+        (tmp_path / name).write_text(name)
+        source = FakeSource(tmp_path / name)
+        documents.append((source, ingest.check_document(source.path, source.id, None)[0]))
+    document_search = FakeDocumentSearch()
+
+    failed = await ingest.ingest_batches(document_search, documents, batch_size=2, concurrency=2, manifest=manifest)
+
+    assert document_search.batches == [[source.id for source, _ in documents[i : i + 2]] for i in (0, 2, 4)]
+    assert document_search.max_running == 2
+    assert failed == [(f"local://{tmp_path / 'broken.md'}", "Parsing failed")]
+    # The failed document is not recorded, so the next run retries it
+    assert sorted(manifest.get_entries()) == sorted(source.id for source, _ in documents if source.id != failed[0][0])
+    manifest.close()
@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+import sys
+from typing import Any
+
+import pytest
+
+from create_ragbits_app.template_utils import TEMPLATES_DIR
+
+spec = importlib.util.spec_from_file_location(
+    "shared_template_lifecycle", TEMPLATES_DIR / "shared" / "src" / "{{pkg_name}}" / "lifecycle.py"
+)
+assert spec is not None
+assert spec.loader is not None
+lifecycle = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = lifecycle
+spec.loader.exec_module(lifecycle)
+Lifecycle: Any = lifecycle.Lifecycle
+
+
+class Pool:
+    """Connection pool recording the order in which pools are closed."""
+
+    def __init__(self, name: str, closed: list[str]) -> None:
+        self.name = name
+        self.closed = closed
+
+    async def close(self) -> None:
+        self.closed.append(self.name)
+
+    def close_sync(self) -> None:
+        self.closed.append(self.name)
+
+
+async def test_close_closes_resources_in_reverse_order() -> None:
+    closed: list[str] = []
+    resources = lifecycle.Lifecycle()
+    resources.on_close(Pool("http", closed).close)
+    resources.on_close(Pool("cache", closed).close_sync)
+    resources.on_close(Pool("postgres", closed).close)
+
+    await resources.close()
+    await resources.close()
+
+    assert closed == ["postgres", "cache", "http"]
+
+
+async def test_close_closes_all_resources_when_one_fails() -> None:
+    closed: list[str] = []
+    resources = lifecycle.Lifecycle()
+
+    def fail() -> None:
+        raise RuntimeError("Connection lost")
+
+    resources.on_close(Pool("http", closed).close)
+    resources.on_close(fail)
+    resources.on_close(Pool("postgres", closed).close)
+
+    with pytest.raises(RuntimeError, match="Connection lost"):
+        await resources.close()
+    assert closed == ["postgres", "http"]
+
+
+def test_close_on_shutdown_closes_resources_when_event_loop_shuts_down() -> None:
+    closed: list[str] = []
+    resources = lifecycle.Lifecycle()
+
+    async def serve() -> None:
+        resources.close_on_shutdown()
+        resources.close_on_shutdown()
+        resources.on_close(Pool("http", closed).close)
+        await asyncio.sleep(0)
+        assert closed == []
+
+    asyncio.run(serve())
+
+    assert closed == ["http"]
+
+
+class Resources(Lifecycle):
+    """Resources creating a client bound to the event loop on first use."""
+
+    def __init__(self, closed: list[str]) -> None:
+        super().__init__()
+        self.closed = closed
+        self.client: Pool | None = None
+        self.created = 0
+
+    def get_client(self) -> Pool:
+        self.open()
+        if self.client is None:
+            self.created += 1
+            self.client = Pool(f"client-{self.created}", self.closed)
+            self.on_close(self.client.close)
+        return self.client
+
+    def reset(self) -> None:
+        self.client = None
+
+
+def test_open_recreates_resources_on_another_event_loop() -> None:
+    closed: list[str] = []
+    resources = Resources(closed)
+
+    async def use(close: bool) -> tuple[Pool, asyncio.Lock]:
+        client = resources.get_client()
+        assert resources.get_client() is client
+        lock = resources.open()
+        if close:
+            await resources.close()
+        return client, lock
+
+    first_client, first_lock = asyncio.run(use(close=False))
+    second_client, second_lock = asyncio.run(use(close=True))
+
+    assert second_client is not first_client
+    assert second_lock is not first_lock
+    # The client of the closed event loop is forgotten instead of being closed on another loop
+    assert closed == ["client-2"]
+
+
+async def test_close_resets_resources() -> None:
+    closed: list[str] = []
+    resources = Resources(closed)
+    client = resources.get_client()
+
+    await resources.close()
+
+    assert closed == [client.name]
+    assert resources.get_client() is not client
@@ -0,0 +1,104 @@
+import os
+import pathlib
+
+import pytest
+
+from create_ragbits_app import manifest
+from create_ragbits_app.api import build_context, build_project
+from create_ragbits_app.manifest import ConditionalPrefixTree, TemplateManifest, get_template_manifest
+
+
+@pytest.fixture
+def builds(monkeypatch: pytest.MonkeyPatch) -> list[pathlib.Path]:
+    """Record the template directories whose manifest is built by walking them."""
+    roots: list[pathlib.Path] = []
+    build_template_manifest = manifest.build_template_manifest
+
+    def build(root: pathlib.Path) -> TemplateManifest:
+        roots.append(root)
+        return build_template_manifest(root)
+
+    monkeypatch.setattr(manifest, "build_template_manifest", build)
+    return roots
+
+
+def bump_mtime(path: pathlib.Path) -> None:
+    os.utime(path, ns=(path.stat().st_mtime_ns + 10**9,) * 2)
+
+
+def test_template_manifest(templates_dir: pathlib.Path) -> None:
+    (templates_dir / "demo" / "__pycache__").mkdir()
+    (templates_dir / "demo" / "__pycache__" / "template_config.cpython-311.pyc").write_bytes(b"")
+
+    result = get_template_manifest(templates_dir / "demo")
+
+    assert [entry.path for entry in result.directories] == ["src", "src/{{pkg_name}}"]
+    files = {entry.path: (entry.is_jinja, entry.has_jinja_segments) for entry in result.files}
+    assert files == {
+        "README.md.j2": (True, False),
+        "docs.md": (False, False),
+        "static.txt": (False, False),
+        "src/{{pkg_name}}/__init__.py": (False, True),
+        "src/{{pkg_name}}/main.py.j2": (True, True),
+    }
+
+
+def test_manifest_is_built_once_and_persisted(templates_dir: pathlib.Path, builds: list[pathlib.Path]) -> None:
+    root = templates_dir / "demo"
+    first = get_template_manifest(root)
+    assert get_template_manifest(root) is first
+
+    # A new process loads the manifest from disk instead of walking the template
+    manifest._manifests.clear()
+    assert get_template_manifest(root) == first
+    assert builds == [root]
+
+
+def test_manifest_is_rebuilt_when_template_files_change(
+    templates_dir: pathlib.Path, builds: list[pathlib.Path]
+) -> None:
+    root = templates_dir / "demo"
+    get_template_manifest(root)
+
+    # Editing a file keeps its directory listing, the manifest is kept and the new content is rendered
+    readme = root / "README.md.j2"
+    readme.write_text("# {{ project_name }} v2\n")
+    bump_mtime(readme)
+    assert len(builds) == 1
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    tree = build_project("demo", context, templates_dir=templates_dir, include_ui=False)
+    assert tree.files["README.md"].read() == b"# demo-app v2"
+
+    # Adding a file changes the modification time of its directory, so the manifest is rebuilt from the memory and
+    # the disk caches alike
+    (root / "src" / "{{pkg_name}}" / "cli.py").write_text("")
+    bump_mtime(root / "src" / "{{pkg_name}}")
+    assert "src/{{pkg_name}}/cli.py" in [entry.path for entry in get_template_manifest(root).files]
+    manifest._manifests.clear()
+    (root / "src" / "{{pkg_name}}" / "cli.py").unlink()
+    bump_mtime(root / "src" / "{{pkg_name}}")
+    assert "src/{{pkg_name}}/cli.py" not in [entry.path for entry in get_template_manifest(root).files]
+    assert builds.count(root) == 3
+
+
+def test_corrupted_manifest_cache_is_rebuilt(templates_dir: pathlib.Path, builds: list[pathlib.Path]) -> None:
+    root = templates_dir / "demo"
+    get_template_manifest(root)
+    manifest._get_manifest_cache_path(root).write_text("{not json")
+    manifest._manifests.clear()
+
+    assert len(get_template_manifest(root).files) == 5
+    assert builds == [root, root]
+
+
+def test_conditional_prefix_tree() -> None:
+    rules = ConditionalPrefixTree(
+        {"observability": "observability", "src/{{pkg_name}}/ui": "with_ui"}, {"docs": "docs"}
+    )
+    context = {"observability": True, "with_ui": False}
+
+    assert rules.is_included(("README.md",), context)
+    assert rules.is_included(("observability", "grafana", "dashboard.json"), context)
+    assert rules.is_included(("src", "{{pkg_name}}", "main.py"), context)
+    assert not rules.is_included(("src", "{{pkg_name}}", "ui", "app.py"), context)
+    assert not rules.is_included(("docs", "index.md"), context)
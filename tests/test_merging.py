@@ -0,0 +1,135 @@
+import tomllib
+from pathlib import PurePosixPath
+
+import pytest
+
+from create_ragbits_app.merging import get_merger, merge_layers
+
+BASE_PYPROJECT = """\
+[project]
+name = "demo"
+# Dependencies of the base template
+dependencies = [
+    "ragbits-core>=1.0.0",
+    "rich",
+]
+
+[tool.ruff]
+line-length = 120
+"""
+
+OVERLAY_PYPROJECT = """\
+[project]
+name = "demo"
+dependencies = [
+    "ragbits-core[qdrant]>=1.0.0",
+    "qdrant-client",
+]
+
+[project.optional-dependencies]
+docs = ["mkdocs"]
+
+[tool.ruff]
+line-length = 100
+"""
+
+
+def merge_pyproject(*layers: str) -> str:
+    return merge_layers(PurePosixPath("pyproject.toml"), list(layers), verbose=False)
+
+
+@pytest.mark.parametrize(
+    ("path", "description"),
+    [
+        ("docker-compose.yml", "docker-compose files"),
+        ("monitoring/grafana/provisioning/datasources/datasources.yml", "Grafana provisioning files"),
+        (".env", ".env files"),
+        (".env.example", ".env files"),
+        ("pyproject.toml", "pyproject.toml dependencies"),
+    ],
+)
+def test_get_merger(path: str, description: str) -> None:
+    merger = get_merger(PurePosixPath(path))
+
+    assert merger is not None
+    assert merger.description == description
+
+
+def test_get_merger_of_overridden_file() -> None:
+    assert get_merger(PurePosixPath("README.md")) is None
+
+
+def test_merge_pyproject_dependencies() -> None:
+    merged = merge_pyproject(BASE_PYPROJECT, OVERLAY_PYPROJECT)
+
+    data = tomllib.loads(merged)
+    assert data["project"]["dependencies"] == ["ragbits-core[qdrant]>=1.0.0", "rich", "qdrant-client"]
+    assert data["project"]["optional-dependencies"] == {"docs": ["mkdocs"]}
+    # The rest of the document comes from the latest layer, with its formatting kept
+    assert data["tool"]["ruff"]["line-length"] == 100
+    assert merged.endswith('[project.optional-dependencies]\ndocs = ["mkdocs"]\n\n[tool.ruff]\nline-length = 100\n')
+
+
+def test_merge_pyproject_dependencies_with_quotes_and_backslashes() -> None:
+    base = '[project]\nname = "demo"\ndependencies = [\n    "rich",\n]\n'
+    overlay = (
+        '[project]\nname = "demo"\n'
+        "dependencies = [\n"
+        """    'tomli; python_version < "3.11"',\n"""
+        """    "pywin32; sys_platform == \\"win32\\"",\n"""
+        r"""    'local-package @ file:///C:\\packages\\local',"""
+        "\n]\n"
+    )
+
+    merged = merge_pyproject(base, overlay)
+
+    assert tomllib.loads(merged)["project"]["dependencies"] == [
+        "rich",
+        'tomli; python_version < "3.11"',
+        'pywin32; sys_platform == "win32"',
+        r"local-package @ file:///C:\\packages\\local",
+    ]
+
+
+def test_merge_env_files() -> None:
+    merged = merge_layers(
+        PurePosixPath(".env"),
+        ["# Base settings\nLLM_MODEL=gpt-4o\nQDRANT_HOST=localhost\n", "LLM_MODEL=gpt-4.1\nexport API_KEY=secret\n"],
+        verbose=False,
+    )
+
+    assert merged == "# Base settings\nLLM_MODEL=gpt-4.1\nQDRANT_HOST=localhost\nexport API_KEY=secret\n"
+
+
+def test_merge_compose_files() -> None:
+    merged = merge_layers(
+        PurePosixPath("docker-compose.yml"),
+        [
+            "services:\n  qdrant:\n    image: qdrant/qdrant\n    ports: ['6333:6333']\n",
+            "services:\n  qdrant:\n    ports: ['6334:6334']\n  grafana:\n    image: grafana/grafana\n",
+        ],
+        verbose=False,
+    )
+
+    assert merged == (
+        "---\n"
+        "services:\n"
+        "  qdrant:\n"
+        "    image: qdrant/qdrant\n"
+        "    ports:\n"
+        "    - 6333:6333\n"
+        "    - 6334:6334\n"
+        "  grafana:\n"
+        "    image: grafana/grafana\n"
+    )
+
+
+def test_unparsable_layer_overrides_earlier_layers(capsys: pytest.CaptureFixture[str]) -> None:
+    layers = ["services: {}\n", "services: [unterminated\n"]
+
+    merged = merge_layers(PurePosixPath("docker-compose.yml"), layers, verbose=False)
+
+    assert merged == "services: [unterminated\n"
+    assert capsys.readouterr().out == ""
+    merge_layers(PurePosixPath("docker-compose.yml"), layers)
+    assert "Could not merge" in capsys.readouterr().out
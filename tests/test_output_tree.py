@@ -0,0 +1,77 @@
+import pathlib
+
+import pytest
+
+from create_ragbits_app import output_tree
+from create_ragbits_app.lockfile import hash_bytes
+from create_ragbits_app.output_tree import OutputTree
+
+
+@pytest.fixture
+def tree(tmp_path: pathlib.Path) -> OutputTree:
+    script = tmp_path / "run.sh"
+    script.write_bytes(b"#!/bin/sh\n")
+    script.chmod(0o755)
+    ui_tree = OutputTree()
+    ui_tree.add_directory("public")
+    ui_tree.add_content("package.json", b"{}")
+
+    tree = OutputTree()
+    tree.add_content("README.md", b"# demo-app")
+    tree.add_copy("scripts/run.sh", script)
+    tree.add_directory("data/documents")
+    tree.add_tree("ui", ui_tree)
+    return tree
+
+
+def list_files(root: pathlib.Path) -> list[str]:
+    return sorted(path.relative_to(root).as_posix() for path in root.rglob("*"))
+
+
+def test_get_all_directories(tree: OutputTree) -> None:
+    assert tree.get_all_directories() == ["data", "data/documents", "scripts", "ui", "ui/public"]
+    assert tree.get_hashes()["README.md"] == hash_bytes(b"# demo-app")
+
+
+def test_flush(tree: OutputTree, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "project").mkdir()
+
+    tree.flush(tmp_path / "project")
+
+    assert list_files(tmp_path / "project") == [
+        "README.md",
+        "data",
+        "data/documents",
+        "scripts",
+        "scripts/run.sh",
+        "ui",
+        "ui/package.json",
+        "ui/public",
+    ]
+    assert (tmp_path / "project" / "README.md").read_bytes() == b"# demo-app"
+    assert (tmp_path / "project" / "scripts" / "run.sh").stat().st_mode & 0o777 == 0o755
+
+
+def test_flush_into_non_empty_directory(tree: OutputTree, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "notes.txt").write_text("My notes\n")
+
+    with pytest.raises(FileExistsError):
+        tree.flush(tmp_path / "project")
+
+    assert list_files(tmp_path / "project") == ["notes.txt"]
+
+
+def test_failed_flush_leaves_nothing_behind(
+    tree: OutputTree, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def copy_file(source: pathlib.Path, target: pathlib.Path) -> str:
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(output_tree, "copy_file", copy_file)
+    (tmp_path / "projects").mkdir()
+
+    with pytest.raises(OSError, match="No space left"):
+        tree.flush(tmp_path / "projects" / "demo-app")
+
+    assert list_files(tmp_path / "projects") == []
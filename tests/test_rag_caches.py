@@ -0,0 +1,253 @@
+import importlib.util
+import os
+import pathlib
+import sys
+import uuid
+from collections.abc import Sequence
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from create_ragbits_app.template_utils import TEMPLATES_DIR
+
+pytest.importorskip("numpy")
+
+RAG_PACKAGE_DIR = TEMPLATES_DIR / "rag" / "src" / "{{pkg_name}}"
+
+
+def load_template_module(name: str) -> ModuleType:
+    """Import a plain Python module of the RAG template, which needs no rendering."""
+    spec = importlib.util.spec_from_file_location(f"rag_template_{name}", RAG_PACKAGE_DIR / f"{name}.py")
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+answer_cache = load_template_module("answer_cache")
+ingest_manifest = load_template_module("ingest_manifest")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock)
+    return clock
+
+
+class FakeEmbedder:
+    """Embeds questions as fixed vectors, counting the embedded questions."""
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self.vectors = vectors
+        self.calls: list[str] = []
+
+    async def embed_text(self, data: list[str]) -> list[list[float]]:
+        self.calls.extend(data)
+        return [self.vectors[text] for text in data]
+
+
+def test_normalize_query() -> None:
+    assert answer_cache.normalize_query("  What is  RAG? ") == "what is rag"
+    assert answer_cache.normalize_query("what-is rag!!") == "what is rag"
+    assert answer_cache.normalize_query("Qu'est-ce que le RAG ?") == "qu est ce que le rag"
+
+
+def test_ttl_cache_evicts_least_recently_used_entries(clock: Clock) -> None:
+    cache = answer_cache.TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.items() == [("a", 1), ("c", 3)]
+
+
+def test_ttl_cache_expires_entries(clock: Clock) -> None:
+    cache = answer_cache.TTLCache(max_entries=10, ttl=60)
+    cache.set("a", 1)
+    clock.now += 30
+    cache.set("b", 2)
+
+    clock.now += 31
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    clock.now += 30
+    assert cache.items() == []
+    assert len(cache) == 0
+
+
+def test_retrieval_cache_matches_normalized_questions(clock: Clock) -> None:
+    cache = answer_cache.RetrievalCache(max_entries=10, ttl=60)
+    cache.set_results("What is RAG?", ["result"])
+
+    assert cache.get_results("what is rag") == ["result"]
+    cache.clear()
+    assert cache.get_results("what is rag") is None
+
+
+@pytest.fixture
+def embedder() -> FakeEmbedder:
+    return FakeEmbedder(
+        {
+            "What is RAG?": [1.0, 0.0, 0.0],
+            "Explain RAG": [0.99, 0.1, 0.0],
+            "Explain RAG briefly": [0.96, 0.28, 0.0],
+            "What is an agent?": [0.0, 1.0, 0.0],
+        }
+    )
+
+
+async def test_semantic_cache_matches_similar_questions(clock: Clock, embedder: FakeEmbedder) -> None:
+    cache = answer_cache.SemanticAnswerCache(embedder, threshold=0.98)
+    await cache.set("What is RAG?", ["RAG is ", "retrieval augmented generation"])
+
+    assert await cache.get("Explain RAG") == ["RAG is ", "retrieval augmented generation"]
+    assert await cache.get("Explain RAG briefly") is None
+    assert await cache.get("What is an agent?") is None
+
+
+async def test_semantic_cache_matches_normalized_questions_without_embedding(
+    clock: Clock, embedder: FakeEmbedder
+) -> None:
+    cache = answer_cache.SemanticAnswerCache(embedder)
+    await cache.set("What is RAG?", ["answer"])
+    embedder.calls.clear()
+
+    assert await cache.get("what is rag") == ["answer"]
+    assert embedder.calls == []
+
+
+async def test_semantic_cache_skips_expired_questions(clock: Clock, embedder: FakeEmbedder) -> None:
+    cache = answer_cache.SemanticAnswerCache(embedder, threshold=0.9, ttl=60)
+    await cache.set("Explain RAG", ["expired answer"])
+    clock.now += 30
+    await cache.set("Explain RAG briefly", ["answer"])
+    assert await cache.get("What is RAG?") == ["expired answer"]
+
+    # The most similar question expired, the next one is still similar enough
+    clock.now += 31
+    assert await cache.get("What is RAG?") == ["answer"]
+
+
+async def test_semantic_cache_clear(clock: Clock, embedder: FakeEmbedder) -> None:
+    cache = answer_cache.SemanticAnswerCache(embedder)
+    await cache.set("What is RAG?", ["answer"])
+
+    cache.clear()
+
+    assert await cache.get("What is RAG?") is None
+    assert await cache.get("Explain RAG") is None
+
+
+def test_ingest_generation(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "manifest.sqlite"
+    entry = ingest_manifest.ManifestEntry("local://doc.md", "hash", 10, 1)
+    assert ingest_manifest.get_ingest_generation(path) == 0
+    assert not path.exists()
+
+    manifest = ingest_manifest.IngestManifest(path)
+    generations = [ingest_manifest.get_ingest_generation(path)]
+    manifest.record([entry])
+    generations.append(ingest_manifest.get_ingest_generation(path))
+    # Unchanged documents and empty batches do not start a new generation
+    manifest.record([entry], content_changed=False)
+    manifest.record([])
+    generations.append(ingest_manifest.get_ingest_generation(path))
+    manifest.remove([entry.source_id])
+    generations.append(ingest_manifest.get_ingest_generation(path))
+    manifest.close()
+
+    assert generations == [0, 1, 1, 2]
+
+
+def test_ingest_manifest_records_latest_versions(tmp_path: pathlib.Path) -> None:
+    manifest = ingest_manifest.IngestManifest(tmp_path / "manifest.sqlite")
+    first = ingest_manifest.ManifestEntry("local://first.md", "hash-1", 10, 1)
+    second = ingest_manifest.ManifestEntry("local://second.md", "hash-2", 20, 2)
+    changed = ingest_manifest.ManifestEntry("local://first.md", "hash-3", 30, 3)
+
+    manifest.record([first, second])
+    manifest.record([changed])
+    manifest.remove([second.source_id])
+    manifest.close()
+
+    reopened = ingest_manifest.IngestManifest(tmp_path / "manifest.sqlite")
+    assert reopened.get_entries() == {"local://first.md": changed}
+    reopened.close()
+
+
+def test_check_document_detects_content_changes(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "doc.md"
+    path.write_text("first version")
+    entry, changed = ingest_manifest.check_document(path, "local://doc.md", None)
+    assert changed
+    assert entry.content_hash == ingest_manifest.hash_file(path)
+
+    hashed: list[pathlib.Path] = []
+    hash_file = ingest_manifest.hash_file
+
+    def record_hash(path: pathlib.Path) -> str:
+        hashed.append(path)
+        return hash_file(path)
+
+    monkeypatch.setattr(ingest_manifest, "hash_file", record_hash)
+
+    # Files with the recorded size and modification time are not hashed again
+    assert ingest_manifest.check_document(path, "local://doc.md", entry) == (entry, False)
+    assert hashed == []
+
+    # Touched without changes, only the file metadata differs
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    touched, changed = ingest_manifest.check_document(path, "local://doc.md", entry)
+    assert not changed
+    assert touched.content_hash == entry.content_hash
+    assert touched.mtime_ns != entry.mtime_ns
+
+    path.write_text("second version")
+    updated, changed = ingest_manifest.check_document(path, "local://doc.md", touched)
+    assert changed
+    assert updated.content_hash != entry.content_hash
+    assert hashed == [path, path]
+
+
+class FakeVectorStore:
+    """Vector store listing chunks of documents in pages, recording the removed chunk ids."""
+
+    def __init__(self, sources: list[str]) -> None:
+        self.entries: list[SimpleNamespace] = [
+            SimpleNamespace(id=uuid.uuid4(), metadata={"document_meta": {"source": {"id": source}}})
+            for source in sources
+        ]
+        self.removed: list[uuid.UUID] = []
+
+    async def list(self, limit: int, offset: int) -> Sequence[SimpleNamespace]:
+        return self.entries[offset : offset + limit]
+
+    async def remove(self, ids: Sequence[uuid.UUID]) -> None:
+        self.removed.extend(ids)
+
+
+async def test_remove_documents_removes_chunks_of_stale_documents(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ingest_manifest, "LIST_PAGE_SIZE", 2)
+    vector_store = FakeVectorStore(["local://stale.md", "local://kept.md", "local://stale.md", "local://gone.md"])
+
+    removed = await ingest_manifest.remove_documents(vector_store, {"local://stale.md", "local://gone.md"})
+
+    assert removed == 3
+    assert vector_store.removed == [vector_store.entries[i].id for i in (0, 2, 3)]
+    assert await ingest_manifest.remove_documents(vector_store, {"local://missing.md"}) == 0
+    assert len(vector_store.removed) == 3
@@ -0,0 +1,85 @@
+import os
+import pathlib
+from collections.abc import Iterator
+
+import jinja2
+import pytest
+
+from create_ragbits_app import rendering
+from create_ragbits_app.rendering import (
+    get_environment,
+    get_package_version,
+    get_template,
+    get_template_variables,
+    render_file,
+    render_path_segment,
+)
+from create_ragbits_app.template_utils import TEMPLATES_DIR
+
+BUNDLED_TEMPLATE = TEMPLATES_DIR / "shared" / "observability" / "tempo.yml.j2"
+
+
+@pytest.fixture(autouse=True)
+def fresh_environment() -> Iterator[None]:
+    """Create the shared environment again for every test, with the bytecode cache in the test's cache directory."""
+    get_environment.cache_clear()
+    yield
+    get_environment.cache_clear()
+    rendering._compile_external_template.cache_clear()
+    rendering._compile_path_segment.cache_clear()
+
+
+def test_bundled_templates_are_compiled_once() -> None:
+    assert get_environment() is get_environment()
+    assert get_template(BUNDLED_TEMPLATE) is get_template(BUNDLED_TEMPLATE)
+
+
+def test_bytecode_cache_is_reused_by_new_environments(cache_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    rendered = render_file(BUNDLED_TEMPLATE, {})
+    assert list((cache_dir / "jinja2" / get_package_version()).iterdir())
+
+    # A new process loads the compiled template from the cache instead of compiling it again
+    get_environment.cache_clear()
+
+    def compile_template(*args: object, **kwargs: object) -> None:
+        raise AssertionError("Template compiled again")
+
+    monkeypatch.setattr(jinja2.Environment, "compile", compile_template)
+    assert render_file(BUNDLED_TEMPLATE, {}) == rendered
+
+
+def test_environment_without_writable_cache_directory(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "not-a-directory").write_text("")
+    monkeypatch.setenv("CREATE_RAGBITS_APP_CACHE_DIR", str(tmp_path / "not-a-directory"))
+
+    assert get_environment().bytecode_cache is None
+    assert render_file(BUNDLED_TEMPLATE, {})
+
+
+def test_external_templates_are_compiled_again_when_modified(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "README.md.j2"
+    path.write_text("# {{ project_name }}")
+    assert render_file(path, {"project_name": "demo-app"}) == "# demo-app"
+    assert get_template_variables(path) == {"project_name"}
+
+    path.write_text("# {{ project_name }} by {{ author }}")
+    os.utime(path, ns=(path.stat().st_mtime_ns + 10**9,) * 2)
+
+    assert render_file(path, {"project_name": "demo-app", "author": "me"}) == "# demo-app by me"
+    assert get_template_variables(path) == {"project_name", "author"}
+
+
+def test_template_variables_of_templates_including_others(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "main.py.j2"
+    path.write_text('{% include "templates/shared/header.j2" %}')
+
+    assert get_template_variables(path) is None
+
+
+def test_render_path_segment() -> None:
+    context = {"pkg_name": "demo_app"}
+
+    assert render_path_segment("{{pkg_name}}", context) == "demo_app"
+    assert render_path_segment("{{pkg_name}}_tests", context) == "demo_app_tests"
+    assert render_path_segment("src", context) == "src"
+    assert render_path_segment("{not-a-template}", context) == "{not-a-template}"
@@ -0,0 +1,74 @@
+import json
+import pathlib
+
+import pytest
+
+from create_ragbits_app.api import build_context
+from create_ragbits_app.lockfile import LOCKFILE_NAME
+from create_ragbits_app.report import GenerationReport, PhaseSpan
+from create_ragbits_app.template_utils import create_project
+
+
+@pytest.fixture
+def project(templates_dir: pathlib.Path, tmp_path: pathlib.Path) -> tuple[pathlib.Path, GenerationReport]:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    report = create_project("demo", str(tmp_path / "demo-app"), context, templates_dir)
+    return tmp_path / "demo-app", report
+
+
+def test_report_records_every_written_file(project: tuple[pathlib.Path, GenerationReport]) -> None:
+    project_path, report = project
+    written = {
+        path.relative_to(project_path).as_posix(): path.stat().st_size
+        for path in project_path.rglob("*")
+        if path.is_file()
+    }
+
+    assert {path: record.size for path, record in report.files.items()} == written
+    actions = {path: record.action for path, record in report.files.items()}
+    assert actions["README.md"] == "rendered"
+    assert actions["static.txt"] == "copied"
+    assert actions[LOCKFILE_NAME] == "rendered"
+    assert report.files["README.md"].render_ms > 0
+    assert list(report.get_phase_times()) == ["render", "write"]
+
+
+def test_report_exports(project: tuple[pathlib.Path, GenerationReport], tmp_path: pathlib.Path) -> None:
+    _, report = project
+
+    report.write_json(tmp_path / "report.json")
+    report.write_chrome_trace(tmp_path / "trace.json")
+
+    exported = json.loads((tmp_path / "report.json").read_text())
+    assert exported["total_bytes"] == sum(record.size for record in report.files.values())
+    assert [file["path"] for file in exported["files"]] == sorted(report.files)
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {event["name"] for event in events if event["cat"] == "phase"} == {"render", "write"}
+    assert "src/demo_app/main.py" in {event["name"] for event in events if event["cat"] == "rendered"}
+    assert all(event["ts"] >= 0 for event in events)
+
+
+def test_phase_times_are_summed_and_ordered() -> None:
+    report = GenerationReport(started_at=0.0)
+    report.spans = [
+        PhaseSpan("custom", 0.1, 1.0),
+        PhaseSpan("ui", 0.2, 3.0),
+        PhaseSpan("config load", 0.3, 2.0),
+        PhaseSpan("config load", 0.4, 0.5),
+    ]
+
+    assert report.get_phase_times() == {"config load": 2.5, "ui": 3.0, "custom": 1.0}
+
+
+def test_print_tree_collapses_deep_directories(capsys: pytest.CaptureFixture[str]) -> None:
+    report = GenerationReport()
+    report.record_file("README.md", "rendered", 10)
+    report.record_file("src/app/deep/a.py", "copied", 1024)
+    report.record_file("src/app/deep/b.py", "copied", 1024)
+
+    report.print_tree(max_depth=2)
+
+    out = capsys.readouterr().out
+    assert "README.md" in out
+    assert "deep/ 2 files, 2.0 KB" in out
+    assert "a.py" not in out
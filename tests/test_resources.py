@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import zipapp
+import zipfile
+
+import pytest
+
+from create_ragbits_app import resources
+from create_ragbits_app.api import build_context, build_project
+from create_ragbits_app.resources import PACKAGE_DIR, PackageArchive
+
+SOURCE_DIR = PACKAGE_DIR.parent
+TEMPLATE_DIR = PACKAGE_DIR / "templates" / "demo"
+
+GENERATE_PROJECT = """
+import hashlib, json
+from create_ragbits_app.api import build_context, build_project
+from create_ragbits_app.resources import get_package_archive
+
+assert get_package_archive() is not None
+context = build_context("rag", "demo-app", ragbits_version="1.0.0")
+tree = build_project("rag", context, include_ui=False)
+print(json.dumps({path: hashlib.sha256(file.read()).hexdigest() for path, file in tree.files.items()}))
+"""
+
+
+@pytest.fixture
+def archive(monkeypatch: pytest.MonkeyPatch) -> PackageArchive:
+    """Package archive with a template, as if the package was imported from a zipapp."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("create_ragbits_app/templates/demo/README.md.j2", "# {{ project_name }}")
+        zip_file.writestr("create_ragbits_app/templates/demo/src/{{pkg_name}}/__init__.py", "")
+        zip_file.writestr("create_ragbits_app/templates/demo/data/", "")
+    package_archive = PackageArchive(
+        path=pathlib.Path("app.pyz"), zip_file=zipfile.ZipFile(buffer), prefix="create_ragbits_app/", mtime_ns=42
+    )
+    monkeypatch.setattr(resources, "get_package_archive", lambda: package_archive)
+    return package_archive
+
+
+@pytest.mark.usefixtures("archive")
+def test_read_templates_from_package_archive() -> None:
+    assert list(resources.walk(TEMPLATE_DIR)) == [
+        ("README.md.j2", False),
+        ("data", True),
+        ("src", True),
+        ("src/{{pkg_name}}", True),
+        ("src/{{pkg_name}}/__init__.py", False),
+    ]
+    assert resources.list_directory(TEMPLATE_DIR) == ["README.md.j2", "data", "src"]
+    assert resources.read_text(TEMPLATE_DIR / "README.md.j2") == "# {{ project_name }}"
+    assert resources.get_size(TEMPLATE_DIR / "README.md.j2") == 20
+    assert resources.get_mtime_ns(TEMPLATE_DIR / "src") == 42
+    assert resources.is_dir(TEMPLATE_DIR / "src")
+    assert resources.is_file(TEMPLATE_DIR / "README.md.j2")
+    assert resources.is_archived(TEMPLATE_DIR / "README.md.j2")
+    assert not resources.is_archived(SOURCE_DIR.parent / "README.md")
+
+
+@pytest.mark.usefixtures("archive")
+def test_missing_files_in_package_archive() -> None:
+    assert not resources.exists(TEMPLATE_DIR / "missing.txt")
+    with pytest.raises(FileNotFoundError):
+        resources.read_bytes(TEMPLATE_DIR / "missing.txt")
+    with pytest.raises(FileNotFoundError):
+        resources.get_size(TEMPLATE_DIR / "missing.txt")
+    with pytest.raises(FileNotFoundError):
+        resources.get_mtime_ns(TEMPLATE_DIR / "missing")
+
+
+def test_read_small_and_large_files(tmp_path: pathlib.Path) -> None:
+    small, large = tmp_path / "small.txt", tmp_path / "large.txt"
+    small.write_text("small")
+    large.write_text("é" * resources.MMAP_THRESHOLD)
+
+    assert resources.read_bytes(small) == b"small"
+    assert resources.read_text(large) == "é" * resources.MMAP_THRESHOLD
+    with resources.map_file(large) as data:
+        assert not isinstance(data, bytes)
+
+
+def test_generate_project_from_zipapp(tmp_path: pathlib.Path) -> None:
+    app_path = tmp_path / "create-ragbits-app.pyz"
+    zipapp.create_archive(
+        SOURCE_DIR,
+        app_path,
+        main="create_ragbits_app.main:entrypoint",
+        filter=lambda path: "__pycache__" not in path.parts,
+    )
+    env = {**os.environ, "PYTHONPATH": str(app_path), "CREATE_RAGBITS_APP_CACHE_DIR": str(tmp_path / "cache")}
+
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", GENERATE_PROJECT], capture_output=True, text=True, check=True, env=env, cwd=tmp_path
+    )
+
+    context = build_context("rag", "demo-app", ragbits_version="1.0.0")
+    tree = build_project("rag", context, include_ui=False)
+    # The project generated from the zipapp is the same as the one generated from the files on disk
+    assert json.loads(result.stdout) == {path: file.get_hash() for path, file in tree.files.items()}
@@ -0,0 +1,36 @@
+import importlib.util
+import json
+import pathlib
+import subprocess
+import sys
+
+spec = importlib.util.spec_from_file_location(
+    "import_time_benchmark", pathlib.Path(__file__).parents[1] / "benchmarks" / "import_time.py"
+)
+assert spec is not None
+assert spec.loader is not None
+import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_time)
+
+STARTUP = """
+import json, sys
+from create_ragbits_app import main
+main.parse_args(["--tree-depth", "2", "verify", "rag"])
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_cli_startup_loads_heavy_dependencies_lazily() -> None:
+    result = subprocess.run([sys.executable, "-c", STARTUP], capture_output=True, text=True, check=True)  # noqa: S603
+
+    imported = set(json.loads(result.stdout))
+    assert "create_ragbits_app.main" in imported
+    assert imported.isdisjoint(import_time.LAZY_MODULES)
+
+
+def test_import_time_measurement() -> None:
+    elapsed_ms, imported = import_time.measure_import("create_ragbits_app.rendering")
+
+    assert elapsed_ms > 0
+    assert "create_ragbits_app.rendering" in imported
+    assert "jinja2" not in imported
@@ -0,0 +1,138 @@
+import os
+import pathlib
+import shutil
+from collections.abc import Callable
+
+import pytest
+
+from create_ragbits_app.template_registry import TemplateRegistry
+
+
+@pytest.fixture
+def load_calls(monkeypatch: pytest.MonkeyPatch) -> list[pathlib.Path]:
+    calls: list[pathlib.Path] = []
+    load_config = TemplateRegistry._load_config
+
+    def counting_load_config(self: TemplateRegistry, config_path: pathlib.Path) -> object:
+        calls.append(config_path)
+        return load_config(self, config_path)
+
+    monkeypatch.setattr(TemplateRegistry, "_load_config", counting_load_config)
+    return calls
+
+
+def touch(path: pathlib.Path, offset_ns: int = 1_000_000_000) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset_ns))
+
+
+def test_get_config_executes_each_config_once(templates_dir: pathlib.Path, load_calls: list[pathlib.Path]) -> None:
+    registry = TemplateRegistry(templates_dir)
+
+    first = registry.get_config("demo")
+    second = registry.get_config("demo")
+
+    assert first is not None
+    assert first is second
+    assert first.name == "Demo"
+    assert len(load_calls) == 1
+
+
+def test_get_config_reloads_modified_config(templates_dir: pathlib.Path, load_calls: list[pathlib.Path]) -> None:
+    registry = TemplateRegistry(templates_dir)
+    first = registry.get_config("demo")
+
+    config_path = templates_dir / "demo" / "template_config.py"
+    config_path.write_text(config_path.read_text().replace('"Demo"', '"Renamed"'))
+    touch(config_path)
+    second = registry.get_config("demo")
+
+    assert first is not None
+    assert second is not None
+    assert second.name == "Renamed"
+    assert len(load_calls) == 2
+
+
+def test_get_config_of_missing_or_broken_template(
+    templates_dir: pathlib.Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (templates_dir / "broken").mkdir()
+    (templates_dir / "broken" / "template_config.py").write_text("raise RuntimeError('broken')\n")
+    registry = TemplateRegistry(templates_dir)
+
+    assert registry.get_config("missing") is None
+    assert registry.get_config("broken", verbose=False) is None
+    assert capsys.readouterr().out == ""
+    assert registry.get_config("broken") is None
+    assert capsys.readouterr().out == "Error loading template config: broken\n"
+
+
+def test_configs_of_different_roots_do_not_replace_each_other(
+    tmp_path: pathlib.Path, make_template: Callable[..., pathlib.Path]
+) -> None:
+    first_root = tmp_path / "first"
+    second_root = tmp_path / "second"
+    make_template(first_root, "demo", display_name="First")
+    make_template(second_root, "demo", display_name="Second")
+
+    first = TemplateRegistry(first_root).get_config("demo")
+    second = TemplateRegistry(second_root).get_config("demo")
+
+    assert first is not None
+    assert second is not None
+    assert (first.name, second.name) == ("First", "Second")
+
+
+def test_list_templates_uses_up_to_date_index(
+    templates_dir: pathlib.Path, tmp_path: pathlib.Path, load_calls: list[pathlib.Path]
+) -> None:
+    index_path = tmp_path / "index.json"
+    templates = TemplateRegistry(templates_dir, index_path).list_templates()
+
+    # A new registry, as in a new process, reads the index instead of executing the configurations
+    load_calls.clear()
+    indexed_templates = TemplateRegistry(templates_dir, index_path).list_templates()
+
+    assert [t.dir_name for t in templates] == ["demo", "shared"]
+    assert templates[0].questions == [
+        {"name": "with_docs", "message": "Include docs?", "default": True, "type": "confirm"}
+    ]
+    assert indexed_templates == templates
+    assert load_calls == []
+
+
+def test_list_templates_loads_only_changed_configs(
+    templates_dir: pathlib.Path,
+    tmp_path: pathlib.Path,
+    load_calls: list[pathlib.Path],
+    make_template: Callable[..., pathlib.Path],
+) -> None:
+    index_path = tmp_path / "index.json"
+    TemplateRegistry(templates_dir, index_path).list_templates()
+    load_calls.clear()
+
+    make_template(templates_dir, "added", display_name="Added")
+    config_path = templates_dir / "demo" / "template_config.py"
+    config_path.write_text(config_path.read_text().replace('"Demo"', '"Renamed"'))
+    touch(config_path)
+    templates = TemplateRegistry(templates_dir, index_path).list_templates()
+
+    assert [(t.dir_name, t.name) for t in templates] == [
+        ("added", "Added"),
+        ("demo", "Renamed"),
+        ("shared", "Shared content"),
+    ]
+    assert sorted(path.parent.name for path in load_calls) == ["added", "demo"]
+
+
+def test_list_templates_drops_removed_templates(
+    templates_dir: pathlib.Path, tmp_path: pathlib.Path, make_template: Callable[..., pathlib.Path]
+) -> None:
+    index_path = tmp_path / "index.json"
+    make_template(templates_dir, "removed")
+    TemplateRegistry(templates_dir, index_path).list_templates()
+
+    shutil.rmtree(templates_dir / "removed")
+    templates = TemplateRegistry(templates_dir, index_path).list_templates()
+
+    assert [t.dir_name for t in templates] == ["demo", "shared"]
@@ -0,0 +1,316 @@
+import hashlib
+import io
+import json
+import pathlib
+import shutil
+import subprocess
+import threading
+import zipfile
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+from create_ragbits_app.template_sources import (
+    TEMPLATE_SOURCES_ENV,
+    DirectorySource,
+    GitSource,
+    HttpIndexSource,
+    get_template_sources,
+    list_source_templates,
+    parse_template_source,
+)
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git sources need git")
+
+
+class TemplateServer(ThreadingHTTPServer):
+    """HTTP server of fixed files, answering conditional requests with their ETags."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), TemplateRequestHandler)
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str | None]] = []
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{path}"
+
+    def serve_json(self, path: str, data: Any) -> None:  # noqa: ANN401
+        self.files[path] = json.dumps(data).encode()
+
+
+class TemplateRequestHandler(BaseHTTPRequestHandler):
+    server: TemplateServer
+
+    def do_GET(self) -> None:
+        path = self.path.lstrip("/")
+        if_none_match = self.headers.get("If-None-Match")
+        self.server.requests.append((path, if_none_match))
+        if path not in self.server.files:
+            self.send_error(404)
+            return
+        content = self.server.files[path]
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        if if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: ANN401
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[TemplateServer]:
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = TemplateServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def zip_directory(directory: pathlib.Path, prefix: str = "") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                zip_file.write(path, prefix + path.relative_to(directory).as_posix())
+    return buffer.getvalue()
+
+
+def index_entry(dir_name: str, archive: str, content: bytes) -> dict[str, Any]:
+    return {
+        "dir_name": dir_name,
+        "name": dir_name.title(),
+        "description": f"{dir_name} template",
+        "questions": [],
+        "archive": archive,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+@pytest.fixture
+def demo_archive(tmp_path: pathlib.Path, make_template: Callable[..., pathlib.Path]) -> bytes:
+    return zip_directory(make_template(tmp_path / "archived", "demo"), prefix="demo-1.0.0/")
+
+
+def test_parse_template_source(tmp_path: pathlib.Path) -> None:
+    bundled = parse_template_source("bundled")
+    git = parse_template_source("git+https://github.com/org/repo.git@v1.0#templates")
+    ssh = parse_template_source("git+git@github.com:org/repo.git")
+    http = parse_template_source("https://templates.example.com/index.json")
+    directory = parse_template_source(str(tmp_path / "templates"))
+
+    assert isinstance(bundled, DirectorySource)
+    assert isinstance(git, GitSource)
+    assert (git.url, git.ref, git.subdirectory) == ("https://github.com/org/repo.git", "v1.0", "templates")
+    assert isinstance(ssh, GitSource)
+    assert (ssh.url, ssh.ref, ssh.subdirectory) == ("git@github.com:org/repo.git", None, "")
+    assert isinstance(http, HttpIndexSource)
+    assert isinstance(directory, DirectorySource)
+    assert directory.templates_dir == tmp_path / "templates"
+
+
+def test_get_template_sources(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(TEMPLATE_SOURCES_ENV, f"{tmp_path / 'first'} {tmp_path / 'second'}")
+
+    sources = get_template_sources([str(tmp_path / "third"), str(tmp_path / "first"), "bundled"])
+
+    # A source given several times is searched at its last position, so the bundled templates always come last
+    assert [source.spec for source in sources] == [
+        str(tmp_path / "second"),
+        str(tmp_path / "third"),
+        str(tmp_path / "first"),
+        "bundled",
+    ]
+
+
+def test_directory_source(templates_dir: pathlib.Path) -> None:
+    source = DirectorySource(templates_dir)
+
+    assert [t.dir_name for t in source.list_templates()] == ["demo"]
+    assert source.get_templates_dir("demo") == templates_dir
+    with pytest.raises(ValueError):
+        source.get_templates_dir("missing")
+    with pytest.raises(ValueError):
+        DirectorySource(templates_dir / "missing").list_templates()
+
+
+def git(repo: pathlib.Path, *args: str) -> None:
+    subprocess.run(  # noqa: S603
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", "-C", str(repo), *args],  # noqa: S607
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def git_repo(tmp_path: pathlib.Path, make_template: Callable[..., pathlib.Path]) -> pathlib.Path:
+    repo = tmp_path / "repo"
+    make_template(repo / "templates", "demo")
+    git(repo, "init", "--quiet")
+    git(repo, "add", ".")
+    git(repo, "commit", "--quiet", "-m", "Add demo template")
+    return repo
+
+
+@requires_git
+def test_git_source(git_repo: pathlib.Path) -> None:
+    source = parse_template_source(f"git+{git_repo.as_uri()}#templates")
+
+    templates = source.list_templates()
+    templates_dir = source.get_templates_dir("demo")
+
+    assert [t.dir_name for t in templates] == ["demo"]
+    assert (templates_dir / "demo" / "template_config.py").is_file()
+    with pytest.raises(ValueError):
+        source.get_templates_dir("missing")
+
+
+@requires_git
+def test_git_source_fetches_new_commits_after_ttl(
+    git_repo: pathlib.Path, make_template: Callable[..., pathlib.Path]
+) -> None:
+    url = git_repo.as_uri()
+    GitSource(url, subdirectory="templates").list_templates()
+    make_template(git_repo / "templates", "added")
+    git(git_repo, "add", ".")
+    git(git_repo, "commit", "--quiet", "-m", "Add another template")
+
+    cached = GitSource(url, subdirectory="templates").list_templates()
+    synced = GitSource(url, subdirectory="templates", ttl=0).list_templates()
+
+    assert [t.dir_name for t in cached] == ["demo"]
+    assert [t.dir_name for t in synced] == ["added", "demo"]
+
+
+@requires_git
+def test_git_source_uses_checkout_when_remote_is_unreachable(git_repo: pathlib.Path) -> None:
+    url = git_repo.as_uri()
+    GitSource(url, subdirectory="templates").list_templates()
+    shutil.rmtree(git_repo)
+
+    templates = GitSource(url, subdirectory="templates", ttl=0).list_templates()
+
+    assert [t.dir_name for t in templates] == ["demo"]
+    with pytest.raises(ValueError):
+        GitSource(url + "-missing").list_templates()
+
+
+@requires_git
+@pytest.mark.parametrize("spec", ["git+--upload-pack=touch marker", "git+{url}@--upload-pack=touch marker"])
+def test_git_source_does_not_pass_options_to_git(
+    git_repo: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, spec: str
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    source = parse_template_source(spec.format(url=git_repo.as_uri()))
+
+    with pytest.raises(ValueError, match="Could not fetch"):
+        source.list_templates()
+    assert not (tmp_path / "marker").exists()
+
+
+def test_http_index_source(server: TemplateServer, demo_archive: bytes) -> None:
+    server.files["archives/demo-1.0.0.zip"] = demo_archive
+    server.serve_json(
+        "index.json",
+        {
+            "templates": [
+                index_entry("demo", "archives/demo-1.0.0.zip", demo_archive),
+                {"name": "Entry without a template"},
+            ]
+        },
+    )
+    source = parse_template_source(server.url("index.json"))
+
+    templates = source.list_templates()
+    templates_dir = source.get_templates_dir("demo")
+
+    assert [(t.dir_name, t.name) for t in templates] == [("demo", "Demo")]
+    # The top-level directory of the archive is stripped
+    assert (templates_dir / "demo" / "template_config.py").is_file()
+    assert (templates_dir / "demo" / "src" / "{{pkg_name}}" / "main.py.j2").is_file()
+    with pytest.raises(ValueError):
+        source.get_templates_dir("missing")
+
+
+def test_http_index_source_revalidates_index_with_etag(server: TemplateServer, demo_archive: bytes) -> None:
+    server.serve_json("index.json", {"templates": [index_entry("demo", "demo.zip", demo_archive)]})
+    url = server.url("index.json")
+    HttpIndexSource(url).list_templates()
+
+    # A fresh index is used without any request, an expired one is revalidated
+    HttpIndexSource(url).list_templates()
+    templates = HttpIndexSource(url, ttl=0).list_templates()
+
+    assert [t.dir_name for t in templates] == ["demo"]
+    assert len(server.requests) == 2
+    assert server.requests[0] == ("index.json", None)
+    assert server.requests[1][1] is not None
+
+    server.serve_json("index.json", {"templates": [index_entry("changed", "changed.zip", demo_archive)]})
+    assert [t.dir_name for t in HttpIndexSource(url, ttl=0).list_templates()] == ["changed"]
+
+
+def test_http_index_source_rejects_checksum_mismatch(server: TemplateServer, demo_archive: bytes) -> None:
+    server.files["demo.zip"] = demo_archive
+    server.serve_json("index.json", {"templates": [index_entry("demo", "demo.zip", b"other content")]})
+    source = HttpIndexSource(server.url("index.json"))
+
+    with pytest.raises(ValueError, match="Checksum"):
+        source.get_templates_dir("demo")
+    assert not source.cache_dir.joinpath("templates").exists()
+
+
+@pytest.mark.parametrize("dir_name", ["../../outside", "nested/demo", "..", ".", "C:demo", "nested\\demo", 42])
+def test_http_index_source_rejects_unsafe_template_names(
+    server: TemplateServer,
+    demo_archive: bytes,
+    dir_name: Any,  # noqa: ANN401
+) -> None:
+    entry = {**index_entry("demo", "demo.zip", demo_archive), "dir_name": dir_name}
+    server.serve_json("index.json", {"templates": [entry]})
+
+    with pytest.raises(ValueError, match="Invalid template name"):
+        HttpIndexSource(server.url("index.json")).list_templates()
+
+
+def test_http_index_source_keeps_cached_index_when_new_one_is_invalid(
+    server: TemplateServer, demo_archive: bytes
+) -> None:
+    url = server.url("index.json")
+    server.serve_json("index.json", {"templates": [index_entry("demo", "demo.zip", demo_archive)]})
+    HttpIndexSource(url).list_templates()
+
+    server.serve_json("index.json", {"templates": [index_entry("../demo", "demo.zip", demo_archive)]})
+    templates = HttpIndexSource(url, ttl=0).list_templates()
+
+    assert [t.dir_name for t in templates] == ["demo"]
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [{"name": None}, {"description": None}, {"name": 42}, {"questions": "none"}],
+)
+def test_http_index_source_rejects_entries_without_metadata(
+    server: TemplateServer, demo_archive: bytes, templates_dir: pathlib.Path, changes: dict[str, Any]
+) -> None:
+    entry = {**index_entry("broken", "broken.zip", demo_archive), **changes}
+    entry = {key: value for key, value in entry.items() if value is not None}
+    server.serve_json("index.json", {"templates": [entry]})
+    source = HttpIndexSource(server.url("index.json"))
+
+    with pytest.raises(ValueError, match="broken"):
+        source.list_templates()
+    # A malformed index only skips its own source
+    templates = list_source_templates([HttpIndexSource(server.url("index.json")), DirectorySource(templates_dir)])
+    assert [t.metadata.dir_name for t in templates] == ["demo"]
@@ -0,0 +1,17 @@
+import pathlib
+
+from create_ragbits_app.api import build_context
+from create_ragbits_app.template_utils import build_output_tree
+
+
+def test_build_output_tree_with_render_workers(templates_dir: pathlib.Path) -> None:
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+
+    sequential = build_output_tree("demo", context, verbose=False, templates_dir=templates_dir)
+    pooled = build_output_tree("demo", context, verbose=False, templates_dir=templates_dir, render_workers=4)
+
+    # Files are added in plan order whichever thread rendered them
+    assert list(pooled.files) == list(sequential.files)
+    assert {path: file.read() for path, file in pooled.files.items()} == {
+        path: file.read() for path, file in sequential.files.items()
+    }
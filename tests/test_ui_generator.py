@@ -0,0 +1,124 @@
+import io
+import json
+import pathlib
+import zipfile
+
+import pytest
+import requests
+
+from create_ragbits_app import ui_generator
+from create_ragbits_app.archive_cache import ArchiveCache
+from create_ragbits_app.ui_generator import build_ragbits_ui_tree, copy_ui_from_ragbits
+
+UI_PREFIX = "ragbits-1.0.0/typescript/ui/"
+
+
+def build_archive(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        for name, content in members.items():
+            zip_file.writestr(zipfile.ZipInfo(name), content)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def release_archive(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Release archive served from the archive cache, with members trying to escape the UI directory."""
+    path = tmp_path / "release.zip"
+    package_json = {"name": "ui", "dependencies": {"@ragbits/api-client-react": "*"}}
+    path.write_bytes(
+        build_archive(
+            {
+                "ragbits-1.0.0/README.md": b"ragbits",
+                UI_PREFIX: b"",
+                UI_PREFIX + "package.json": json.dumps(package_json).encode(),
+                UI_PREFIX + "src/main.ts": b"console.log('ui')",
+                UI_PREFIX + "node_modules/react/index.js": b"",
+                UI_PREFIX + "../../escaped.txt": b"escaped",
+                UI_PREFIX + "src/../../../escaped.txt": b"escaped",
+                UI_PREFIX + "/etc/absolute.txt": b"absolute",
+                UI_PREFIX + "..\\..\\escaped.txt": b"escaped",
+                UI_PREFIX + "C:/absolute.txt": b"absolute",
+            }
+        )
+    )
+    monkeypatch.setattr(ArchiveCache, "fetch", lambda self, url: path)
+    return path
+
+
+def test_build_ragbits_ui_tree(release_archive: pathlib.Path) -> None:
+    tree = build_ragbits_ui_tree("v1.0.0")
+
+    assert sorted(tree.files) == ["package.json", "src/main.ts"]
+    assert json.loads(tree.files["package.json"].read())["dependencies"] == {"@ragbits/api-client-react": "^0.0.3"}
+
+
+def test_build_ragbits_ui_tree_reads_only_ui_members(
+    release_archive: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    read_members: list[str] = []
+    read = zipfile.ZipFile.read
+
+    def record_read(self: zipfile.ZipFile, name: str | zipfile.ZipInfo, pwd: bytes | None = None) -> bytes:
+        read_members.append(name.filename if isinstance(name, zipfile.ZipInfo) else name)
+        return read(self, name, pwd)
+
+    monkeypatch.setattr(zipfile.ZipFile, "read", record_read)
+
+    build_ragbits_ui_tree("v1.0.0")
+
+    assert read_members == [UI_PREFIX + "package.json", UI_PREFIX + "src/main.ts"]
+
+
+def test_build_ragbits_ui_tree_with_previous_layout(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "release.zip"
+    path.write_bytes(build_archive({"ragbits-0.9.0/ui/index.html": b"<html></html>", "ragbits-0.9.0/README.md": b""}))
+    monkeypatch.setattr(ArchiveCache, "fetch", lambda self, url: path)
+
+    assert sorted(build_ragbits_ui_tree("v0.9.0").files) == ["index.html"]
+
+
+def test_build_ragbits_ui_tree_without_writable_cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    class Response:
+        status_code = 200
+        headers: dict[str, str] = {}
+
+        def raise_for_status(self) -> None:
+            pass
+
+        def iter_content(self, chunk_size: int) -> list[bytes]:
+            return [content[:100], content[100:]]
+
+    content = build_archive({UI_PREFIX + "index.html": b"<html></html>"})
+    (tmp_path / "not-a-directory").write_text("")
+    monkeypatch.setenv("CREATE_RAGBITS_APP_CACHE_DIR", str(tmp_path / "not-a-directory"))
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: Response())
+
+    # The archive is streamed into a temporary file instead of the cache
+    assert build_ragbits_ui_tree("v1.0.0").files["index.html"].read() == b"<html></html>"
+
+
+def test_build_ragbits_ui_tree_without_ui_directory(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "release.zip"
+    path.write_bytes(build_archive({"ragbits-1.0.0/README.md": b"ragbits"}))
+    monkeypatch.setattr(ArchiveCache, "fetch", lambda self, url: path)
+
+    with pytest.raises(ValueError, match="UI directory not found"):
+        build_ragbits_ui_tree("v1.0.0")
+
+
+def test_copy_ui_from_ragbits_writes_only_inside_ui_directory(
+    release_archive: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(ui_generator, "_get_latest_version", lambda: "v1.0.0")
+    project_path = tmp_path / "projects" / "demo-app"
+    project_path.mkdir(parents=True)
+
+    copy_ui_from_ragbits(str(project_path), {})
+
+    written = sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*") if path.is_file())
+    assert [path for path in written if not path.startswith("cache/")] == [
+        "projects/demo-app/ui/package.json",
+        "projects/demo-app/ui/src/main.ts",
+        "release.zip",
+    ]
@@ -0,0 +1,165 @@
+import json
+import os
+import pathlib
+import shutil
+
+import pytest
+
+from create_ragbits_app.api import build_context, build_project
+from create_ragbits_app.lockfile import LOCKFILE_NAME, hash_bytes
+from create_ragbits_app.update import update_project
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="three-way merges need git")
+
+SETTINGS = "".join(f"setting_{i} = {i}\n" for i in range(10)) + 'ragbits_version = "{{ ragbits_version }}"'
+
+
+@pytest.fixture
+def project(templates_dir: pathlib.Path, tmp_path: pathlib.Path) -> pathlib.Path:
+    (templates_dir / "demo" / "settings.py.j2").write_text(SETTINGS)
+    context = build_context("demo", "demo-app", ragbits_version="1.0.0", templates_dir=templates_dir)
+    tree = build_project(
+        "demo", context, templates_dir=templates_dir, template_source=str(templates_dir), include_ui=False
+    )
+    tree.flush(tmp_path / "project")
+    return tmp_path / "project"
+
+
+def read_locked_files(project_path: pathlib.Path) -> dict[str, str]:
+    return json.loads((project_path / LOCKFILE_NAME).read_text())["files"]
+
+
+def test_update_replaces_unedited_files(templates_dir: pathlib.Path, project: pathlib.Path) -> None:
+    (templates_dir / "demo" / "static.txt").write_text("new static content\n")
+    (templates_dir / "demo" / "added.txt").write_text("added\n")
+    (templates_dir / "demo" / "docs.md").unlink()
+
+    result = update_project(project)
+
+    assert result.updated == ["static.txt"]
+    assert result.created == ["added.txt"]
+    assert result.deleted == ["docs.md"]
+    assert (project / "static.txt").read_text() == "new static content\n"
+    assert (project / "added.txt").read_text() == "added\n"
+    assert not (project / "docs.md").exists()
+    locked_files = read_locked_files(project)
+    assert locked_files["static.txt"] == hash_bytes(b"new static content\n")
+    assert "docs.md" not in locked_files
+
+
+def test_update_with_new_answers(project: pathlib.Path) -> None:
+    result = update_project(project, answers={"with_docs": False})
+
+    assert result.deleted == ["docs.md"]
+    assert json.loads((project / LOCKFILE_NAME).read_text())["answers"] == {"with_docs": False}
+
+
+def test_update_records_validated_answers(templates_dir: pathlib.Path, project: pathlib.Path) -> None:
+    config_path = templates_dir / "demo" / "template_config.py"
+    config_path.write_text(
+        config_path.read_text()
+        .replace(
+            "questions = [",
+            "questions = [MultiSelectQuestion(name='features', message='Features?', "
+            "choices=[{'display_name': 'Docs site', 'value': 'docs_site'}]), ",
+        )
+        .replace("import ConfirmQuestion", "import ConfirmQuestion, MultiSelectQuestion")
+    )
+    os.utime(config_path, ns=(config_path.stat().st_mtime_ns + 10**9,) * 2)
+
+    update_project(project, answers={"features": ["Docs site"]})
+
+    # Choices given by their display name are recorded by their value, together with the defaults of new questions
+    answers = json.loads((project / LOCKFILE_NAME).read_text())["answers"]
+    assert answers == {"with_docs": True, "features": ["docs_site"]}
+
+
+def test_update_keeps_edited_and_deleted_files(templates_dir: pathlib.Path, project: pathlib.Path) -> None:
+    (project / "docs.md").write_text("My documentation\n")
+    (project / "static.txt").unlink()
+    (templates_dir / "demo" / "static.txt").write_text("new static content\n")
+    (templates_dir / "demo" / "docs.md").unlink()
+
+    result = update_project(project)
+
+    assert sorted(result.kept) == ["docs.md", "static.txt"]
+    assert (project / "docs.md").read_text() == "My documentation\n"
+    assert not (project / "static.txt").exists()
+
+
+def test_dry_run_writes_nothing(templates_dir: pathlib.Path, project: pathlib.Path) -> None:
+    (templates_dir / "demo" / "static.txt").write_text("new static content\n")
+    lockfile = (project / LOCKFILE_NAME).read_text()
+
+    result = update_project(project, dry_run=True)
+
+    assert result.updated == ["static.txt"]
+    assert (project / "static.txt").read_text() == "static content\n"
+    assert (project / LOCKFILE_NAME).read_text() == lockfile
+
+
+def render_settings(ragbits_version: str) -> str:
+    return SETTINGS.replace("{{ ragbits_version }}", ragbits_version)
+
+
+@requires_git
+def test_update_merges_user_edits_with_template_changes(project: pathlib.Path) -> None:
+    (project / "settings.py").write_text(render_settings("1.0.0").replace("setting_1 = 1", "setting_1 = 100"))
+
+    result = update_project(project, ragbits_version="2.0.0")
+
+    assert result.merged == ["settings.py"]
+    assert (project / "settings.py").read_text() == render_settings("2.0.0").replace("setting_1 = 1", "setting_1 = 100")
+    # The lockfile records the pristine render, so the file is still seen as edited by the next update
+    assert read_locked_files(project)["settings.py"] == hash_bytes(render_settings("2.0.0").encode())
+    assert not update_project(project).changed
+
+
+@requires_git
+def test_update_reports_conflicts_until_resolved(project: pathlib.Path) -> None:
+    locked_hash = read_locked_files(project)["settings.py"]
+    edited = render_settings("1.0.0").replace('"1.0.0"', '"1.0.0"  # pinned')
+    (project / "settings.py").write_text(edited)
+
+    result = update_project(project, ragbits_version="2.0.0")
+
+    assert result.conflicts == ["settings.py"]
+    assert (project / "settings.py").read_text() == edited
+    assert read_locked_files(project)["settings.py"] == locked_hash
+    assert update_project(project).conflicts == ["settings.py"]
+
+
+def test_update_reports_new_template_file_colliding_with_user_file(
+    templates_dir: pathlib.Path, project: pathlib.Path
+) -> None:
+    (project / "NOTES.md").write_text("My notes\n")
+    (templates_dir / "demo" / "NOTES.md").write_text("Template notes\n")
+    (templates_dir / "demo" / "static.txt").write_text("new static content\n")
+
+    result = update_project(project)
+
+    assert result.conflicts == ["NOTES.md"]
+    assert result.updated == ["static.txt"]
+    assert (project / "NOTES.md").read_text() == "My notes\n"
+    assert (project / "static.txt").read_text() == "new static content\n"
+    # The user's file was never rendered into the project, so it gets no hash and stays a conflict
+    assert "NOTES.md" not in read_locked_files(project)
+    assert update_project(project).conflicts == ["NOTES.md"]
+
+
+def test_update_records_new_template_file_equal_to_user_file(
+    templates_dir: pathlib.Path, project: pathlib.Path
+) -> None:
+    (project / "NOTES.md").write_text("Same notes\n")
+    (templates_dir / "demo" / "NOTES.md").write_text("Same notes\n")
+
+    result = update_project(project)
+
+    assert not result.changed
+    assert not result.conflicts
+    assert read_locked_files(project)["NOTES.md"] == hash_bytes(b"Same notes\n")
+
+
+def test_update_without_lockfile(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        update_project(tmp_path)
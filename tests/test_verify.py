@@ -0,0 +1,50 @@
+import pathlib
+
+import pytest
+
+from create_ragbits_app.template_config_base import MultiSelectQuestion
+from create_ragbits_app.verify import check_content, get_question_options, verify_templates
+
+SETTINGS_TEMPLATE = '{% if with_docs %}{"docs": true}{% else %}{"docs": }{% endif %}\n'
+
+
+def test_multi_select_options_cover_every_subset() -> None:
+    question = MultiSelectQuestion(
+        name="features", message="Features?", choices=[{"display_name": "Docs", "value": "docs"}, "cache"]
+    )
+
+    assert get_question_options(question) == [[], ["docs"], ["cache"], ["docs", "cache"]]
+
+
+@pytest.mark.parametrize(
+    ("path", "content"),
+    [
+        ("main.py", "def main(:\n"),
+        ("compose.yml", "services: [\n"),
+        ("settings.json", "{'docs': true}"),
+        ("pyproject.toml", "[project\n"),
+    ],
+)
+def test_check_content_rejects_invalid_files(path: str, content: str) -> None:
+    with pytest.raises(Exception):  # noqa: B017
+        check_content(pathlib.PurePosixPath(path), content)
+
+
+def test_check_content_accepts_other_files() -> None:
+    check_content(pathlib.PurePosixPath("README.md"), "def main(:\n")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_verify_templates(templates_dir: pathlib.Path, workers: int) -> None:
+    (templates_dir / "demo" / "settings.json.j2").write_text(SETTINGS_TEMPLATE)
+
+    result = verify_templates(workers=workers, templates_dir=templates_dir)
+
+    # 2 answers to with_docs times 4 UI options
+    assert result.combinations == 8
+    # Files reading the same variables are rendered once for all combinations
+    assert result.renders < result.files
+    assert [failure.target for failure in result.failures] == ["settings.json"]
+    answers = result.failures[0].answers
+    assert len(answers) == 4
+    assert {(answer["template"], answer["with_docs"]) for answer in answers} == {("demo", False)}
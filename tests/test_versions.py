@@ -0,0 +1,134 @@
+import hashlib
+import json
+import pathlib
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+from create_ragbits_app.versions import ResolvedVersion, VersionResolver, VersionSource
+
+
+class VersionServer(ThreadingHTTPServer):
+    """HTTP server of fixed JSON responses with ETags, holding back the slow ones until the test ends."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), VersionRequestHandler)
+        self.responses: dict[str, Any] = {}
+        self.requests: list[tuple[str, str | None]] = []
+        self.slow: set[str] = set()
+        self.released = threading.Event()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{path}"
+
+
+class VersionRequestHandler(BaseHTTPRequestHandler):
+    server: VersionServer
+
+    def do_GET(self) -> None:
+        path = self.path.lstrip("/")
+        if_none_match = self.headers.get("If-None-Match")
+        self.server.requests.append((path, if_none_match))
+        if path in self.server.slow:
+            self.server.released.wait(5)
+        if path not in self.server.responses:
+            self.send_error(404)
+            return
+        content = json.dumps(self.server.responses[path]).encode()
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        if if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: ANN401
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[VersionServer]:
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = VersionServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.released.set()
+    server.shutdown()
+    server.server_close()
+
+
+def make_resolver(server: VersionServer, cache_path: pathlib.Path, ttl: float = 60) -> VersionResolver:
+    sources = {
+        name: VersionSource(url=server.url(name), extract=lambda data: data["version"], default=f"{name}-default")
+        for name in ("ragbits", "ragbits_ui")
+    }
+    return VersionResolver(sources, ttl=ttl, cache_path=cache_path)
+
+
+def test_versions_are_resolved_and_cached(server: VersionServer, tmp_path: pathlib.Path) -> None:
+    server.responses = {"ragbits": {"version": "1.0.0"}, "ragbits_ui": {"version": "v1.0.0"}}
+    cache_path = tmp_path / "versions.json"
+
+    resolver = make_resolver(server, cache_path)
+    assert resolver.resolve("ragbits") == ResolvedVersion("1.0.0", "network")
+    assert resolver.resolve("ragbits_ui") == ResolvedVersion("v1.0.0", "network")
+    assert resolver.start() is resolver.start()
+
+    # Versions younger than the TTL are used without touching the network
+    server.responses["ragbits"] = {"version": "2.0.0"}
+    assert make_resolver(server, cache_path).resolve("ragbits") == ResolvedVersion("1.0.0", "cache")
+    assert make_resolver(server, cache_path).cached_version("ragbits") == "1.0.0"
+    assert len(server.requests) == 2
+
+
+def test_expired_versions_are_revalidated(server: VersionServer, tmp_path: pathlib.Path) -> None:
+    server.responses = {"ragbits": {"version": "1.0.0"}, "ragbits_ui": {"version": "v1.0.0"}}
+    cache_path = tmp_path / "versions.json"
+    make_resolver(server, cache_path).start().result()
+    etags = {path: json.loads(cache_path.read_text())[path]["etag"] for path in ("ragbits", "ragbits_ui")}
+    server.requests.clear()
+    server.responses["ragbits"] = {"version": "2.0.0"}
+
+    resolver = make_resolver(server, cache_path, ttl=0)
+
+    assert resolver.resolve("ragbits") == ResolvedVersion("2.0.0", "network")
+    assert resolver.resolve("ragbits_ui") == ResolvedVersion("v1.0.0", "network")
+    assert sorted(server.requests) == [("ragbits", etags["ragbits"]), ("ragbits_ui", etags["ragbits_ui"])]
+    assert json.loads(cache_path.read_text())["ragbits"]["version"] == "2.0.0"
+
+
+def test_failed_lookups_fall_back_to_cached_and_default_versions(server: VersionServer, tmp_path: pathlib.Path) -> None:
+    cache_path = tmp_path / "versions.json"
+    cache_path.write_text(json.dumps({"ragbits": {"version": "1.0.0", "etag": '"etag"', "fetched_at": 0}}))
+
+    resolver = make_resolver(server, cache_path)
+
+    assert resolver.resolve("ragbits") == ResolvedVersion("1.0.0", "cache")
+    assert resolver.resolve("ragbits_ui") == ResolvedVersion("ragbits_ui-default", "default")
+    assert resolver.cached_version("ragbits_ui") == "ragbits_ui-default"
+
+
+def test_slow_lookups_fall_back_to_cached_and_default_versions(server: VersionServer, tmp_path: pathlib.Path) -> None:
+    server.slow = {"ragbits", "ragbits_ui"}
+    server.responses = {"ragbits": {"version": "2.0.0"}, "ragbits_ui": {"version": "v2.0.0"}}
+    cache_path = tmp_path / "versions.json"
+    cache_path.write_text(json.dumps({"ragbits": {"version": "1.0.0", "etag": None, "fetched_at": 0}}))
+
+    start = time.monotonic()
+    resolver = make_resolver(server, cache_path)
+
+    assert resolver.resolve("ragbits") == ResolvedVersion("1.0.0", "cache")
+    assert resolver.resolve("ragbits_ui") == ResolvedVersion("ragbits_ui-default", "default")
+    # Commands waiting for the versions are held back by a slow network for about a second only
+    assert time.monotonic() - start < 2
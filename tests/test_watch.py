@@ -0,0 +1,173 @@
+import json
+import os
+import pathlib
+
+import pytest
+
+from create_ragbits_app.lockfile import LOCKFILE_NAME
+from create_ragbits_app.watch import DependencyGraph, ProjectWatcher
+
+
+def edit(path: pathlib.Path, content: str) -> None:
+    """Write a file with a newer modification time, even within the resolution of the filesystem clock."""
+    mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def sources(tmp_path: pathlib.Path) -> dict[str, pathlib.Path]:
+    files = {
+        "name.md.j2": "# {{ project_name }}\n",
+        "docs.md.j2": "{% if with_docs %}Documentation of {{ pkg_name }}{% endif %}\n",
+        "layout.md.j2": "{% include 'other.j2' %}\n",
+        "broken.md.j2": "{% if %}\n",
+        "static.txt": "static content\n",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    return {name: tmp_path / name for name in files}
+
+
+def test_dependency_graph_tracks_variables(sources: dict[str, pathlib.Path]) -> None:
+    graph = DependencyGraph()
+    for name, path in sources.items():
+        graph.add(name.removesuffix(".j2"), [path])
+
+    assert graph.variables == {
+        "name.md": frozenset({"project_name"}),
+        "docs.md": frozenset({"with_docs", "pkg_name"}),
+        # Included templates and syntax errors make the variables unknown
+        "layout.md": None,
+        "broken.md": None,
+        "static.txt": frozenset(),
+    }
+    assert graph.dependents[sources["static.txt"]] == {"static.txt"}
+
+
+def test_dependency_graph_get_affected(sources: dict[str, pathlib.Path]) -> None:
+    graph = DependencyGraph()
+    for name, path in sources.items():
+        graph.add(name.removesuffix(".j2"), [path])
+    graph.add("merged.md", [sources["name.md.j2"], sources["static.txt"]])
+
+    assert graph.get_affected(set(), set()) == set()
+    assert graph.get_affected({sources["static.txt"]}, set()) == {"static.txt", "merged.md"}
+    assert graph.get_affected(set(), {"with_docs"}) == {"docs.md", "layout.md", "broken.md"}
+    assert graph.get_affected({sources["name.md.j2"]}, set()) == {"name.md", "merged.md", "layout.md", "broken.md"}
+
+
+@pytest.fixture
+def answers_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "answers.json"
+    path.write_text(json.dumps({"project_name": "demo-app", "answers": {"with_docs": True}}))
+    return path
+
+
+@pytest.fixture
+def watcher(templates_dir: pathlib.Path, answers_file: pathlib.Path, tmp_path: pathlib.Path) -> ProjectWatcher:
+    return ProjectWatcher("demo", answers_file, tmp_path / "project", "1.0.0", templates_dir, str(templates_dir))
+
+
+def test_watcher_renders_project(watcher: ProjectWatcher) -> None:
+    update = watcher.start()
+
+    project = watcher.project_path
+    assert sorted(update.written) == [
+        "README.md",
+        "docs.md",
+        "src/demo_app/__init__.py",
+        "src/demo_app/main.py",
+        "static.txt",
+    ]
+    assert not update.errors
+    assert (project / "src/demo_app/main.py").read_text() == 'print("Hello from demo-app")'
+    assert sorted(json.loads((project / LOCKFILE_NAME).read_text())["files"]) == sorted(update.written)
+    assert watcher.poll() is None
+
+
+def test_watcher_renders_only_changed_files(watcher: ProjectWatcher, templates_dir: pathlib.Path) -> None:
+    watcher.start()
+
+    edit(templates_dir / "demo" / "src" / "{{pkg_name}}" / "main.py.j2", 'print("Hi from {{ project_name }}")\n')
+    update = watcher.poll()
+
+    assert update is not None
+    assert (update.written, update.rendered, update.removed) == (["src/demo_app/main.py"], 1, [])
+    assert (watcher.project_path / "src/demo_app/main.py").read_text() == 'print("Hi from demo-app")'
+
+
+def test_watcher_applies_changed_answers(
+    watcher: ProjectWatcher, answers_file: pathlib.Path, templates_dir: pathlib.Path
+) -> None:
+    watcher.start()
+
+    edit(answers_file, json.dumps({"project_name": "demo-app", "answers": {"with_docs": False}}))
+    update = watcher.poll()
+
+    assert update is not None
+    assert update.removed == ["docs.md"]
+    assert not (watcher.project_path / "docs.md").exists()
+    assert "docs.md" not in json.loads((watcher.project_path / LOCKFILE_NAME).read_text())["files"]
+
+    edit(answers_file, json.dumps({"project_name": "other-app", "answers": {"with_docs": False}}))
+    update = watcher.poll()
+
+    assert update is not None
+    assert sorted(update.written) == ["README.md", "src/other_app/__init__.py", "src/other_app/main.py"]
+    assert sorted(update.removed) == ["src/demo_app/__init__.py", "src/demo_app/main.py"]
+    assert not (watcher.project_path / "src" / "demo_app").exists()
+
+
+def test_watcher_keeps_files_until_syntax_errors_are_fixed(
+    watcher: ProjectWatcher, templates_dir: pathlib.Path
+) -> None:
+    watcher.start()
+    readme = templates_dir / "demo" / "README.md.j2"
+
+    edit(readme, "# {{ project_name \n")
+    update = watcher.poll()
+
+    assert update is not None
+    assert list(update.errors) == ["README.md"]
+    assert (watcher.project_path / "README.md").read_text().startswith("# demo-app")
+
+    edit(readme, "# {{ project_name | upper }}\n")
+    update = watcher.poll()
+
+    assert update is not None
+    assert (update.written, update.errors) == (["README.md"], {})
+    assert (watcher.project_path / "README.md").read_text() == "# DEMO-APP"
+
+
+def test_watcher_reports_invalid_answers(watcher: ProjectWatcher, answers_file: pathlib.Path) -> None:
+    watcher.start()
+
+    edit(answers_file, json.dumps({"project_name": "demo-app", "answers": {"unknown": True}}))
+    update = watcher.poll()
+
+    assert update is not None
+    assert list(update.errors) == ["context"]
+    assert (watcher.project_path / "docs.md").exists()
+
+
+def test_watcher_refuses_directories_it_did_not_generate(watcher: ProjectWatcher) -> None:
+    watcher.project_path.mkdir()
+    (watcher.project_path / "notes.txt").write_text("My notes\n")
+
+    with pytest.raises(ValueError, match="not a generated project"):
+        watcher.start()
+
+
+def test_watcher_removes_files_of_previous_session(
+    watcher: ProjectWatcher, templates_dir: pathlib.Path, answers_file: pathlib.Path
+) -> None:
+    watcher.start()
+    (templates_dir / "demo" / "static.txt").unlink()
+
+    update = ProjectWatcher(
+        "demo", answers_file, watcher.project_path, "1.0.0", templates_dir, str(templates_dir)
+    ).start()
+
+    assert update.removed == ["static.txt"]
+    assert not (watcher.project_path / "static.txt").exists()